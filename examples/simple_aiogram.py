@@ -12,7 +12,7 @@ dp = Dispatcher(bot)
 
 @dp.message_handler(commands='start')
 async def start(message):
-    calendar, step = DetailedTelegramCalendar().build()
+    calendar, step = await DetailedTelegramCalendar().abuild()
     await bot.send_message(message.chat.id,
                            f"Select {LSTEP[step]}",
                            reply_markup=calendar)
@@ -20,7 +20,7 @@ async def start(message):
 
 @dp.callback_query_handler(DetailedTelegramCalendar.func())
 async def inline_kb_answer_callback_handler(query):
-    result, key, step = DetailedTelegramCalendar().process(query.data)
+    result, key, step = await DetailedTelegramCalendar().aprocess(query.data)
 
     if not result and key:
         await bot.edit_message_text(f"Select {LSTEP[step]}",
@@ -15,13 +15,13 @@ bot = TelegramClient("bot", api_id, api_hash)
 
 @bot.on(events.NewMessage(pattern="/start"))
 async def reply_handler(event):
-    calendar, step = DetailedTelegramCalendar(telethon=True).build()
+    calendar, step = await DetailedTelegramCalendar(telethon=True).abuild()
     await event.respond(f"Select {LSTEP[step]}", buttons=calendar)
 
 
 @bot.on(events.CallbackQuery(pattern=DetailedTelegramCalendar.func(telethon=True)))
 async def calendar_handler(event):
-    result, key, step = DetailedTelegramCalendar(telethon=True).process(event.data.decode("utf-8"))
+    result, key, step = await DetailedTelegramCalendar(telethon=True).aprocess(event.data.decode("utf-8"))
 
     if not result and key:
         await event.edit(f"Select {LSTEP[step]}", buttons=key)
@@ -21,7 +21,10 @@ setup(
         'jdatetime',
     ],
     extras_require={
-        'telethon': ['telethon']
+        'telethon': ['telethon'],
+        'orjson': ['orjson'],
+        'ujson': ['ujson'],
+        'numpy': ['numpy'],
     },
     classifiers=[
         'Development Status :: 4 - Beta',
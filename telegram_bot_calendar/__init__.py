@@ -1,3 +1,13 @@
 from telegram_bot_calendar.detailed import DetailedTelegramCalendar, YEAR, MONTH, DAY, LSTEP
 from telegram_bot_calendar.wmonth import WMonthTelegramCalendar
 from telegram_bot_calendar.wyear import WYearTelegramCalendar
+from telegram_bot_calendar.wweek import WWeekTelegramCalendar, WEEK
+from telegram_bot_calendar.daterange import RangeTelegramCalendar
+from telegram_bot_calendar.multiselect import MultiSelectTelegramCalendar
+from telegram_bot_calendar.timepicker import DateTimeTelegramCalendar, HOUR, MINUTE
+from telegram_bot_calendar.router import CalendarRouter
+from telegram_bot_calendar.config import CalendarConfig, render, render_many, handle
+from telegram_bot_calendar.rules import DisabledDates
+from telegram_bot_calendar.availability import AvailabilityProvider, MemoryAvailability, CachedAvailability
+from telegram_bot_calendar.instrumentation import Instrumentation, MetricsRecorder, LoggingInstrumentation
+from telegram_bot_calendar.session import SessionStore, MemorySessionStore, SQLiteSessionStore
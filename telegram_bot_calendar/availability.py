@@ -0,0 +1,75 @@
+import threading
+import time
+
+
+class AvailabilityProvider:
+    """
+    Source of the days that can not be selected, e.g. booked days from a database.
+
+    Calendars call it once per rendered page with the first and the last date of the page (a month on the day page,
+    a year on the month page). Dates of any calendar system can be returned. Async bots override `aunavailable()`
+    which is used by `abuild()`/`aprocess()`.
+    """
+
+    def unavailable(self, start, end):
+        """Unavailable dates between start and end (inclusive)."""
+        raise NotImplementedError
+
+    async def aunavailable(self, start, end):
+        return self.unavailable(start, end)
+
+
+class MemoryAvailability(AvailabilityProvider):
+    """Provider of a set of dates kept in memory."""
+
+    def __init__(self, dates=()):
+        self.dates = set(dates)
+
+    def unavailable(self, start, end):
+        return [d for d in self.dates if start <= d <= end]
+
+
+class CachedAvailability(AvailabilityProvider):
+    """TTL cache in front of another provider, results are kept for `ttl` seconds by page."""
+
+    def __init__(self, provider, ttl=60.0, maxsize=1024):
+        self.provider = provider
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def _set(self, key, dates):
+        dates = frozenset(dates)
+        with self._lock:
+            if len(self._data) >= self.maxsize:
+                now = time.monotonic()
+                self._data = {k: v for k, v in self._data.items() if v[0] > now}
+                if len(self._data) >= self.maxsize:
+                    self._data.clear()
+            self._data[key] = (time.monotonic() + self.ttl, dates)
+        return dates
+
+    def unavailable(self, start, end):
+        key = (start, end)
+        dates = self._get(key)
+        if dates is None:
+            dates = self._set(key, self.provider.unavailable(start, end))
+        return dates
+
+    async def aunavailable(self, start, end):
+        key = (start, end)
+        dates = self._get(key)
+        if dates is None:
+            dates = self._set(key, await self.provider.aunavailable(start, end))
+        return dates
+
+    def invalidate(self):
+        with self._lock:
+            self._data = {}
@@ -1,28 +1,86 @@
-import calendar
 import json
-import random
-from datetime import date
-
-import jdatetime
-from dateutil.relativedelta import relativedelta
-
-try:
-    from telethon import Button
-    TELETHON_INSTALLED = True
-except ImportError:
-    TELETHON_INSTALLED = False
-
-from telegram_bot_calendar.static import MONTHS, DAYS_OF_WEEK
-
-CB_CALENDAR = "cbcal"
-
-YEAR = 'y'
-MONTH = 'm'
-DAY = 'd'
-SELECT = "s"
-GOTO = "g"
-NOTHING = "n"
-LSTEP = {'y': 'year', 'm': 'month', 'd': 'day'}
+import threading
+import time
+from collections import OrderedDict
+
+from telegram_bot_calendar.instrumentation import PHASES
+from telegram_bot_calendar.callback import CallbackPayload, parse_callback, TEXT_CODEC, COMPACT_CODEC, TOKEN_CODEC, \
+    MAX_CALLBACK_DATA, CallbackDataTooLong
+from telegram_bot_calendar.lazy import load_telethon_button, load_json_dumps, telethon_installed
+from telegram_bot_calendar import prerender
+from telegram_bot_calendar.serializer import serializer_for, resolve_json_backend, telethon_builder
+from telegram_bot_calendar.session import session_token
+from telegram_bot_calendar.static import MONTHS, DAYS_OF_WEEK, CB_CALENDAR, YEAR, MONTH, DAY, WEEK, HOUR, MINUTE, \
+    SELECT, GOTO, NOTHING, TOKEN, DONE, LSTEP
+from telegram_bot_calendar.systems import get_system, system_of, shift_months, GREGORIAN, JALALI
+
+# class attributes that change the rendered keyboard; they are part of the cache key
+STYLE_ATTRIBUTES = (
+    'prev_button', 'next_button', 'middle_button_day', 'middle_button_month', 'middle_button_year',
+    'back_to_button', 'empty_nav_button', 'empty_day_button', 'empty_month_button', 'empty_year_button',
+    'disabled_day_button',
+    'size_year', 'size_year_column', 'size_month', 'size_day', 'size_additional_buttons',
+)
+
+
+class KeyboardCache:
+    """
+    Thread-safe LRU cache of rendered keyboards shared by all calendars.
+
+    Values are stored exactly as they are returned by `build()`/`process()` (serialized json or rows of telethon
+    buttons),
+    so they must not be mutated by the caller.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self._data), "maxsize": self.maxsize}
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+
+keyboard_cache = KeyboardCache()
+
+# renderings of abuild()/aprocess() in progress by (event loop, cache key)
+_inflight = {}
 
 
 class TelegramCalendar:
@@ -38,45 +96,76 @@ class TelegramCalendar:
     empty_day_button = " "
     empty_month_button = " "
     empty_year_button = " "
+    disabled_day_button = "×"
     size_year = 2
     size_year_column = 2
     size_month = 3
     size_day = 7
     size_additional_buttons = 2
+    # attributes of the keyboard style, subclasses with more style attributes extend it
+    style_attributes = STYLE_ATTRIBUTES
+    # shared keyboard cache, set to None in a subclass to disable caching
+    cache = keyboard_cache
+    # callback data format, e.g. COMPACT_CODEC for short callback data
+    codec = TEXT_CODEC
+    # keyboard json library: "json", "orjson", "ujson" or "auto" (orjson if it is installed)
+    json_backend = "json"
+    # return json keyboards as utf-8 bytes instead of str
+    json_bytes = False
+    # DisabledDates of the days that can not be selected
+    disabled_dates = None
+    # AvailabilityProvider asked once per day/month page for the unavailable days
+    availability = None
+    # SessionStore of the callback data, buttons of session calendars only carry a short token
+    session_store = None
+    # Instrumentation that receives timings, cache lookups and keyboard sizes, None disables instrumentation
+    instrumentation = None
+    # calendars that keep a selection in the callback data, `handle()` processes them with a calendar object
+    stateful = False
+    # concurrent.futures executor for abuild()/aprocess() rendering on cache misses, None renders on the event loop
+    executor = None
+    first_step = None
     _keyboard = None
+    _fingerprint = None
+    _serializer = None
     step = None
+    # selection state appended to the callback data of the buttons, set by stateful calendars
+    _extra = None
+    # False while abuild() renders a page it did not find in the cache, so the miss is not counted twice
+    _cache_lookup = True
 
     def __init__(self, calendar_id=0, current_date=None, additional_buttons=None, locale='en',
-                 min_date=None, max_date=None, telethon=False, is_random=True, **kwargs):
+                 min_date=None, max_date=None, telethon=False, is_random=True, disabled_dates=None, availability=None,
+                 instrumentation=None, session_store=None, **kwargs):
 
         self.locale = locale
 
-        if self._is_jalali():
-            if current_date is None:
-                current_date = jdatetime.date.today()
-            if min_date is None:
-                min_date = jdatetime.date(1300, 1, 1)
-            if max_date is None:
-                max_date = jdatetime.date(1499, 12, 29)
-        else:
-            if current_date is None:
-                current_date = date.today()
-            if min_date is None:
-                min_date = date(1800, 1, 1)
-            if max_date is None:
-                max_date = date(2999, 12, 31)
-
-        self.min_date = min_date
-        self.max_date = max_date
+        self.min_date = self.system.min_date if min_date is None else min_date
+        self.max_date = self.system.max_date if max_date is None else max_date
+        if current_date is None:
+            current_date = self.system.today()
+
         self.calendar_id = calendar_id
         self.current_date = current_date
         self.telethon = telethon
-
-        if self.telethon and not TELETHON_INSTALLED:
+        if disabled_dates is not None:
+            self.disabled_dates = disabled_dates
+        if availability is not None:
+            self.availability = availability
+        # bitmaps of unavailable days by (year, month) of the pages loaded from the provider
+        self._unavailable = {}
+        if session_store is not None:
+            self.session_store = session_store
+        # callback data of the tokens of the last built keyboard
+        self._session = {}
+
+        if self.telethon and not telethon_installed():
             raise ImportError(
                 "Telethon is not installed. Please install telethon or use pip install python-telegram-bot-calendar[telethon]"
             )
 
+        self.json_backend = resolve_json_backend(self.json_backend)
+
         self.is_random = is_random
         if not additional_buttons:
             additional_buttons = []
@@ -96,17 +185,71 @@ class TelegramCalendar:
             DAY: [self.prev_button_day, self.middle_button_day, self.next_button_day],
         }
 
+        if instrumentation is not None:
+            self.instrumentation = instrumentation
+        if self.instrumentation is not None:
+            self._instrument()
+
+    def _instrument(self):
+        """Time the methods of PHASES on this object, calendars without instrumentation keep the plain methods."""
+        for phase, name in PHASES.items():
+            setattr(self, name, self._timed(phase, getattr(self, name)))
+
+    def _timed(self, phase, method):
+        instrumentation = self.instrumentation
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            result = method(*args, **kwargs)
+            seconds = time.perf_counter() - start
+            # the step of a parsed payload is only known from the result
+            step = getattr(result, "step", None) if phase == "parse" else self.step
+            instrumentation.timing(phase, seconds, step, self.locale)
+            return result
+
+        return timed
+
+    @property
+    def locale(self):
+        return self._locale
+
+    @locale.setter
+    def locale(self, locale):
+        # the calendar system is resolved once per locale change, not on every rendered cell
+        self._locale = locale
+        self.system = get_system(locale)
+
     def _is_jalali(self):
-        return self.locale == "fa"
+        return self.system is JALALI
 
     @staticmethod
     def func(calendar_id=0, telethon=False):
+        calendar_id = str(calendar_id)
+
         def inn(callback):
-            start = CB_CALENDAR + "_" + str(calendar_id)
-            return callback.decode("utf-8").startswith(start) if telethon else callback.data.startswith(start)
+            payload = parse_callback(callback.decode("utf-8") if telethon else callback.data)
+            return payload is not None and payload.calendar_id == calendar_id
 
         return inn
 
+    @classmethod
+    def prerender(cls, start, end, locales=('en',), steps=(YEAR, MONTH, DAY), processes=None, **kwargs):
+        """
+        Fill the keyboard cache with the pages of all dates between start and end. `kwargs` are the arguments of the
+        calendars that will use the pages, large ranges are rendered by `processes` worker processes if it is set.
+        """
+        return prerender.prerender(cls, start, end, locales, steps, processes, **kwargs)
+
+    @classmethod
+    def save_snapshot(cls, path, start, end, locales=('en',), steps=(YEAR, MONTH, DAY), processes=None, **kwargs):
+        """Prerender the pages and save them to a snapshot file for `load_snapshot()`."""
+        return prerender.save_snapshot(cls, path, start, end, locales, steps, processes, **kwargs)
+
+    @classmethod
+    def load_snapshot(cls, path, **kwargs):
+        """Fill the keyboard cache from a snapshot file, pages of a different style are skipped."""
+        return prerender.load_snapshot(cls, path, **kwargs)
+
     def build(self):
         if not self._keyboard:
             self._build()
@@ -115,46 +258,280 @@ class TelegramCalendar:
     def process(self, call_data):
         return self._process(call_data)
 
+    async def abuild(self, executor=None):
+        """Awaitable `build()`. Cache misses are rendered in `executor` (or `self.executor`) if it is set."""
+        if not self._keyboard:
+            await self._abuild(None, executor)
+        return self._keyboard, self.step
+
+    async def aprocess(self, call_data, executor=None):
+        """Awaitable `process()`. Cache misses are rendered in `executor` (or `self.executor`) if it is set."""
+        self._unavailable = {}
+        result, step = self._resolve(self._payload(call_data))
+        if result is not None or step is None:
+            return result, None, step
+        await self._abuild(step, executor)
+        return None, self._keyboard, step
+
+    async def _abuild(self, step, executor=None):
+        step = step or self.first_step
+        executor = executor or self.executor
+        await self._aload_availability(step)
+        if executor is None:
+            self._build(step=step)
+            return
+
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        key = self._cache_key(step) if self.cache is not None else None
+        keyboard = self.cache.get(key) if key is not None else None
+        if key is not None and self.instrumentation is not None:
+            self.instrumentation.cache(keyboard is not None, step, self.locale)
+        if keyboard is not None and self.session_store is not None:
+            self._session = {}
+            self._save_session(step)
+        if keyboard is None:
+            if key is None:
+                keyboard = await loop.run_in_executor(executor, self._render, step)
+            else:
+                # identical concurrent requests share one rendering
+                future = _inflight.get((loop, key))
+                if future is None:
+                    future = loop.run_in_executor(executor, self._render, step, False)
+                    _inflight[loop, key] = future
+                    future.add_done_callback(lambda _: _inflight.pop((loop, key), None))
+                keyboard = await asyncio.shield(future)
+
+        self.step = step
+        self._keyboard = keyboard
+
+    def _render(self, step, lookup=True):
+        """Build the keyboard of the step, `lookup=False` renders it without looking it up in the cache first."""
+        self._cache_lookup = lookup
+        try:
+            self._build(step=step)
+        finally:
+            self._cache_lookup = True
+        return self._keyboard
+
     def _build(self, *args, **kwargs):
         """Override in subclasses to build the keyboard."""
 
-    def _process(self, call_data, *args, **kwargs):
-        """Override in subclasses to process callback data."""
+    def _resolve(self, payload):
+        """Override in subclasses to apply callback payload. Returns (result, step of the keyboard to build)."""
+        return None, None
+
+    @classmethod
+    def _next_step(cls, action, step):
+        """Override in subclasses: step of the keyboard shown after the action, None if the selection is finished."""
+        return None
 
-    def _build_callback(self, action, step, data, *args, is_random=False, **kwargs):
-        if action == NOTHING:
-            params = [CB_CALENDAR, str(self.calendar_id), action]
+    def _page_anchor(self, step):
+        return page_anchor(self.current_date, step)
+
+    def _style_fingerprint(self):
+        if self._fingerprint is None:
+            self._fingerprint = (
+                tuple(getattr(self, attr) for attr in self.style_attributes),
+                tuple(tuple(labels) for _, labels in sorted(self.nav_buttons.items())),
+                json.dumps(self.additional_buttons, sort_keys=True, default=repr),
+            )
+        return self._fingerprint
+
+    def _static_key(self):
+        """Part of the cache key that does not depend on the shown page."""
+        return (type(self), self.calendar_id, self.locale, self.system,
+                self.min_date, self.max_date, self.telethon, self.codec, self.json_backend, self.json_bytes,
+                self._style_fingerprint(), self._disabled_version(), self.availability, self.session_store,
+                tuple(self.months.get(self.locale, ())), tuple(self.days_of_week.get(self.locale, ())))
+
+    def _disabled_version(self):
+        if self.disabled_dates is None:
+            return None
+        return self.disabled_dates, self.disabled_dates.version
+
+    def _disabled_mask(self, year, month):
+        """
+        Bitmap of the disabled and unavailable days of a month, bit `day - 1` is set for disabled days. Unavailable
+        days are only known for the pages loaded with `_load_availability()`.
+        """
+        mask = self._unavailable.get((year, month), 0)
+        if self.disabled_dates is None:
+            return mask
+        return mask | self.disabled_dates.mask(self.system, year, month)
+
+    def _availability_bounds(self, step):
+        """
+        First and last date of the whole months of the page passed to the availability provider, None if the page is
+        not checked.
+        """
+        if self.availability is None or step not in (DAY, MONTH):
+            return None
+        start = self._page_anchor(step)
+        month = start.month if step == DAY else self.system.months_in_year
+        return start, start.replace(month=month, day=self.system.days_in_month(start.year, month))
+
+    def _load_availability(self, step):
+        bounds = self._availability_bounds(step)
+        if bounds is not None and not self._availability_loaded(bounds):
+            self._set_unavailable(bounds, self.availability.unavailable(*bounds))
+
+    async def _aload_availability(self, step):
+        bounds = self._availability_bounds(step)
+        if bounds is not None and not self._availability_loaded(bounds):
+            self._set_unavailable(bounds, await self.availability.aunavailable(*bounds))
+
+    def _availability_loaded(self, bounds):
+        return all(month in self._unavailable for month in self._months_between(*bounds))
+
+    def _months_between(self, start, end):
+        year, month = start.year, start.month
+        while (year, month) <= (end.year, end.month):
+            yield year, month
+            year, month = (year, month + 1) if month < self.system.months_in_year else (year + 1, 1)
+
+    def _set_unavailable(self, bounds, dates):
+        start, end = bounds
+        masks = dict.fromkeys(self._months_between(start, end), 0)
+        for year, month, day in self.system.from_dates(dates):
+            if (year, month) in masks:
+                masks[year, month] |= 1 << (day - 1)
+        self._unavailable.update(masks)
+
+    def _availability_key(self, step):
+        bounds = self._availability_bounds(step)
+        if bounds is None:
+            return ()
+        self._load_availability(step)
+        return tuple(self._unavailable[month] for month in self._months_between(*bounds))
+
+    def _cache_key(self, step):
+        return self._static_key() + (step, self._page_anchor(step)) + self._availability_key(step)
+
+    def _build_cached(self, step, render):
+        """Set the keyboard for the step from the shared cache, calling `render` only on a miss."""
+        if self.session_store is not None:
+            self._session = {}
+
+        if self.instrumentation is not None:
+            self._build_cached_instrumented(step, render)
+        elif self.cache is None:
+            render()
+        else:
+            key = self._cache_key(step)
+            keyboard = self.cache.get(key) if self._cache_lookup else None
+            if keyboard is None:
+                render()
+                self.cache.set(key, self._keyboard)
+            else:
+                self._keyboard = keyboard
+
+        if self.session_store is not None:
+            self._save_session(step)
+
+    def _save_session(self, step):
+        """Write the tokens of the keyboard to the session store, keyboards from the cache reuse their tokens."""
+        if self.cache is not None:
+            key = self._cache_key(step) + ("session",)
+            if self._session:
+                self.cache.set(key, self._session)
+            else:
+                self._session = self.cache.get(key) or {}
+        if self._session:
+            self.session_store.set_many(self._session)
+
+    def _build_cached_instrumented(self, step, render):
+        instrumentation = self.instrumentation
+        keyboard = None
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(step)
+            if self._cache_lookup:
+                keyboard = self.cache.get(key)
+                instrumentation.cache(keyboard is not None, step, self.locale)
+
+        if keyboard is None:
+            start = time.perf_counter()
+            render()
+            instrumentation.timing("render", time.perf_counter() - start, step, self.locale)
+            if key is not None:
+                self.cache.set(key, self._keyboard)
         else:
-            data = list(map(str, data.timetuple()[:3]))
-            params = [CB_CALENDAR, str(self.calendar_id), action, step] + data + [self.locale]
+            self._keyboard = keyboard
 
-        salt = "_" + str(random.randint(1, 1e18)) if is_random else ""
-        return "_".join(params) + salt
+        if isinstance(self._keyboard, (str, bytes)):
+            size = len(self._keyboard) if isinstance(self._keyboard, bytes) else len(self._keyboard.encode("utf-8"))
+            instrumentation.payload_size(size, step, self.locale)
+
+    def _process(self, call_data, *args, **kwargs):
+        self._unavailable = {}
+        result, step = self._resolve(self._payload(call_data))
+        if result is not None or step is None:
+            return result, None, step
+        self._build(step=step)
+        return None, self._keyboard, step
+
+    def _payload(self, call_data):
+        """Accept both raw callback data and an already parsed `CallbackPayload`, session tokens are looked up."""
+        payload = call_data if isinstance(call_data, CallbackPayload) else parse_callback(call_data)
+        if payload is None or payload.action != TOKEN:
+            return payload
+        data = self.session_store.get(payload.extra) if self.session_store is not None else None
+        return parse_callback(data) if data else None
+
+    def _build_callback(self, action, step, data, *args, **kwargs):
+        if self._extra is None or action == NOTHING:
+            callback_data = self.codec.encode(self.calendar_id, action, step, data, self.locale)
+        else:
+            callback_data = self.codec.encode(self.calendar_id, action, step, data, self.locale, extra=self._extra)
+        if self.session_store is None or action == NOTHING:
+            return self._checked_callback(callback_data)
+        return self._session_callback(callback_data)
+
+    @staticmethod
+    def _checked_callback(callback_data):
+        if len(callback_data.encode("utf-8")) > MAX_CALLBACK_DATA:
+            raise CallbackDataTooLong("Callback data {!r} is longer than {} bytes, use a shorter calendar_id, "
+                                      "COMPACT_CODEC or a session store".format(callback_data, MAX_CALLBACK_DATA))
+        return callback_data
+
+    def _extra_fits(self, extra):
+        """Whether the buttons can carry `extra`: tokens of a session store always fit."""
+        if self.session_store is not None or extra is None:
+            return True
+        # the longest text dates have two digit months and days
+        longest = self.system.date(self.current_date.year, self.system.months_in_year, 28)
+        data = self.codec.encode(self.calendar_id, SELECT, DAY, longest, self.locale, extra=extra)
+        return len(data.encode("utf-8")) <= MAX_CALLBACK_DATA
+
+    def _session_callback(self, callback_data):
+        token = session_token(callback_data)
+        self._session[token] = callback_data
+        return TOKEN_CODEC.encode(self.calendar_id, token)
 
     def _build_button(self, text, action, step=None, date_obj=None, is_random=False, *args, **kwargs):
         if (action == NOTHING) or (not date_obj):
-            return {"text": text, "callback_data": NOTHING}
+            return {"text": text, "callback_data": self._build_callback(NOTHING, None, None)}
 
-        callback_data = "_".join([
-            "CALENDAR",
-            str(self.calendar_id),
-            action,
-            step if step else "",
-            str(date_obj.year),
-            str(date_obj.month),
-            str(date_obj.day),
-            self.locale
-        ])
-
-        return {"text": text, "callback_data": callback_data}
+        return {"text": text, "callback_data": self._build_callback(action, step, date_obj)}
 
     def _build_keyboard(self, buttons):
         if self.telethon:
-            return buttons
+            return telethon_builder.build(buttons + self.additional_buttons, self._build_callback(NOTHING, None, None))
         return self._build_json_keyboard(buttons)
 
     def _build_json_keyboard(self, buttons):
-        return json.dumps({"inline_keyboard": buttons + self.additional_buttons})
+        if self.json_backend == "json":
+            if self._serializer is None:
+                self._serializer = serializer_for(self.additional_buttons)
+            keyboard = self._serializer.dumps(buttons)
+        else:
+            keyboard = load_json_dumps(self.json_backend)({"inline_keyboard": buttons + self.additional_buttons})
+
+        if self.json_bytes:
+            return keyboard if isinstance(keyboard, bytes) else keyboard.encode("utf-8")
+        return keyboard.decode("utf-8") if isinstance(keyboard, bytes) else keyboard
 
     def _valid_date(self, date_obj):
         if date_obj is None:
@@ -166,27 +543,25 @@ class TelegramCalendar:
         return True
 
     def _get_period(self, step, start, count):
-        result = []
-        for i in range(count):
-            if step == YEAR:
-                if self._is_jalali():
-                    current = jdatetime.date(start.year + i, 1, 1)
-                else:
-                    current = date(start.year + i, 1, 1)
-            elif step == MONTH:
-                year = start.year + (start.month + i - 1) // 12
-                month = (start.month + i - 1) % 12 + 1
-                current = jdatetime.date(year, month, 1) if self._is_jalali() else date(year, month, 1)
-            else:  # DAY
-                if self._is_jalali():
-                    cur_tmp = start.togregorian() + relativedelta(days=i)
-                    current = jdatetime.date.fromgregorian(date=cur_tmp)
-                else:
-                    current = start + relativedelta(days=i)
-
-            result.append(current if self._valid_date(current) else None)
-
-        return result
+        system = self.system
+        if step == DAY:
+            period = [system.shift_days(start, i) for i in range(count)]
+        else:
+            months = system.months_in_year if step == YEAR else 1
+            period = [system.shift_months(start, months * i) for i in range(count)]
+
+        period = [current if self._valid_date(current) else None for current in period]
+        if step == DAY and self.disabled_dates is not None:
+            masks = {}
+            for i, current in enumerate(period):
+                if current is None:
+                    continue
+                month = (current.year, current.month)
+                if month not in masks:
+                    masks[month] = self._disabled_mask(*month)
+                if masks[month] >> (current.day - 1) & 1:
+                    period[i] = None
+        return period
 
 
 def rows(buttons, row_size):
@@ -194,28 +569,31 @@ def rows(buttons, row_size):
 
 
 def max_date(d, step):
-    if isinstance(d, jdatetime.date):
-        if step == YEAR:
-            days = 29
-            if jdatetime.date(d.year, 1, 1).isleap():
-                days = 30
-            return d.replace(month=12, day=days)
-        elif step == MONTH:
-            days = jdatetime.j_days_in_month[d.month - 1]
-            if d.month == 12 and d.isleap():
-                days += 1
-            return d.replace(day=days)
-        else:
-            return d
-
     if step == YEAR:
-        return d.replace(month=12, day=31)
+        system = system_of(d)
+        return d.replace(month=system.months_in_year, day=system.days_in_month(d.year, system.months_in_year))
     elif step == MONTH:
-        return d.replace(day=calendar.monthrange(d.year, d.month)[1])
+        return d.replace(day=system_of(d).days_in_month(d.year, d.month))
     else:
         return d
 
 
+def page_anchor(d, step):
+    """First date of the page that is shown for the step. Keyboards only depend on the anchor, not the day."""
+    if step == DAY:
+        return d.replace(day=1)
+    if step == WEEK:
+        # first day of the week, the column of the day in the month grid
+        system = system_of(d)
+        return system.shift_days(d, -((system.month_grid(d.year, d.month).offset + d.day - 1) % 7))
+    if step == HOUR:
+        # the hour page is the day, the minute page the hour of a datetime
+        return d.replace(hour=0, minute=0, second=0, microsecond=0) if hasattr(d, "hour") else d
+    if step == MINUTE:
+        return d.replace(minute=0, second=0, microsecond=0) if hasattr(d, "hour") else d
+    return d.replace(month=1, day=1)
+
+
 def min_date(d, step):
     if step == YEAR:
         return d.replace(month=1, day=1)
@@ -223,3 +601,12 @@ def min_date(d, step):
         return d.replace(day=1)
     else:
         return d
+
+
+def __getattr__(name):
+    # telethon is imported only when its Button is needed
+    if name == "Button":
+        return load_telethon_button()
+    if name == "TELETHON_INSTALLED":
+        return telethon_installed()
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -0,0 +1,258 @@
+"""
+Benchmarks of the calendar.
+
+Usage: python -m telegram_bot_calendar.bench [--number N] [--save FILE] [--compare FILE] [benchmark ...]
+
+`build` and `process` measure the public API for every calendar class, locale, date bounds, output format and
+with/without the keyboard cache: ops/sec, p50/p99 latency and peak traced memory (the high-water mark of the memory
+allocated while one traced call runs, not the total it allocates). `--save` stores the results as a JSON baseline,
+`--compare` prints the change against a saved baseline.
+"""
+import argparse
+import json
+import sys
+import timeit
+import tracemalloc
+from datetime import date
+from time import perf_counter
+
+import jdatetime
+from dateutil.relativedelta import relativedelta
+
+from telegram_bot_calendar import convert
+from telegram_bot_calendar.base import GOTO, DAY
+from telegram_bot_calendar.callback import TEXT_CODEC, COMPACT_CODEC
+from telegram_bot_calendar.detailed import DetailedTelegramCalendar
+from telegram_bot_calendar.lazy import telethon_installed, load_numpy
+from telegram_bot_calendar.serializer import serializer_for
+from telegram_bot_calendar.systems import GREGORIAN, JALALI
+from telegram_bot_calendar.wmonth import WMonthTelegramCalendar
+from telegram_bot_calendar.wyear import WYearTelegramCalendar
+
+CALENDARS = (DetailedTelegramCalendar, WMonthTelegramCalendar, WYearTelegramCalendar)
+LOCALES = {
+    'en': date(2026, 10, 18),
+    'ru': date(2026, 10, 18),
+    'fa': jdatetime.date(1405, 7, 26),
+}
+# relative change of a metric that --compare reports as a regression
+REGRESSION_THRESHOLD = 0.1
+
+
+def measure(func, number):
+    """
+    Run `func` `number` times and return ops/sec, p50/p99 latency in microseconds and the peak traced memory of one
+    more call run under tracemalloc.
+    """
+    timings = []
+    for _ in range(number):
+        start = perf_counter()
+        func()
+        timings.append(perf_counter() - start)
+    timings.sort()
+
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "ops": len(timings) / sum(timings),
+        "p50_us": timings[len(timings) // 2] * 1e6,
+        "p99_us": timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1e6,
+        "peak_bytes": peak,
+    }
+
+
+def _cases():
+    outputs = ("json", "telethon") if telethon_installed() else ("json",)
+    for calendar_cls in CALENDARS:
+        for locale, current_date in LOCALES.items():
+            for bounds in ("bounds", "nobounds"):
+                for output in outputs:
+                    for cached in ("cached", "nocache"):
+                        name = "/".join((calendar_cls.__name__, locale, bounds, output, cached))
+                        # the cache attribute is replaced on a subclass so the shared cache stays untouched
+                        cls = calendar_cls if cached == "cached" else type(calendar_cls.__name__, (calendar_cls,),
+                                                                              {"cache": None})
+                        kwargs = {"locale": locale, "current_date": current_date, "telethon": output == "telethon"}
+                        if bounds == "bounds":
+                            kwargs["min_date"] = current_date.replace(day=5)
+                            kwargs["max_date"] = current_date.replace(year=current_date.year + 1)
+                        yield name, cls, kwargs
+
+
+def _legacy_month_days(start, days_num, min_d, max_d):
+    """Per-day implementation of the month period that the grid engine replaced."""
+    result = []
+    for i in range(days_num):
+        if isinstance(start, jdatetime.date):
+            current = jdatetime.date.fromgregorian(date=start.togregorian() + relativedelta(days=i))
+        else:
+            current = start + relativedelta(days=i)
+        result.append(current if min_d <= current <= max_d else None)
+    return result
+
+
+def _grid_month_days(start, min_d, max_d):
+    grid = (JALALI if isinstance(start, jdatetime.date) else GREGORIAN).month_grid(start.year, start.month)
+    before, days, after = grid.slice(min_d, max_d)
+    return [None] * before + [start.replace(day=day) for day in days] + [None] * after
+
+
+def bench_grid(number=2000):
+    cases = [
+        ("gregorian", date(2026, 10, 1), 31, date(2026, 10, 5), date(2026, 10, 29)),
+        ("jalali", jdatetime.date(1405, 7, 1), 30, jdatetime.date(1405, 7, 5), jdatetime.date(1405, 7, 29)),
+    ]
+    results = {}
+    for name, start, days_num, min_d, max_d in cases:
+        legacy = timeit.timeit(lambda: _legacy_month_days(start, days_num, min_d, max_d), number=number)
+        grid = timeit.timeit(lambda: _grid_month_days(start, min_d, max_d), number=number)
+        results[name] = {"legacy_us": legacy / number * 1e6, "grid_us": grid / number * 1e6,
+                         "speedup": legacy / grid}
+    return results
+
+
+def bench_convert(number=100000):
+    """Conversion of `number` dates per call: jdatetime objects one by one against the bulk functions."""
+    ordinals = list(range(date(2000, 1, 1).toordinal(), date(2000, 1, 1).toordinal() + number))
+    gregorian = [date.fromordinal(ordinal) for ordinal in ordinals]
+    jalali = [jdatetime.date.fromgregorian(date=d) for d in gregorian]
+    years, months, days = [d.year for d in jalali], [d.month for d in jalali], [d.day for d in jalali]
+
+    cases = {
+        "to_jalali": (lambda: [jdatetime.date.fromgregorian(date=d) for d in gregorian],
+                      lambda: convert.ordinal_to_jalali(ordinals)),
+        "to_gregorian": (lambda: [d.togregorian() for d in jalali],
+                         lambda: convert.jalali_to_ordinal(years, months, days)),
+    }
+    backends = {"python": None}
+    if load_numpy() is not None:
+        backends["numpy"] = 0
+
+    results = {}
+    for name, (per_object, bulk) in cases.items():
+        jdatetime_time = min(timeit.repeat(per_object, number=1, repeat=3))
+        result = {"jdatetime_us": jdatetime_time / number * 1e6}
+        for backend, min_size in backends.items():
+            default, convert.NUMPY_MIN_SIZE = convert.NUMPY_MIN_SIZE, min_size
+            try:
+                bulk_time = min(timeit.repeat(bulk, number=1, repeat=3))
+            finally:
+                convert.NUMPY_MIN_SIZE = default
+            result[backend + "_us"] = bulk_time / number * 1e6
+            result[backend + "_speedup"] = jdatetime_time / bulk_time
+        results[name] = result
+    return results
+
+
+def bench_codec(number=20000):
+    results = {}
+    day = date(2026, 10, 18)
+    for calendar_id in (0, "booking-calendar-for-room-42"):
+        for name, codec in (("text", TEXT_CODEC), ("compact", COMPACT_CODEC)):
+            data = codec.encode(calendar_id, "s", "d", day, "ukr")
+            encode = timeit.timeit(lambda: codec.encode(calendar_id, "s", "d", day, "ukr"), number=number)
+            decode = timeit.timeit(lambda: codec.decode(data), number=number)
+            results["{}/id={}".format(name, calendar_id)] = {
+                "bytes": len(data.encode("utf-8")), "encode_ops": number / encode, "decode_ops": number / decode}
+    return results
+
+
+def bench_serializer(number=5000):
+    results = {}
+    for name, cls, kwargs in _cases():
+        if not name.endswith("/bounds/json/nocache") or cls.__name__ != "DetailedTelegramCalendar":
+            continue
+        calendar = cls(additional_buttons=[{"text": "Cancel", "callback_data": "cancel"}], **kwargs)
+        calendar._build_keyboard = lambda buttons: buttons
+        calendar._build(step=DAY)
+        buttons = calendar._keyboard
+        serializer = serializer_for(calendar.additional_buttons)
+        stdlib = timeit.timeit(lambda: json.dumps({"inline_keyboard": buttons + calendar.additional_buttons}),
+                               number=number)
+        template = timeit.timeit(lambda: serializer.dumps(buttons), number=number)
+        results[kwargs["locale"]] = {"json_dumps_us": stdlib / number * 1e6, "template_us": template / number * 1e6,
+                                     "speedup": stdlib / template}
+    return results
+
+
+def bench_build(number=200):
+    return {name: measure(lambda: cls(**kwargs).build(), number) for name, cls, kwargs in _cases()}
+
+
+def bench_process(number=200):
+    results = {}
+    for name, cls, kwargs in _cases():
+        call_data = TEXT_CODEC.encode(0, GOTO, DAY, kwargs["current_date"], kwargs["locale"])
+        results[name] = measure(lambda: cls(**kwargs).process(call_data), number)
+    return results
+
+
+BENCHMARKS = {
+    "grid": bench_grid,
+    "convert": bench_convert,
+    "codec": bench_codec,
+    "serializer": bench_serializer,
+    "build": bench_build,
+    "process": bench_process,
+}
+
+
+def run(names=None, number=None):
+    results = {}
+    for name in names or BENCHMARKS:
+        kwargs = {"number": number} if number else {}
+        for case, result in BENCHMARKS[name](**kwargs).items():
+            results["{}/{}".format(name, case)] = result
+    return results
+
+
+def compare(results, baseline):
+    """Relative change of every metric against the baseline, positive values are improvements."""
+    changes = {}
+    for case, metrics in results.items():
+        for metric, value in metrics.items():
+            old = baseline.get(case, {}).get(metric)
+            if not old or not (metric.endswith("ops") or metric.endswith("_us")):
+                continue
+            change = value / old - 1
+            changes[case, metric] = change if metric.endswith("ops") else -change
+    return changes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m telegram_bot_calendar.bench")
+    parser.add_argument("benchmarks", nargs="*", metavar="benchmark", help="any of: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--number", type=int, help="iterations per case")
+    parser.add_argument("--save", metavar="FILE", help="store the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare the results with a JSON baseline")
+    args = parser.parse_args(argv)
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error("unknown benchmarks: " + ", ".join(sorted(unknown)))
+
+    results = run(args.benchmarks, args.number)
+    for case, result in results.items():
+        print("{}: {}".format(case, ", ".join("{}={:.2f}".format(k, v) for k, v in result.items())))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    regressions = 0
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        for (case, metric), change in sorted(compare(results, baseline).items()):
+            regression = change < -REGRESSION_THRESHOLD
+            regressions += regression
+            print("{} {}: {:+.1%}{}".format(case, metric, change, " REGRESSION" if regression else ""))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,266 @@
+import base64
+from functools import lru_cache
+
+from telegram_bot_calendar.static import CB_CALENDAR, YEAR, MONTH, DAY, WEEK, HOUR, MINUTE, TIME_STEPS, SELECT, GOTO, \
+    NOTHING, TOKEN, DONE
+
+# "CALENDAR" is the prefix of the keyboards generated by the previous versions
+PREFIXES = frozenset((CB_CALENDAR, "CALENDAR"))
+# Telegram rejects keyboards with longer callback data
+MAX_CALLBACK_DATA = 64
+
+
+class CallbackDataTooLong(ValueError):
+    """The callback data of a button is longer than `MAX_CALLBACK_DATA` bytes."""
+
+
+class CallbackPayload:
+    """
+    Parsed calendar callback data. Instances are shared between the router and `process()`, do not modify them.
+    """
+    __slots__ = ('calendar_id', 'action', 'step', 'year', 'month', 'day', 'locale', 'extra', 'hour', 'minute')
+
+    def __init__(self, calendar_id, action, step=None, year=None, month=None, day=None, locale=None, extra=None,
+                 hour=None, minute=None):
+        self.calendar_id = calendar_id
+        self.action = action
+        self.step = step
+        self.year = year
+        self.month = month
+        self.day = day
+        self.locale = locale
+        # calendar specific state, e.g. the pending start of a range
+        self.extra = extra
+        # time of day of the hour and minute steps
+        self.hour = hour
+        self.minute = minute
+
+    def date(self, date_cls):
+        """Build the date of the payload with `datetime.date` or `jdatetime.date`. Raises ValueError if invalid."""
+        return date_cls(self.year, self.month, self.day)
+
+    def datetime(self, datetime_cls):
+        """Build the date and time of the payload with `datetime.datetime` or `jdatetime.datetime`."""
+        return datetime_cls(self.year, self.month, self.day, self.hour or 0, self.minute or 0)
+
+    def __eq__(self, other):
+        if not isinstance(other, CallbackPayload):
+            return NotImplemented
+        return all(getattr(self, attr) == getattr(other, attr) for attr in self.__slots__)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, attr) for attr in self.__slots__))
+
+    def __repr__(self):
+        return "CallbackPayload({})".format(", ".join("{}={!r}".format(attr, getattr(self, attr))
+                                                      for attr in self.__slots__))
+
+
+class TextCodec:
+    """
+    Readable callback data: `<prefix>_<calendar_id>_<action>_<step>_<year>_<month>_<day>_<locale>[_<extra>]`.
+    The day of the hour and minute steps is followed by the time: `<day>T<hour>:<minute>`.
+    """
+    prefix = CB_CALENDAR
+    # extras are text
+    binary_extra = False
+
+    def encode(self, calendar_id, action, step=None, date_obj=None, locale=None, extra=None):
+        if action == NOTHING:
+            return "_".join((self.prefix, str(calendar_id), action))
+        day = str(date_obj.day)
+        if step in TIME_STEPS:
+            day += "T{}:{}".format(getattr(date_obj, "hour", 0), getattr(date_obj, "minute", 0))
+        data = "_".join((self.prefix, str(calendar_id), action, step or "",
+                         str(date_obj.year), str(date_obj.month), day, locale or ""))
+        return data if extra is None else data + "_" + extra
+
+    def with_extra(self, data, extra):
+        """Add `extra` to data encoded without it."""
+        if data.count("_") < 7:
+            return data
+        return data + "_" + extra
+
+    def can_decode(self, data):
+        return data.partition("_")[0] in PREFIXES
+
+    def decode(self, data):
+        parts = data.split("_", 8)
+        if len(parts) < 3 or parts[0] not in PREFIXES:
+            return None
+
+        calendar_id, action = parts[1], parts[2]
+        if action == NOTHING:
+            return CallbackPayload(calendar_id, action)
+        if len(parts) < 7:
+            return None
+
+        day, _, time = parts[6].partition("T")
+        try:
+            year, month, day = int(parts[4]), int(parts[5]), int(day)
+            hour, minute = map(int, time.split(":")) if time else (None, None)
+        except ValueError:
+            return None
+
+        # old keyboards had a random salt instead of the locale
+        locale = parts[7] if len(parts) > 7 and not parts[7].isdigit() else None
+        extra = parts[8] if len(parts) > 8 else None
+        return CallbackPayload(calendar_id, action, parts[3], year, month, day, locale or None, extra, hour, minute)
+
+
+class CompactCodec:
+    """
+    Short callback data: `<prefix>.<calendar_id>.<base64url>`.
+
+    The packed bytes are the action and step indexes in one byte, then the date in 3 bytes (`year << 9 | month << 5 |
+    day`: 15 bits of year, 4 bits of month and 5 bits of day), two bytes of the minute of the day for the hour and
+    minute steps, then the locale index and the extra: utf-8 text, or 0x01 followed by the bytes of a binary extra.
+    Locales that are not in `locales` are stored as utf-8 after 0xff and end with 0x00 if there is an extra.
+    """
+    prefix = "cc"
+    # stateful calendars can pass bytes extras, they are decoded as bytes
+    binary_extra = True
+    # new actions are appended like the steps
+    actions = (NOTHING, SELECT, GOTO, DONE)
+    # new steps are appended, the indexes are part of the sent callback data
+    steps = ("", YEAR, MONTH, DAY, WEEK, HOUR, MINUTE)
+    locales = ("", "en", "eo", "ru", "ukr", "fa")
+
+    def __init__(self):
+        self._header = {(action, step): i << 4 | j for i, action in enumerate(self.actions)
+                        for j, step in enumerate(self.steps)}
+        self._locale_index = {locale: i for i, locale in enumerate(self.locales)}
+
+    def encode(self, calendar_id, action, step=None, date_obj=None, locale=None, extra=None):
+        packed = bytearray((self._header[action, step or ""],))
+        if action != NOTHING:
+            packed += (date_obj.year << 9 | date_obj.month << 5 | date_obj.day).to_bytes(3, "big")
+            if step in TIME_STEPS:
+                packed += (getattr(date_obj, "hour", 0) * 60 + getattr(date_obj, "minute", 0)).to_bytes(2, "big")
+            locale = locale or ""
+            if locale in self._locale_index:
+                packed.append(self._locale_index[locale])
+            else:
+                packed += b"\xff" + locale.encode("utf-8")
+                if extra is not None:
+                    packed.append(0)
+            if extra is not None:
+                packed += self._pack_extra(extra)
+        return self._pack(calendar_id, packed)
+
+    @staticmethod
+    def _pack_extra(extra):
+        return b"\x01" + extra if isinstance(extra, bytes) else extra.encode("utf-8")
+
+    @staticmethod
+    def _unpack_extra(packed):
+        return bytes(packed[1:]) if packed[:1] == b"\x01" else packed.decode("utf-8", "replace")
+
+    def _pack(self, calendar_id, packed):
+        body = base64.urlsafe_b64encode(bytes(packed)).rstrip(b"=").decode("ascii")
+        return "{}.{}.{}".format(self.prefix, calendar_id, body)
+
+    def with_extra(self, data, extra):
+        """Add `extra` to data encoded without it."""
+        payload = self.decode(data)
+        if payload is None or payload.action == NOTHING:
+            return data
+        body = data.rpartition(".")[2]
+        packed = bytearray(base64.urlsafe_b64decode(body + "=" * (-len(body) % 4)))
+        if packed[self._locale_position(payload.step)] == 0xff:
+            packed.append(0)
+        packed += self._pack_extra(extra)
+        return self._pack(payload.calendar_id, packed)
+
+    @staticmethod
+    def _locale_position(step):
+        return 6 if step in TIME_STEPS else 4
+
+    def can_decode(self, data):
+        return data.startswith(self.prefix + ".")
+
+    def decode(self, data):
+        head, _, body = data.rpartition(".")
+        prefix, _, calendar_id = head.partition(".")
+        if prefix != self.prefix or not body:
+            return None
+
+        try:
+            packed = base64.urlsafe_b64decode(body + "=" * (-len(body) % 4))
+            action, step = self.actions[packed[0] >> 4], self.steps[packed[0] & 0xf]
+        except (ValueError, IndexError):
+            return None
+        if action == NOTHING:
+            return CallbackPayload(calendar_id, action)
+        position = self._locale_position(step)
+        if len(packed) < position + 1:
+            return None
+
+        value = int.from_bytes(packed[1:4], "big")
+        hour = minute = None
+        if step in TIME_STEPS:
+            hour, minute = divmod(int.from_bytes(packed[4:6], "big"), 60)
+        extra = None
+        if packed[position] == 0xff:
+            locale, separator, tail = packed[position + 1:].partition(b"\0")
+            locale = locale.decode("utf-8", "replace")
+            if separator:
+                extra = self._unpack_extra(tail)
+        elif packed[position] < len(self.locales):
+            locale = self.locales[packed[position]]
+            if len(packed) > position + 1:
+                extra = self._unpack_extra(packed[position + 1:])
+        else:
+            return None
+        return CallbackPayload(calendar_id, action, step, value >> 9, value >> 5 & 0xf, value & 0x1f, locale or None,
+                               extra, hour, minute)
+
+
+class TokenCodec:
+    """
+    Session tokens: `<prefix>.<calendar_id>.<token>`. The callback data of the button is kept in a session store,
+    decoded payloads only have the calendar id, the TOKEN action and the token in `extra`.
+    """
+    prefix = "cs"
+
+    def encode(self, calendar_id, token):
+        return "{}.{}.{}".format(self.prefix, calendar_id, token)
+
+    def can_decode(self, data):
+        return data.startswith(self.prefix + ".")
+
+    def decode(self, data):
+        head, _, token = data.rpartition(".")
+        prefix, _, calendar_id = head.partition(".")
+        if prefix != self.prefix or not token:
+            return None
+        return CallbackPayload(calendar_id, TOKEN, extra=token)
+
+
+TEXT_CODEC = TextCodec()
+COMPACT_CODEC = CompactCodec()
+TOKEN_CODEC = TokenCodec()
+
+# codecs that are tried by parse_callback, custom codecs can be appended with register_codec
+CODECS = [TEXT_CODEC, COMPACT_CODEC, TOKEN_CODEC]
+
+
+def register_codec(codec):
+    """Make `parse_callback` (and so `func()`/`process()`) understand data produced by a custom codec."""
+    if codec not in CODECS:
+        CODECS.append(codec)
+        parse_callback.cache_clear()
+
+
+@lru_cache(maxsize=4096)
+def parse_callback(data):
+    """
+    Parse callback data of the calendar buttons in one pass.
+
+    Returns None if the data does not belong to a calendar. The result is cached, so the router and `process()`
+    get the same payload object for the same callback data.
+    """
+    for codec in CODECS:
+        if codec.can_decode(data):
+            return codec.decode(data)
+    return None
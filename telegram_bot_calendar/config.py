@@ -0,0 +1,169 @@
+from telegram_bot_calendar.base import page_anchor, CallbackPayload, parse_callback, GOTO, SELECT, TOKEN
+
+
+class CalendarConfig:
+    """
+    Immutable calendar configuration.
+
+    One configuration can be shared by all threads and requests: `render()` and `handle()` do not modify it and only
+    create a calendar object when the keyboard is not in the cache.
+
+        config = CalendarConfig(DetailedTelegramCalendar, locale='ru', max_date=date.today())
+
+        keyboard, step = render(config)
+        result, keyboard, step = handle(config, c.data)
+    """
+    __slots__ = ('calendar_cls', 'calendar_id', 'locale', 'system', 'min_date', 'max_date', 'first_step', 'kwargs',
+                 'disabled_dates', '_static_key')
+
+    def __init__(self, calendar_cls, calendar_id=0, locale='en', min_date=None, max_date=None, **kwargs):
+        calendar = calendar_cls(calendar_id=calendar_id, locale=locale, min_date=min_date, max_date=max_date,
+                                **kwargs)
+        # keyboards with disabled dates or availability change over time and session keyboards store their tokens,
+        # they are built by the calendar objects
+        dynamic = calendar.disabled_dates is not None or calendar.availability is not None or \
+            calendar.session_store is not None
+        values = {
+            'calendar_cls': calendar_cls,
+            'calendar_id': calendar_id,
+            'locale': locale,
+            'system': calendar.system,
+            'min_date': calendar.min_date,
+            'max_date': calendar.max_date,
+            'first_step': calendar.first_step,
+            'kwargs': tuple(sorted(kwargs.items())),
+            'disabled_dates': calendar.disabled_dates,
+            '_static_key': calendar._static_key() if calendar.cache is not None and not dynamic else None,
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CalendarConfig is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("CalendarConfig is immutable")
+
+    def __repr__(self):
+        return "CalendarConfig({}, calendar_id={!r}, locale={!r})".format(self.calendar_cls.__name__,
+                                                                       self.calendar_id, self.locale)
+
+    def calendar(self, current_date=None):
+        """New calendar object of this configuration."""
+        return self.calendar_cls(calendar_id=self.calendar_id, current_date=current_date, locale=self.locale,
+                                 min_date=self.min_date, max_date=self.max_date, **dict(self.kwargs))
+
+    def cache_key(self, step, current_date):
+        if self._static_key is None:
+            return None
+        return self._static_key + (step, page_anchor(current_date, step))
+
+
+def render(config, step=None, current_date=None):
+    """Keyboard of the step showing the date. Returns the same tuple as `build()`."""
+    step = step or config.first_step
+    if current_date is None:
+        current_date = config.system.today()
+
+    key = config.cache_key(step, current_date)
+    if key is not None:
+        keyboard = config.calendar_cls.cache.get(key)
+        if keyboard is not None:
+            return keyboard, step
+
+    calendar = config.calendar(current_date)
+    calendar._build(step=step)
+    return calendar._keyboard, step
+
+
+def handle(config, call_data):
+    """Process callback data or `CallbackPayload`. Returns the same tuple as `process()`."""
+    payload = call_data if isinstance(call_data, CallbackPayload) else parse_callback(call_data)
+    # stateful calendars have their own actions (e.g. DONE) and keep their state in the callback data
+    if payload is not None and (payload.action == TOKEN or config.calendar_cls.stateful):
+        return config.calendar().process(payload)
+    if payload is None or payload.action not in (GOTO, SELECT):
+        return None, None, None
+    # the time steps return a datetime that is built by the calendar
+    if payload.hour is not None or payload.locale and payload.locale != config.locale:
+        return config.calendar().process(payload)
+
+    try:
+        current_date = payload.date(config.system.date)
+    except Exception:
+        current_date = config.system.today()
+
+    next_step = config.calendar_cls._next_step(payload.action, payload.step)
+    if next_step is None and config.disabled_dates is not None and \
+            config.disabled_dates.is_disabled(config.system, current_date):
+        next_step = payload.step
+    if next_step is None:
+        return current_date, None, payload.step
+    keyboard, step = render(config, next_step, current_date)
+    return None, keyboard, step
+
+
+def _render_pages(calendar_cls, kwargs, pages):
+    config = CalendarConfig(calendar_cls, **kwargs)
+    return [render(config, step, current_date)[0] for step, current_date in pages]
+
+
+def render_many(requests, calendar_cls=None, processes=None):
+    """
+    Keyboards of many calendars in one call, in the order of `requests`.
+
+    A request is a dict of calendar arguments with optional `current_date` and `step`, e.g.
+    `{"locale": "ru", "current_date": date(2025, 3, 1), "max_date": date(2025, 6, 1)}`. The class is `calendar_cls`
+    or the `calendar_cls` item of the request. Requests with the same arguments share one configuration, identical
+    pages are rendered once and pages that are not in the cache are rendered by `processes` worker processes if it
+    is set.
+    """
+    groups = {}  # (class, arguments) -> (config, arguments)
+    keyboards = {}  # (group, step, page anchor) -> keyboard
+    missing = []  # (group, step, current_date) of the pages to render
+    order = []
+    for request in requests:
+        kwargs = dict(request)
+        cls = kwargs.pop('calendar_cls', calendar_cls)
+        current_date = kwargs.pop('current_date', None)
+        step = kwargs.pop('step', None)
+
+        group = (cls, repr(sorted(kwargs.items())))
+        if group not in groups:
+            groups[group] = (CalendarConfig(cls, **kwargs), kwargs)
+        config = groups[group][0]
+        step = step or config.first_step
+        current_date = config.system.today() if current_date is None else config.system.from_date(current_date)
+
+        page = (group, step, page_anchor(current_date, step))
+        order.append(page)
+        if page in keyboards:
+            continue
+        key = config.cache_key(step, current_date)
+        keyboards[page] = cls.cache.get(key) if key is not None else None
+        if keyboards[page] is None:
+            missing.append((group, step, current_date))
+
+    # session stores can not be sent to other processes and the tokens of their keyboards must reach the store
+    sessions = any(groups[group][1].get('session_store') is not None for group, _, _ in missing)
+    if processes and processes > 1 and len(missing) > 1 and not sessions:
+        from concurrent.futures import ProcessPoolExecutor
+
+        tasks = {}
+        for group, step, current_date in missing:
+            tasks.setdefault(group, []).append((step, current_date))
+        size = -(-len(missing) // (processes * 4))
+        chunks = [(group, pages[i:i + size]) for group, pages in tasks.items() for i in range(0, len(pages), size)]
+        with ProcessPoolExecutor(processes) as executor:
+            futures = [executor.submit(_render_pages, group[0], groups[group][1], pages) for group, pages in chunks]
+            rendered = [keyboard for future in futures for keyboard in future.result()]
+        missing = [(group, step, current_date) for group, pages in chunks for step, current_date in pages]
+    else:
+        rendered = [render(groups[group][0], step, current_date)[0] for group, step, current_date in missing]
+
+    for (group, step, current_date), keyboard in zip(missing, rendered):
+        keyboards[group, step, page_anchor(current_date, step)] = keyboard
+        key = groups[group][0].cache_key(step, current_date)
+        if key is not None:
+            group[0].cache.set(key, keyboard)
+    return [keyboards[page] for page in order]
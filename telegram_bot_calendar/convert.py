@@ -0,0 +1,105 @@
+"""
+Bulk conversion between Jalali dates and Gregorian ordinals (`date.toordinal()`) for batch jobs and the Jalali
+calendar system.
+
+The functions take ints or sequences of ints. Ints return ints; sequences of at least `NUMPY_MIN_SIZE` values are
+converted as NumPy arrays when NumPy is installed and shorter sequences as lists. The arithmetic is the one of
+jdatetime: cycles of 33 years with 8 leap years, so the results are the same as `togregorian()`/`fromgregorian()`.
+
+    years, months, days = ordinal_to_jalali([d.toordinal() for d in dates])
+"""
+from datetime import date
+
+from telegram_bot_calendar.lazy import load_numpy
+
+# sequences shorter than this are converted with lists, None never uses NumPy
+NUMPY_MIN_SIZE = 1000
+
+# ordinal of 979-01-01, the first day of the cycles of jdatetime (979 is a leap year)
+JALALI_EPOCH = date(1600, 3, 20).toordinal()
+CYCLE_YEARS = 33
+CYCLE_DAYS = CYCLE_YEARS * 365 + 8
+# days of the first six months, they have 31 days and the other months 30 (29 in common years for the last one)
+FIRST_HALF_DAYS = 6 * 31
+
+
+def _year_start(year):
+    """Days before the year of a cycle."""
+    return 365 * year + (year + 3) // 4
+
+
+def _to_ordinal(year, month, day):
+    year = year - 979
+    # branch free so the same code runs on ints and on arrays
+    return (JALALI_EPOCH + year // CYCLE_YEARS * CYCLE_DAYS + _year_start(year % CYCLE_YEARS) +
+            31 * (month - 1) - (month > 7) * (month - 7) + day - 1)
+
+
+def _from_ordinal(ordinal):
+    days = ordinal - JALALI_EPOCH
+    cycle, rest = days // CYCLE_DAYS, days % CYCLE_DAYS
+    year = 4 * rest // 1461
+    # the estimate can be one year off in both directions
+    year = year + (_year_start(year + 1) <= rest)
+    year = year - (_year_start(year) > rest)
+    day = rest - _year_start(year)
+    first_half = day < FIRST_HALF_DAYS
+    second_half = day - FIRST_HALF_DAYS
+    month = first_half * (day // 31 + 1) + (1 - first_half) * (second_half // 30 + 7)
+    day = first_half * (day % 31 + 1) + (1 - first_half) * (second_half % 30 + 1)
+    return 979 + CYCLE_YEARS * cycle + year, month, day
+
+
+def _days_in_month(year, month):
+    leap = _to_ordinal(year + 1, 1, 1) - _to_ordinal(year, 1, 1) - 365
+    return 31 - (month > 6) - (month == 12) * (1 - leap)
+
+
+def _weekday(ordinal):
+    # ordinal 1 is a Monday
+    return (ordinal + 6) % 7
+
+
+def _jalali_weekday(ordinal):
+    # 0 is Saturday like jdatetime
+    return (ordinal + 1) % 7
+
+
+def _apply(func, *args):
+    if all(isinstance(arg, int) for arg in args):
+        return func(*args)
+
+    args = [arg if hasattr(arg, "__len__") else list(arg) for arg in args]
+    numpy = load_numpy() if NUMPY_MIN_SIZE is not None and len(args[0]) >= NUMPY_MIN_SIZE else None
+    if numpy is not None:
+        return func(*(numpy.asarray(arg, dtype=numpy.int64) for arg in args))
+
+    result = [func(*values) for values in zip(*args)]
+    if result and isinstance(result[0], tuple):
+        return tuple(list(values) for values in zip(*result))
+    return result
+
+
+def jalali_to_ordinal(years, months, days):
+    """Gregorian ordinals of Jalali dates."""
+    return _apply(_to_ordinal, years, months, days)
+
+
+def ordinal_to_jalali(ordinals):
+    """Jalali (years, months, days) of Gregorian ordinals."""
+    result = _apply(_from_ordinal, ordinals)
+    return result if result != [] else ([], [], [])
+
+
+def jalali_days_in_month(years, months):
+    return _apply(_days_in_month, years, months)
+
+
+def weekday(ordinals):
+    """Weekdays of ordinals, 0 is Monday like `date.weekday()`."""
+    return _apply(_weekday, ordinals)
+
+
+def jalali_weekday(ordinals):
+    """Weekdays of ordinals, 0 is Saturday like `jdatetime.date.weekday()`."""
+    return _apply(_jalali_weekday, ordinals)
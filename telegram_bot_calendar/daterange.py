@@ -0,0 +1,81 @@
+from telegram_bot_calendar.base import STYLE_ATTRIBUTES, DAY
+from telegram_bot_calendar.detailed import DetailedTelegramCalendar
+
+
+class RangeTelegramCalendar(DetailedTelegramCalendar):
+    """
+    Selection of a date range. The first selected day is the start of the range, it is carried in the callback data
+    of all buttons until the second day is selected, then `process()` returns the `(start, end)` tuple.
+
+    Day pages with a selection are patched from the cached page without selection: only the selected cells get a new
+    text and the pending start is appended to the callback data of the other buttons.
+    """
+    selected_day_button = "·{day}·"
+    style_attributes = STYLE_ATTRIBUTES + ('selected_day_button',)
+    stateful = True
+
+    def __init__(self, calendar_id=0, current_date=None, additional_buttons=None, locale='en', min_date=None,
+                 max_date=None, telethon=False, range_start=None, range_end=None, **kwargs):
+        super().__init__(calendar_id, current_date, additional_buttons, locale, min_date, max_date, telethon, **kwargs)
+        self._set_range(range_start, range_end)
+
+    def _pending_extra(self, start):
+        return "{}.{}.{}".format(start.year, start.month, start.day)
+
+    def _set_range(self, start, end=None):
+        if start is not None and end is not None and end < start:
+            start, end = end, start
+        self.range_start = start
+        self.range_end = end
+        # the start is pending until the end is selected
+        self._extra = self._pending_extra(start) if start and end is None else None
+
+    def _decode_extra(self, extra):
+        try:
+            return self.system.date(*map(int, extra.split(".")))
+        except (TypeError, ValueError):
+            return None
+
+    def _resolve(self, payload):
+        result, step = super()._resolve(payload)
+        start = self._decode_extra(payload.extra) if payload is not None and payload.extra else None
+        if start is not None and not self._extra_fits(self._pending_extra(start)):
+            start = None
+        self._set_range(start)
+        if result is None:
+            return None, step
+
+        if start is None:
+            # a start that does not fit in the callback data is refused like in MultiSelectTelegramCalendar
+            if self._extra_fits(self._pending_extra(result)):
+                self._set_range(result)
+            return None, DAY
+        self._set_range(start, result)
+        return (self.range_start, self.range_end), step
+
+    def _cache_key(self, step):
+        key = super()._cache_key(step)
+        if self.range_start is None:
+            return key
+        return key + (self.range_start, self.range_end)
+
+    def _build_days(self):
+        if self.range_start is None:
+            super()._build_days()
+            return
+
+        grid = self.system.month_grid(self.current_date.year, self.current_date.month)
+        first, last = grid.clip(self.min_date, self.max_date)
+        page = (grid.year, grid.month)
+        end = self.range_end or self.range_start
+        if (self.range_start.year, self.range_start.month) == page:
+            first = max(first, self.range_start.day)
+        elif (self.range_start.year, self.range_start.month) > page:
+            first = last + 1
+        if (end.year, end.month) == page:
+            last = min(last, end.day)
+        elif (end.year, end.month) < page:
+            last = first - 1
+
+        mask = (1 << last) - (1 << (first - 1)) if first <= last else 0
+        self._keyboard = self._build_keyboard(self._selection_days_rows(mask))
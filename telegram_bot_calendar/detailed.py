@@ -1,8 +1,3 @@
-from calendar import monthrange
-from datetime import date
-from dateutil.relativedelta import relativedelta
-import jdatetime
-
 from telegram_bot_calendar.base import *
 from telegram_bot_calendar.static import MONTHS, DAYS_OF_WEEK
 
@@ -13,29 +8,21 @@ PREV_ACTIONS = {DAY: GOTO, MONTH: GOTO, YEAR: NOTHING}
 
 class DetailedTelegramCalendar(TelegramCalendar):
     first_step = YEAR
+    # next step after a selection, the step and the action of the middle navigation button
+    steps = STEPS
+    prev_steps = PREV_STEPS
+    prev_actions = PREV_ACTIONS
 
     def __init__(self, calendar_id=0, current_date=None, additional_buttons=None,
                  locale='en', min_date=None, max_date=None, telethon=False, **kwargs):
-        self.locale = locale
-
-        # Set a proper default date
-        if current_date is None:
-            if self.locale == "fa":
-                current_date = jdatetime.date.today()
-            else:
-                current_date = date.today()
-
         super().__init__(calendar_id, current_date, additional_buttons, locale,
                          min_date, max_date, telethon, **kwargs)
 
-    def _is_jalali(self):
-        return self.locale == "fa"
-
     def _build_years(self):
         years_num = self.size_year * self.size_year_column
         half_range = (years_num - 1) // 2
         start_year = self.current_date.year - half_range
-        start = jdatetime.date(start_year, 1, 1) if self._is_jalali() else date(start_year, 1, 1)
+        start = self.system.date(start_year, 1, 1)
         years = self._get_period(YEAR, start, years_num)
         years_buttons = rows(
             [self._build_button(d.year if d else self.empty_year_button,
@@ -43,105 +30,71 @@ class DetailedTelegramCalendar(TelegramCalendar):
              for d in years],
             self.size_year
         )
-        maxd = jdatetime.date(start.year + years_num - 1, 12, 29) if self._is_jalali() else date(start.year + years_num - 1, 12, 31)
-        nav_buttons = self._build_nav_buttons(YEAR, diff=relativedelta(years=years_num),
+        maxd = max_date(start.replace(year=start.year + years_num - 1), YEAR)
+        nav_buttons = self._build_nav_buttons(YEAR, diff=self.system.months_in_year * years_num,
                                               mind=min_date(start, YEAR), maxd=maxd)
         self._keyboard = self._build_keyboard(years_buttons + nav_buttons)
 
     def _build_nav_buttons(self, step, diff, mind, maxd, *args, **kwargs):
         text = self.nav_buttons[step]
-        month_name = self.months['fa'][self.current_date.month - 1] if self._is_jalali() else self.months[self.locale][self.current_date.month - 1]
-        data = {"year": str(self.current_date.year),
+        page = self._page_anchor(step)
+        month_name = self.months[self.locale][page.month - 1]
+        data = {"year": str(page.year),
                 "month": month_name,
-                "day": str(self.current_date.day),
+                "day": str(page.day),
                 "locale": self.locale}
 
-        # Prev / Next pages
-        if self._is_jalali():
-            curr_page = self.current_date
-            if step == YEAR:
-                prev_page = self.current_date.replace(year=self.current_date.year - diff.years)
-                next_page = self.current_date.replace(year=self.current_date.year + diff.years)
-            elif step == MONTH:
-                new_year = self.current_date.year
-                new_month = self.current_date.month - diff.months
-                if new_month < 1:
-                    new_year -= 1
-                    new_month += 12
-                prev_page = self.current_date.replace(year=new_year, month=new_month)
-                new_year = self.current_date.year
-                new_month = self.current_date.month + diff.months
-                if new_month > 12:
-                    new_year += 1
-                    new_month -= 12
-                next_page = self.current_date.replace(year=new_year, month=new_month)
-            else:  # DAY
-                cur_tmp = self.current_date.togregorian() - relativedelta(days=diff.days)
-                prev_page = jdatetime.date.fromgregorian(date=cur_tmp)
-                cur_tmp = self.current_date.togregorian() + relativedelta(days=diff.days)
-                next_page = jdatetime.date.fromgregorian(date=cur_tmp)
-            prev_exists = (prev_page >= self.min_date) if self.min_date else True
-            next_exists = (next_page <= self.max_date) if self.max_date else True
-        else:
-            curr_page = self.current_date
-            prev_page = self.current_date - diff
-            next_page = self.current_date + diff
-            prev_exists = (prev_page >= self.min_date) if self.min_date else True
-            next_exists = (next_page <= self.max_date) if self.max_date else True
+        # Prev / Next pages, diff is a number of months (or a relativedelta)
+        months = diff if isinstance(diff, int) else diff.years * 12 + diff.months
+        curr_page = self._page_anchor(step)
+        prev_page = self.system.shift_months(curr_page, -months)
+        next_page = self.system.shift_months(curr_page, months)
+
+        # a neighbour page exists if at least one of its dates is within the calendar range
+        prev_exists = (self.system.shift_days(mind, -1) >= self.min_date) if self.min_date else True
+        next_exists = (self.system.shift_days(maxd, 1) <= self.max_date) if self.max_date else True
 
         buttons = [[
             self._build_button(text[0].format(**data) if prev_exists else self.empty_nav_button,
                                GOTO if prev_exists else NOTHING, step, prev_page, locale=self.locale),
             self._build_button(text[1].format(**data),
-                               PREV_ACTIONS[step], PREV_STEPS[step], curr_page, locale=self.locale),
+                               self.prev_actions[step], self.prev_steps[step], curr_page, locale=self.locale),
             self._build_button(text[2].format(**data) if next_exists else self.empty_nav_button,
                                GOTO if next_exists else NOTHING, step, next_page, locale=self.locale),
         ]]
         return buttons
 
-    def _process(self, call_data):
-        params = call_data.split("_")
-        expected_params = ["start", "calendar_id", "action", "step", "year", "month", "day", "locale"]
-        params = dict(zip(expected_params[:len(params)], params))
-
-        if params['action'] == NOTHING:
-            return None, None, None
+    def _resolve(self, payload):
+        if payload is None or payload.action == NOTHING:
+            return None, None
 
         # Restore locale
-        if "locale" in params and params["locale"]:
-            self.locale = params["locale"]
-
-        step = params['step']
+        if payload.locale:
+            self.locale = payload.locale
 
+        step = payload.step
         try:
-            year = int(params['year'])
-            month = int(params['month'])
-            day = int(params['day'])
-        except (ValueError, TypeError):
-            return None, None, None
-
-        if self._is_jalali():
-            try:
-                self.current_date = jdatetime.date(year, month, day)
-            except Exception:
-                self.current_date = jdatetime.date.today()
-        else:
-            try:
-                self.current_date = date(year, month, day)
-            except Exception:
-                self.current_date = date.today()
-
-        if params['action'] == GOTO:
-            self._build(step=step)
-            return None, self._keyboard, step
-
-        if params['action'] == SELECT:
-            if step in STEPS:
-                next_step = STEPS[step]
-                self._build(step=next_step)
-                return None, self._keyboard, next_step
-            else:
-                return self.current_date, None, step
+            self.current_date = payload.date(self.system.date)
+        except Exception:
+            self.current_date = self.system.today()
+
+        if payload.action not in (GOTO, SELECT):
+            return None, None
+
+        next_step = self._next_step(payload.action, step)
+        if next_step is None:
+            d = self.current_date
+            if self.disabled_dates is not None and self.disabled_dates.is_disabled(self.system, d):
+                # the day was disabled after the keyboard was sent
+                return None, step
+            return self.current_date, step
+        return None, next_step
+
+    @classmethod
+    def _next_step(cls, action, step):
+        if action == GOTO:
+            return step
+        return cls.steps.get(step)
 
     def _build(self, step=None):
         if not step:
@@ -149,63 +102,106 @@ class DetailedTelegramCalendar(TelegramCalendar):
         self.step = step
 
         if step == YEAR:
-            self._build_years()
+            self._build_cached(step, self._build_years)
         elif step == MONTH:
-            self._build_months()
+            self._build_cached(step, self._build_months)
         else:  # DAY
-            self._build_days()
+            self._build_cached(step, self._build_days)
 
     def _build_months(self):
+        self._load_availability(MONTH)
         months_buttons = []
-        for i in range(1, 13):
-            if self._is_jalali():
-                d = jdatetime.date(self.current_date.year, i, 1)
-            else:
-                d = date(self.current_date.year, i, 1)
-            if self._valid_date(d):
-                month_name = self.months['fa'][i - 1] if self._is_jalali() else self.months[self.locale][i - 1]
-                months_buttons.append(self._build_button(month_name, SELECT, MONTH, d, locale=self.locale))
+        names = self.months[self.locale]
+        year = self.current_date.year
+        for i in range(1, self.system.months_in_year + 1):
+            d = self.system.date(year, i, 1)
+            # months without a day that can be selected are shown as empty
+            if self._valid_date(d) and self._disabled_mask(year, i) != (1 << self.system.days_in_month(year, i)) - 1:
+                months_buttons.append(self._build_button(names[i - 1], SELECT, MONTH, d, locale=self.locale))
             else:
                 months_buttons.append(self._build_button(self.empty_month_button, NOTHING, locale=self.locale))
         months_buttons = rows(months_buttons, self.size_month)
 
-        if self._is_jalali():
-            start = jdatetime.date(self.current_date.year, 1, 1)
-            maxd = jdatetime.date(self.current_date.year, 12, 1)
-        else:
-            start = date(self.current_date.year, 1, 1)
-            maxd = date(self.current_date.year, 12, 1)
-        nav_buttons = self._build_nav_buttons(MONTH, diff=relativedelta(months=12),
-                                              mind=min_date(start, MONTH), maxd=maxd)
+        start = self.system.date(self.current_date.year, 1, 1)
+        nav_buttons = self._build_nav_buttons(MONTH, diff=self.system.months_in_year,
+                                              mind=min_date(start, YEAR), maxd=max_date(start, YEAR))
         self._keyboard = self._build_keyboard(months_buttons + nav_buttons)
 
     def _build_days(self):
-        if self._is_jalali():
-            days_num = jdatetime.j_days_in_month[self.current_date.month - 1]
-            if self.current_date.month == 12 and self.current_date.isleap():
-                days_num += 1
-            start = jdatetime.date(self.current_date.year, self.current_date.month, 1)
-        else:
-            days_num = monthrange(self.current_date.year, self.current_date.month)[1]
-            start = date(self.current_date.year, self.current_date.month, 1)
-
-        days = self._get_period(DAY, start, days_num)
+        self._keyboard = self._build_keyboard(self._days_rows())
+
+    def _days_rows(self):
+        self._load_availability(DAY)
+        grid = self.system.month_grid(self.current_date.year, self.current_date.month)
+        start = self.current_date.replace(day=1)
+        before, days, after = grid.slice(self.min_date, self.max_date)
+
+        empty = self._build_button(self.empty_day_button, NOTHING, locale=self.locale)
+        disabled = self._disabled_mask(grid.year, grid.month)
         days_buttons = rows(
-            [self._build_button(d.day if d else self.empty_day_button,
-                                SELECT if d else NOTHING, DAY, d, locale=self.locale)
-             for d in days],
+            [empty] * before +
+            [self._build_button(self.disabled_day_button.format(day=day), NOTHING, locale=self.locale)
+             if disabled >> (day - 1) & 1 else
+             self._build_button(day, SELECT, DAY, start.replace(day=day), locale=self.locale) for day in days] +
+            [empty] * after,
             self.size_day
         )
-        locale_key = 'fa' if self._is_jalali() else self.locale
-        days_of_week_buttons = [[self._build_button(self.days_of_week[locale_key][i], NOTHING, locale=self.locale)
+        days_of_week_buttons = [[self._build_button(self.days_of_week[self.locale][i], NOTHING, locale=self.locale)
                                  for i in range(7)]]
 
-        mind = min_date(start, MONTH)
-        if self._is_jalali():
-            maxd_date = start.replace(day=days_num)
-        else:
-            maxd_date = date(self.current_date.year, self.current_date.month, days_num)
-
-        nav_buttons = self._build_nav_buttons(DAY, diff=relativedelta(months=1),
-                                              mind=mind, maxd=max_date(maxd_date, MONTH))
-        self._keyboard = self._build_keyboard(days_of_week_buttons + days_buttons + nav_buttons)
+        nav_buttons = self._build_nav_buttons(DAY, diff=1,
+                                              mind=start, maxd=start.replace(day=grid.days))
+        return days_of_week_buttons + days_buttons + nav_buttons
+
+    def _selection_days_rows(self, mask):
+        """
+        Rows of the day page of a selection calendar, patched from the cached page without selection: `_extra` is
+        appended to the callback data and the days of `mask` (bit `day - 1` of the shown month) get
+        `selected_day_button`. Days out of the calendar range and disabled days keep their text.
+        """
+        keyboard = [list(row) for row in self._base_days_rows()]
+        if self._extra is not None:
+            with_extra = self.codec.with_extra
+            # tokens of a session store replace the data below
+            check = self._checked_callback if self.session_store is None else str
+            for row in keyboard:
+                for i, button in enumerate(row):
+                    row[i] = {"text": button["text"],
+                              "callback_data": check(with_extra(button["callback_data"], self._extra))}
+
+        grid = self.system.month_grid(self.current_date.year, self.current_date.month)
+        nothing = self._build_callback(NOTHING, None, None)
+        full_rows = len(grid.cells) // self.size_day
+        for day in range(1, mask.bit_length() + 1):
+            index = grid.offset + day - 1
+            if not mask >> (day - 1) & 1 or index // self.size_day >= full_rows:
+                continue
+            row = keyboard[1 + index // self.size_day]
+            button = row[index % self.size_day]
+            if button["callback_data"] != nothing:
+                row[index % self.size_day] = {"text": self.selected_day_button.format(day=day),
+                                              "callback_data": button["callback_data"]}
+
+        if self.session_store is not None:
+            keyboard = [[button if button["callback_data"] == nothing else
+                         {"text": button["text"], "callback_data": self._session_callback(button["callback_data"])}
+                         for button in row] for row in keyboard]
+        return keyboard
+
+    def _base_days_rows(self):
+        """Rows of the day page without the selection and session tokens, shared by all selections of the page."""
+        # the key of the plain page, without the selection that subclasses add to their keys
+        key = DetailedTelegramCalendar._cache_key(self, DAY) + ("rows",)
+        base = self.cache.get(key) if self.cache is not None else None
+        if base is None:
+            extra, store = self._extra, self.session_store
+            self._extra = None
+            self.session_store = None
+            try:
+                base = self._days_rows()
+            finally:
+                self._extra = extra
+                self.session_store = store
+            if self.cache is not None:
+                self.cache.set(key, base)
+        return base
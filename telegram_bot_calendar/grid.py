@@ -0,0 +1,38 @@
+class MonthGrid:
+    """
+    Day layout of one month: `cells` is a table of day numbers aligned to the week header where 0 marks an empty cell.
+    """
+    __slots__ = ('year', 'month', 'offset', 'days', 'cells')
+
+    def __init__(self, year, month, offset, days, week_size=7):
+        self.year = year
+        self.month = month
+        self.offset = offset
+        self.days = days
+        trailing = -(offset + days) % week_size
+        self.cells = (0,) * offset + tuple(range(1, days + 1)) + (0,) * trailing
+
+    def clip(self, min_date=None, max_date=None):
+        """Return the first and the last valid day numbers. The range is empty (first > last) if no day is valid."""
+        first, last = 1, self.days
+        page = (self.year, self.month)
+        if min_date is not None:
+            bound = (min_date.year, min_date.month)
+            if bound > page:
+                return 1, 0
+            if bound == page:
+                first = min_date.day
+        if max_date is not None:
+            bound = (max_date.year, max_date.month)
+            if bound < page:
+                return 1, 0
+            if bound == page:
+                last = max_date.day
+        return first, last
+
+    def slice(self, min_date=None, max_date=None):
+        """Return the grid split by the valid range: (empty cells before, valid day numbers, empty cells after)."""
+        first, last = self.clip(min_date, max_date)
+        if first > last:
+            return len(self.cells), range(0), 0
+        return self.offset + first - 1, range(first, last + 1), len(self.cells) - self.offset - last
@@ -0,0 +1,119 @@
+"""
+Metrics of calendar rendering. Set `instrumentation` of a calendar class (or pass it to the constructor) to an
+`Instrumentation` object to receive them; calendars without it are not instrumented at all.
+"""
+import logging
+import threading
+
+# phase name -> calendar method that is timed
+PHASES = {
+    "build": "_build",
+    "parse": "_payload",
+    "period": "_get_period",
+    "nav": "_build_nav_buttons",
+    "serialize": "_build_keyboard",
+}
+
+
+class Instrumentation:
+    """Receiver of calendar metrics. `step` is YEAR, MONTH, DAY or None and `locale` the locale of the calendar."""
+
+    def timing(self, phase, seconds, step, locale):
+        """Duration of a phase: one of PHASES or "render" (keyboard assembly on a cache miss)."""
+
+    def cache(self, hit, step, locale):
+        """Keyboard cache lookup."""
+
+    def payload_size(self, size, step, locale):
+        """Size in bytes of a built json keyboard."""
+
+
+class MetricsRecorder(Instrumentation):
+    """Aggregates metrics in memory and exports them in the Prometheus text format."""
+
+    def __init__(self, prefix="telegram_bot_calendar"):
+        self.prefix = prefix
+        self.timings = {}  # (phase, step, locale) -> [count, sum, max]
+        self.cache_lookups = {}  # (hit, step, locale) -> count
+        self.sizes = {}  # (step, locale) -> [count, sum, max]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _observe(data, key, value):
+        summary = data.get(key)
+        if summary is None:
+            data[key] = [1, value, value]
+        else:
+            summary[0] += 1
+            summary[1] += value
+            if value > summary[2]:
+                summary[2] = value
+
+    def timing(self, phase, seconds, step, locale):
+        with self._lock:
+            self._observe(self.timings, (phase, step, locale), seconds)
+
+    def cache(self, hit, step, locale):
+        key = (hit, step, locale)
+        with self._lock:
+            self.cache_lookups[key] = self.cache_lookups.get(key, 0) + 1
+
+    def payload_size(self, size, step, locale):
+        with self._lock:
+            self._observe(self.sizes, (step, locale), size)
+
+    def reset(self):
+        with self._lock:
+            self.timings = {}
+            self.cache_lookups = {}
+            self.sizes = {}
+
+    @staticmethod
+    def _labels(**labels):
+        return "{" + ",".join('{}="{}"'.format(name, str(value or "").replace("\\", "\\\\").replace('"', '\\"'))
+                              for name, value in labels.items()) + "}"
+
+    def prometheus_text(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            timings = sorted(self.timings.items(), key=repr)
+            lookups = sorted(self.cache_lookups.items(), key=repr)
+            sizes = sorted(self.sizes.items(), key=repr)
+
+        name = self.prefix + "_phase_seconds"
+        lines = ["# HELP {} Time spent in calendar phases.".format(name), "# TYPE {} summary".format(name)]
+        for (phase, step, locale), (count, total, _) in timings:
+            labels = self._labels(phase=phase, step=step, locale=locale)
+            lines.append("{}_count{} {}".format(name, labels, count))
+            lines.append("{}_sum{} {!r}".format(name, labels, total))
+
+        name = self.prefix + "_cache_lookups_total"
+        lines += ["# HELP {} Keyboard cache lookups.".format(name), "# TYPE {} counter".format(name)]
+        for (hit, step, locale), count in lookups:
+            lines.append("{}{} {}".format(name, self._labels(result="hit" if hit else "miss", step=step,
+                                                             locale=locale), count))
+
+        name = self.prefix + "_payload_bytes"
+        lines += ["# HELP {} Size of the built keyboards.".format(name), "# TYPE {} summary".format(name)]
+        for (step, locale), (count, total, _) in sizes:
+            labels = self._labels(step=step, locale=locale)
+            lines.append("{}_count{} {}".format(name, labels, count))
+            lines.append("{}_sum{} {}".format(name, labels, total))
+        return "\n".join(lines) + "\n"
+
+
+class LoggingInstrumentation(Instrumentation):
+    """Logs every metric with `logger` (the `telegram_bot_calendar` logger by default)."""
+
+    def __init__(self, logger=None, level=logging.DEBUG):
+        self.logger = logger or logging.getLogger("telegram_bot_calendar")
+        self.level = level
+
+    def timing(self, phase, seconds, step, locale):
+        self.logger.log(self.level, "calendar %s took %.6fs step=%s locale=%s", phase, seconds, step, locale)
+
+    def cache(self, hit, step, locale):
+        self.logger.log(self.level, "calendar cache %s step=%s locale=%s", "hit" if hit else "miss", step, locale)
+
+    def payload_size(self, size, step, locale):
+        self.logger.log(self.level, "calendar keyboard %d bytes step=%s locale=%s", size, step, locale)
@@ -0,0 +1,35 @@
+"""
+Optional and heavy dependencies are imported on first use, so bots that do not need them start faster.
+"""
+import importlib
+import importlib.util
+from functools import lru_cache
+
+
+def load_jdatetime():
+    """jdatetime is only needed for Jalali (`fa`) calendars."""
+    return importlib.import_module("jdatetime")
+
+
+def load_telethon_button():
+    """telethon is only needed for calendars created with `telethon=True`."""
+    return importlib.import_module("telethon").Button
+
+
+@lru_cache(maxsize=None)
+def module_installed(name):
+    return importlib.util.find_spec(name) is not None
+
+
+def telethon_installed():
+    return module_installed("telethon")
+
+
+def load_json_dumps(backend):
+    """`dumps` of an optional json library (`orjson` or `ujson`), imported only when a calendar uses it."""
+    return importlib.import_module(backend).dumps
+
+
+def load_numpy():
+    """NumPy is optional, bulk date conversions use lists without it. Returns None if it is not installed."""
+    return importlib.import_module("numpy") if module_installed("numpy") else None
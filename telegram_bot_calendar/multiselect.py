@@ -0,0 +1,118 @@
+from telegram_bot_calendar.base import STYLE_ATTRIBUTES, DAY, DONE
+from telegram_bot_calendar.detailed import DetailedTelegramCalendar
+
+
+class MultiSelectTelegramCalendar(DetailedTelegramCalendar):
+    """
+    Selection of several days. Selecting a day toggles it, the done button ends the selection and `process()` returns
+    the sorted list of the selected dates.
+
+    The selection is a bitset per month (bit `day - 1`) carried in the callback data as `<year>.<month>.<hex bits>`
+    items, or packed as bytes by codecs with binary extras like COMPACT_CODEC. Telegram limits callback data to 64
+    bytes: selecting a day that would not fit is refused, use COMPACT_CODEC or a session store for selections spanning
+    several months. Day pages are patched from the cached page without selection: only the selected cells of the
+    shown month get a new text.
+    """
+    selected_day_button = "·{day}·"
+    done_button = "✓ {count}"
+    style_attributes = STYLE_ATTRIBUTES + ('selected_day_button', 'done_button')
+    stateful = True
+
+    def __init__(self, calendar_id=0, current_date=None, additional_buttons=None, locale='en', min_date=None,
+                 max_date=None, telethon=False, selected_dates=None, **kwargs):
+        super().__init__(calendar_id, current_date, additional_buttons, locale, min_date, max_date, telethon, **kwargs)
+        selected = {}
+        for d in selected_dates or ():
+            d = self.system.from_date(d)
+            selected[d.year, d.month] = selected.get((d.year, d.month), 0) | 1 << (d.day - 1)
+        self._set_selection(selected)
+
+    def _set_selection(self, selected):
+        self.selected = {month: mask for month, mask in selected.items() if mask}
+        self._extra = self._encode_selection(self.selected)
+
+    def _encode_selection(self, selected):
+        selected = sorted((month, mask) for month, mask in selected.items() if mask)
+        if getattr(self.codec, "binary_extra", False):
+            return self._pack_selection(selected)
+        return "-".join("{}.{}.{:x}".format(year, month, mask) for (year, month), mask in selected) or None
+
+    @staticmethod
+    def _pack_selection(selected):
+        """
+        Per month 12 bits of year and 4 bits of month, one byte with the number of skipped low zero bytes of the mask
+        (2 bits) and the number of following mask bytes minus one (2 bits), then the little-endian mask bytes.
+        """
+        packed = bytearray()
+        for (year, month), mask in selected:
+            mask_bytes = mask.to_bytes(4, "little")
+            skip = len(mask_bytes) - len(mask_bytes.lstrip(b"\0"))
+            mask_bytes = mask_bytes[skip:].rstrip(b"\0")
+            packed += (year << 4 | month).to_bytes(2, "big")
+            packed.append(skip << 2 | len(mask_bytes) - 1)
+            packed += mask_bytes
+        return bytes(packed) or None
+
+    def _unpack_selection(self, packed):
+        selected, position = {}, 0
+        while position + 3 <= len(packed):
+            value, lengths = int.from_bytes(packed[position:position + 2], "big"), packed[position + 2]
+            end = position + 3 + (lengths & 3) + 1
+            if end > len(packed):
+                return {}
+            selected[value >> 4, value & 0xf] = int.from_bytes(packed[position + 3:end], "little") << 8 * (lengths >> 2)
+            position = end
+        return selected if position == len(packed) else {}
+
+    def _decode_extra(self, extra):
+        if isinstance(extra, bytes):
+            return self._check_selection(self._unpack_selection(extra))
+        selected = {}
+        for item in extra.split("-"):
+            try:
+                year, month, mask = item.split(".")
+                year, month, mask = int(year), int(month), int(mask, 16)
+            except ValueError:
+                return {}
+            selected[year, month] = mask
+        return self._check_selection(selected)
+
+    def _check_selection(self, selected):
+        if not all(1 <= month <= self.system.months_in_year for _, month in selected):
+            return {}
+        return {(year, month): mask & (1 << self.system.days_in_month(year, month)) - 1
+                for (year, month), mask in selected.items()}
+
+    @property
+    def selected_dates(self):
+        return [self.system.date(year, month, day)
+                for (year, month), mask in sorted(self.selected.items())
+                for day in range(1, mask.bit_length() + 1) if mask >> (day - 1) & 1]
+
+    def _resolve(self, payload):
+        self._set_selection(self._decode_extra(payload.extra) if payload is not None and payload.extra else {})
+        result, step = super()._resolve(payload)
+        if payload is not None and payload.action == DONE:
+            return self.selected_dates, DAY
+        if result is None:
+            return None, step
+
+        selected = dict(self.selected)
+        selected[result.year, result.month] = selected.get((result.year, result.month), 0) ^ 1 << (result.day - 1)
+        # a selection that does not fit in the callback data is refused, the page keeps the previous one
+        if self._extra_fits(self._encode_selection(selected)):
+            self._set_selection(selected)
+        return None, DAY
+
+    def _cache_key(self, step):
+        key = super()._cache_key(step)
+        if self._extra is None:
+            return key
+        return key + (self._extra,)
+
+    def _build_days(self):
+        keyboard = self._selection_days_rows(self.selected.get((self.current_date.year, self.current_date.month), 0))
+        count = sum(bin(mask).count("1") for mask in self.selected.values())
+        keyboard.append([self._build_button(self.done_button.format(count=count), DONE, DAY,
+                                            self.current_date.replace(day=1), locale=self.locale)])
+        self._keyboard = self._build_keyboard(keyboard)
@@ -0,0 +1,187 @@
+"""
+Cache warmup: render the pages of a date range in bulk and keep them in a snapshot file for the next start.
+"""
+import hashlib
+import json
+import mmap
+import struct
+
+from telegram_bot_calendar.static import YEAR, MONTH, DAY, WEEK
+from telegram_bot_calendar.systems import get_system
+
+SNAPSHOT_MAGIC = b"TBCSNAP\0"
+SNAPSHOT_VERSION = 1
+# magic, format version, length of the json index that is followed by the keyboards
+_HEADER = struct.Struct(">8sHI")
+# ranges with less pages are rendered in the current process
+PARALLEL_MIN_PAGES = 64
+
+
+def pages(start, end, locales=("en",), steps=(YEAR, MONTH, DAY)):
+    """(locale, step, (year, month, day) of the page anchor) of every page showing a date between start and end."""
+    from telegram_bot_calendar.base import page_anchor
+
+    for step in steps:
+        if step not in (YEAR, MONTH, DAY, WEEK):
+            raise ValueError("Pages of the {!r} step can not be prerendered".format(step))
+    result = []
+    for locale in locales:
+        system = get_system(locale)
+        first, last = system.from_date(start), system.from_date(end)
+        for step in steps:
+            anchor = page_anchor(first, step)
+            while anchor <= last:
+                result.append((locale, step, (anchor.year, anchor.month, anchor.day)))
+                if step == WEEK:
+                    anchor = system.shift_days(anchor, 7)
+                else:
+                    anchor = system.shift_months(anchor, 1 if step == DAY else system.months_in_year)
+    return result
+
+
+def _render_pages(calendar_cls, kwargs, chunk):
+    keyboards = []
+    for locale, step, anchor in chunk:
+        calendar = calendar_cls(current_date=get_system(locale).date(*anchor), locale=locale, **kwargs)
+        # the session tokens of the buttons, stores of other processes are not shared
+        keyboards.append((calendar._render(step), calendar._session or None))
+    return keyboards
+
+
+def _chunks(items, count):
+    size = -(-len(items) // count)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def render_pages(calendar_cls, page_list, processes=None, **kwargs):
+    """Render the pages and put them in the cache. Returns [(locale, step, anchor, keyboard, session tokens)]."""
+    # session stores can not be sent to other processes
+    if processes and processes > 1 and len(page_list) >= PARALLEL_MIN_PAGES and kwargs.get("session_store") is None:
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunks = _chunks(page_list, processes * 4)
+        with ProcessPoolExecutor(processes) as executor:
+            results = executor.map(_render_pages, [calendar_cls] * len(chunks), [kwargs] * len(chunks), chunks)
+            keyboards = [keyboard for result in results for keyboard in result]
+    else:
+        keyboards = _render_pages(calendar_cls, kwargs, page_list)
+
+    rendered = []
+    static_keys = {}
+    store = kwargs.get("session_store")
+    for (locale, step, anchor), (keyboard, session) in zip(page_list, keyboards):
+        rendered.append((locale, step, anchor, keyboard, session))
+        if session and store is not None:
+            store.set_many(session)
+        if calendar_cls.cache is None:
+            continue
+        if locale not in static_keys:
+            static_keys[locale] = calendar_cls(locale=locale, **kwargs)._static_key()
+        key = static_keys[locale] + (step, get_system(locale).date(*anchor))
+        calendar_cls.cache.set(key, keyboard)
+        if session:
+            calendar_cls.cache.set(key + ("session",), session)
+    return rendered
+
+
+def prerender(calendar_cls, start, end, locales=("en",), steps=(YEAR, MONTH, DAY), processes=None, **kwargs):
+    """Fill the keyboard cache with all pages showing the dates between start and end. Returns the number of pages."""
+    return len(render_pages(calendar_cls, pages(start, end, locales, steps), processes, **kwargs))
+
+
+def fingerprint(calendar):
+    """Everything that changes the keyboards of a calendar except the page, snapshots of other styles are ignored."""
+    cls = type(calendar)
+    bounds = tuple((d.year, d.month, d.day) for d in (calendar.min_date, calendar.max_date))
+    static = (cls.__module__, cls.__qualname__, calendar.calendar_id, calendar.locale, calendar.system.name, bounds,
+              calendar.telethon, calendar.codec.prefix, calendar.json_backend, calendar.json_bytes,
+              calendar._style_fingerprint(), tuple(calendar.months.get(calendar.locale, ())),
+              tuple(calendar.days_of_week.get(calendar.locale, ())), _rules_fingerprint(calendar),
+              calendar.session_store is not None)
+    return hashlib.sha1(repr(static).encode("utf-8")).hexdigest()
+
+
+def _rules_fingerprint(calendar):
+    """The disabled dates of the keyboards. Predicates and availability providers can change, they are refused."""
+    if calendar.availability is not None:
+        raise ValueError("Calendars with availability can not be saved to a snapshot")
+    rules = calendar.disabled_dates
+    if rules is None:
+        return None
+    if rules.predicate is not None:
+        raise ValueError("Disabled dates with a predicate can not be saved to a snapshot")
+    return tuple(sorted(rules.weekdays)), tuple(sorted(repr(d) for d in rules.dates))
+
+
+def save_snapshot(calendar_cls, path, start, end, locales=("en",), steps=(YEAR, MONTH, DAY), processes=None,
+                  **kwargs):
+    """Prerender the pages and write them to `path`. Returns the number of saved pages."""
+    if kwargs.get("telethon"):
+        raise ValueError("Telethon keyboards can not be saved to a snapshot")
+
+    fingerprints = {locale: fingerprint(calendar_cls(locale=locale, **kwargs)) for locale in locales}
+    entries = []
+    sessions = []
+    blobs = []
+    offset = 0
+    for locale, step, anchor, keyboard, session in render_pages(calendar_cls, pages(start, end, locales, steps),
+                                                                processes, **kwargs):
+        blob = keyboard if isinstance(keyboard, bytes) else keyboard.encode("utf-8")
+        entries.append([locale, step] + list(anchor) + [offset, len(blob)])
+        sessions.append(session)
+        blobs.append(blob)
+        offset += len(blob)
+
+    index = {"fingerprints": fingerprints, "entries": entries}
+    if any(sessions):
+        # token -> callback data of the buttons of each entry, loaded into the session store of the workers
+        index["sessions"] = sessions
+    index = json.dumps(index, separators=(",", ":")).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(index)))
+        f.write(index)
+        for blob in blobs:
+            f.write(blob)
+    return len(entries)
+
+
+def load_snapshot(calendar_cls, path, **kwargs):
+    """
+    Put the keyboards of a snapshot in the cache. Pages of locales whose style or disabled dates do not match the
+    calendar created with `kwargs` are skipped, snapshots of another format version raise ValueError. Returns the
+    number of loaded pages.
+    """
+    if calendar_cls.cache is None:
+        return 0
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        magic, version, index_size = _HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("{} is not a calendar snapshot".format(path))
+        if version != SNAPSHOT_VERSION:
+            raise ValueError("Snapshot version {} is not supported, expected {}".format(version, SNAPSHOT_VERSION))
+        start = _HEADER.size + index_size
+        index = json.loads(data[_HEADER.size:start].decode("utf-8"))
+
+        calendars = {}
+        for locale, expected in index["fingerprints"].items():
+            calendar = calendar_cls(locale=locale, **kwargs)
+            if fingerprint(calendar) == expected:
+                calendars[locale] = calendar
+
+        sessions = index.get("sessions") or [None] * len(index["entries"])
+        loaded = 0
+        for (locale, step, year, month, day, offset, size), session in zip(index["entries"], sessions):
+            calendar = calendars.get(locale)
+            if calendar is None:
+                continue
+            keyboard = data[start + offset:start + offset + size]
+            if not calendar.json_bytes:
+                keyboard = keyboard.decode("utf-8")
+            key = calendar._static_key() + (step, calendar.system.date(year, month, day))
+            calendar_cls.cache.set(key, keyboard)
+            if session:
+                calendar_cls.cache.set(key + ("session",), session)
+                calendar.session_store.set_many(session)
+            loaded += 1
+    return loaded
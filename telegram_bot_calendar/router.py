@@ -0,0 +1,65 @@
+from telegram_bot_calendar.callback import parse_callback
+
+
+class CalendarRouter:
+    """
+    Dispatch index of calendars by `calendar_id`.
+
+    One router filter replaces a `func()` predicate per calendar: the callback data is parsed once and the calendar is
+    found with a dict lookup.
+
+        router = CalendarRouter()
+        router.register(DetailedTelegramCalendar, calendar_id=1)
+        router.register(WMonthTelegramCalendar, calendar_id=2, locale='ru')
+
+        @bot.callback_query_handler(func=router.func())
+        def cal(c):
+            result, key, step = router.process(c.data)
+    """
+
+    def __init__(self):
+        self._calendars = {}
+
+    def register(self, calendar_cls, calendar_id=0, **kwargs):
+        """Route callbacks of `calendar_id` to `calendar_cls(calendar_id=calendar_id, **kwargs)`."""
+        if str(calendar_id) in self._calendars:
+            raise ValueError("Calendar with id {} is already registered".format(calendar_id))
+        self._calendars[str(calendar_id)] = (calendar_cls, calendar_id, kwargs)
+
+    def unregister(self, calendar_id=0):
+        self._calendars.pop(str(calendar_id), None)
+
+    def __contains__(self, calendar_id):
+        return str(calendar_id) in self._calendars
+
+    def resolve(self, call_data):
+        """Return (payload, calendar) for the callback data or None if it is not routed here."""
+        payload = parse_callback(call_data)
+        if payload is None:
+            return None
+        try:
+            return payload, self._calendars[payload.calendar_id]
+        except KeyError:
+            return None
+
+    def func(self, telethon=False):
+        def inn(callback):
+            return self.resolve(callback.decode("utf-8") if telethon else callback.data) is not None
+
+        return inn
+
+    def calendar(self, call_data):
+        """Create the calendar the callback data belongs to. Raises KeyError for foreign data."""
+        resolved = self.resolve(call_data)
+        if resolved is None:
+            raise KeyError(call_data)
+        payload, (calendar_cls, calendar_id, kwargs) = resolved
+        return calendar_cls(calendar_id=calendar_id, **kwargs)
+
+    def process(self, call_data):
+        """Process the callback data by its calendar. Returns the same tuple as `TelegramCalendar.process()`."""
+        resolved = self.resolve(call_data)
+        if resolved is None:
+            return None, None, None
+        payload, (calendar_cls, calendar_id, kwargs) = resolved
+        return calendar_cls(calendar_id=calendar_id, **kwargs).process(payload)
@@ -0,0 +1,99 @@
+import threading
+
+
+class DisabledDates:
+    """
+    Days that can not be selected: weekdays (0 is Monday), explicit dates of any calendar system and a predicate.
+
+    The rules are compiled into one bitmap per month (bit `day - 1` is set for disabled days), so a rendered page
+    needs one lookup and the predicate is called once per day. Call `invalidate()` when the data behind the
+    predicate changes; `add()` and `remove()` invalidate the bitmaps themselves.
+
+        holidays = DisabledDates(weekdays=(5, 6), dates=[date(2025, 1, 1)], predicate=is_booked)
+        calendar = DetailedTelegramCalendar(disabled_dates=holidays)
+    """
+    maxsize = 4096
+
+    def __init__(self, weekdays=(), dates=(), predicate=None):
+        self.weekdays = frozenset(weekdays)
+        self.dates = set(dates)
+        self.predicate = predicate
+        # part of the keyboard cache key, keyboards rendered with old bitmaps are not used after invalidate()
+        self.version = 0
+        self._masks = {}
+        self._dates_by_month = {}
+        self._lock = threading.Lock()
+
+    def add(self, *dates):
+        self.dates.update(dates)
+        self.invalidate()
+
+    def remove(self, *dates):
+        self.dates.difference_update(dates)
+        self.invalidate()
+
+    def invalidate(self):
+        with self._lock:
+            self._masks = {}
+            self._dates_by_month = {}
+            self.version += 1
+
+    def mask(self, system, year, month):
+        """Bitmap of the disabled days of a month."""
+        key = (system, year, month)
+        masks = self._masks
+        try:
+            return masks[key]
+        except KeyError:
+            pass
+
+        mask = self._compile(system, year, month)
+        if len(masks) >= self.maxsize:
+            masks.clear()
+        masks[key] = mask
+        return mask
+
+    def is_disabled(self, system, d):
+        return bool(self.mask(system, d.year, d.month) >> (d.day - 1) & 1)
+
+    def _compile(self, system, year, month):
+        grid = system.month_grid(year, month)
+        mask = 0
+        if self.weekdays:
+            for day in range(1, grid.days + 1):
+                if (system.first_weekday + grid.offset + day - 1) % 7 in self.weekdays:
+                    mask |= 1 << (day - 1)
+        for day in self._month_dates(system).get((year, month), ()):
+            mask |= 1 << (day - 1)
+        if self.predicate is not None:
+            for day in range(1, grid.days + 1):
+                if not mask >> (day - 1) & 1 and self.predicate(system.date(year, month, day)):
+                    mask |= 1 << (day - 1)
+        return mask
+
+    def _month_dates(self, system):
+        """Days of `dates` by (year, month) of the system, converted once per invalidation."""
+        by_month = self._dates_by_month.get(system)
+        if by_month is None:
+            by_month = {}
+            with self._lock:
+                for year, month, day in system.from_dates(self.dates):
+                    by_month.setdefault((year, month), []).append(day)
+                self._dates_by_month[system] = by_month
+        return by_month
+
+    def __getstate__(self):
+        # the lock can not be pickled, the compiled bitmaps are rebuilt by the process that loads the rules
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_masks"] = {}
+        state["_dates_by_month"] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "DisabledDates(weekdays={}, dates={}, predicate={!r})".format(sorted(self.weekdays), len(self.dates),
+                                                                            self.predicate)
@@ -0,0 +1,124 @@
+import json
+import threading
+from json.encoder import encode_basestring_ascii
+
+from telegram_bot_calendar.lazy import module_installed, load_telethon_button
+
+# "json" is the standard library with the template serializer, the others are optional extras
+JSON_BACKENDS = ("json", "orjson", "ujson")
+
+
+class KeyboardSerializer:
+    """
+    Serializes keyboards to exactly the same JSON as `json.dumps({"inline_keyboard": buttons + additional_buttons})`.
+
+    The additional buttons are encoded once, and encoded cells are kept by (text, callback_data): weekday headers,
+    empty cells and navigation labels are only encoded the first time, the rest of the cells are concatenated from
+    their encoded text and callback data.
+    """
+    maxsize = 4096
+
+    def __init__(self, additional_buttons=()):
+        self.suffix = [json.dumps(row) for row in additional_buttons]
+        self._cells = {}
+
+    def dumps(self, buttons):
+        cell = self._cell
+        return '{"inline_keyboard": [' + ", ".join(["[" + ", ".join([cell(button) for button in row]) + "]"
+                                                    for row in buttons] + self.suffix) + ']}'
+
+    def _cell(self, button):
+        text = button.get("text")
+        callback_data = button.get("callback_data")
+        # only buttons built by _build_button are encoded by hand, the key order matters for the output
+        if len(button) != 2 or next(iter(button)) != "text" or text.__class__ not in (str, int) or \
+                callback_data.__class__ is not str:
+            return json.dumps(button)
+
+        key = (text, callback_data)
+        try:
+            return self._cells[key]
+        except KeyError:
+            pass
+
+        if len(self._cells) >= self.maxsize:
+            self._cells.clear()
+        encoded = self._cells[key] = '{"text": ' + (encode_basestring_ascii(text) if text.__class__ is str
+                                                    else int.__repr__(text)) + \
+            ', "callback_data": ' + encode_basestring_ascii(callback_data) + '}'
+        return encoded
+
+
+# serializers by encoded additional buttons, cleared when it grows over MAX_SERIALIZERS
+_serializers = {}
+_serializers_lock = threading.Lock()
+MAX_SERIALIZERS = 256
+
+
+def serializer_for(additional_buttons):
+    """Shared serializer of the calendars with the same additional buttons."""
+    key = json.dumps(additional_buttons)
+    try:
+        return _serializers[key]
+    except KeyError:
+        with _serializers_lock:
+            if len(_serializers) >= MAX_SERIALIZERS:
+                _serializers.clear()
+            return _serializers.setdefault(key, KeyboardSerializer(additional_buttons))
+
+
+class TelethonKeyboardBuilder:
+    """
+    Builds rows of `telethon.Button.inline` objects from the buttons of `_build_button`.
+
+    Cells that do not depend on the shown page (weekday headers, empty cells and navigation labels, i.e. all cells
+    with the `NOTHING` callback data of the calendar) are created once per locale and reused, only the buttons
+    of the dates are created on every render. Buttons that are already telethon objects are used as they are.
+    """
+    maxsize = 4096
+
+    def __init__(self):
+        self._cells = {}
+
+    def build(self, buttons, static_data):
+        inline = load_telethon_button().inline
+        cells = self._cells
+        keyboard = []
+        for row in buttons:
+            if not row:
+                continue
+            built = []
+            for button in row:
+                if not isinstance(button, dict):
+                    built.append(button)
+                    continue
+                text, callback_data = str(button["text"]), button.get("callback_data")
+                if callback_data != static_data:
+                    built.append(inline(text, callback_data))
+                    continue
+                key = (text, callback_data)
+                cell = cells.get(key)
+                if cell is None:
+                    if len(cells) >= self.maxsize:
+                        cells.clear()
+                    cell = cells[key] = inline(text, callback_data)
+                built.append(cell)
+            keyboard.append(built)
+        return keyboard
+
+
+telethon_builder = TelethonKeyboardBuilder()
+
+
+def resolve_json_backend(backend):
+    """Check the backend name, "auto" is orjson if it is installed and the standard library otherwise."""
+    if backend == "auto":
+        return "orjson" if module_installed("orjson") else "json"
+    if backend not in JSON_BACKENDS:
+        raise ValueError("Unknown json backend {!r}, use one of: auto, {}".format(backend, ", ".join(JSON_BACKENDS)))
+    if backend != "json" and not module_installed(backend):
+        raise ImportError(
+            "{0} is not installed. Please install {0} or use pip install persian-telegram-bot-calendar[{0}]".format(
+                backend)
+        )
+    return backend
@@ -0,0 +1,129 @@
+"""
+Session mode: buttons carry short opaque tokens and their callback data is kept in a store.
+"""
+import base64
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+# default lifetime of stored buttons in seconds
+SESSION_TTL = 7 * 24 * 3600
+
+
+def session_token(callback_data):
+    """Token of the callback data. Tokens are derived from the data, so the same button always gets the same token."""
+    digest = hashlib.blake2b(callback_data.encode("utf-8"), digest_size=6).digest()
+    return base64.urlsafe_b64encode(digest).decode("ascii")
+
+
+class SessionStore:
+    """
+    Storage of the callback data of session calendars by token. Subclasses implement `get_many` and `set_many`,
+    calendars write the buttons of a keyboard with one `set_many` call and read one token per update.
+    """
+
+    def get_many(self, tokens):
+        """Dict of the stored data of the tokens, unknown and expired tokens are missing."""
+        raise NotImplementedError
+
+    def set_many(self, items):
+        """Store a dict of token -> callback data."""
+        raise NotImplementedError
+
+    def get(self, token):
+        return self.get_many([token]).get(token)
+
+    def set(self, token, data):
+        self.set_many({token: data})
+
+
+class MemorySessionStore(SessionStore):
+    """In-process LRU store, entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize=100000, ttl=SESSION_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, tokens):
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for token in tokens:
+                entry = self._data.get(token)
+                if entry is None:
+                    continue
+                if entry[0] <= now:
+                    del self._data[token]
+                    continue
+                self._data.move_to_end(token)
+                found[token] = entry[1]
+        return found
+
+    def set_many(self, items):
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for token, data in items.items():
+                self._data[token] = (expires, data)
+                self._data.move_to_end(token)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Store in a local SQLite database file that is shared by the processes of the bot."""
+    # tokens per query, SQLite limits the number of query parameters
+    batch_size = 500
+
+    def __init__(self, path, ttl=SESSION_TTL):
+        import sqlite3
+
+        self.ttl = ttl
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS calendar_sessions "
+                "(token TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+
+    def get_many(self, tokens):
+        tokens = list(tokens)
+        found = {}
+        now = time.time()
+        with self._lock:
+            for i in range(0, len(tokens), self.batch_size):
+                batch = tokens[i:i + self.batch_size]
+                query = "SELECT token, data FROM calendar_sessions WHERE expires > ? AND token IN ({})".format(
+                    ",".join("?" * len(batch)))
+                found.update(self._connection.execute(query, [now] + batch).fetchall())
+        return found
+
+    def set_many(self, items):
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO calendar_sessions (token, data, expires) VALUES (?, ?, ?)",
+                    [(token, data, expires) for token, data in items.items()]
+                )
+                self._connection.execute("COMMIT")
+            except Exception:
+                # a failed batch (e.g. "database is locked") must not leave the connection in the transaction
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def prune(self):
+        """Delete expired entries."""
+        with self._lock:
+            self._connection.execute("DELETE FROM calendar_sessions WHERE expires <= ?", (time.time(),))
+
+    def close(self):
+        self._connection.close()
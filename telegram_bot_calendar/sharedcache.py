@@ -0,0 +1,240 @@
+"""
+Keyboard cache shared by the processes of one machine, e.g. the pre-fork workers of a webhook server.
+
+The keyboards are kept in one shared memory mapping: a header, a fixed-size open addressing index of 16 byte key
+digests and a data area where the keyboards are appended. When the index or the data area is full, the whole cache
+is cleared and refilled by the next renderings.
+"""
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import threading
+from datetime import date, time
+
+from telegram_bot_calendar.systems import CalendarSystem
+
+SHARED_CACHE_MAGIC = b"TBCSHM\0\0"
+SHARED_CACHE_VERSION = 1
+# magic, format version, index slots, data area size, end of the used data, number of entries
+_HEADER = struct.Struct(">8sHIQQI")
+# key digest, offset in the data area, size, value kind
+_ENTRY = struct.Struct(">16sQIB")
+_EMPTY = bytes(16)
+_STR, _BYTES, _PICKLE = 0, 1, 2
+
+
+class UnstableKey(TypeError):
+    """The cache key contains an object that is only meaningful in the current process."""
+
+
+def stable_key(key):
+    """
+    Text of a cache key that is the same in every process. Dates, times, strings, numbers, classes, calendar systems
+    and codecs are stable; other objects (disabled dates, availability providers, session stores) raise UnstableKey.
+    """
+    if isinstance(key, tuple):
+        return "(" + ",".join(map(stable_key, key)) + ",)"
+    if key is None or isinstance(key, (str, bytes, int, float, date, time)) or type(key).__module__ == "jdatetime":
+        return repr(key)
+    if isinstance(key, type):
+        return key.__module__ + "." + key.__qualname__
+    if isinstance(key, CalendarSystem):
+        return stable_key(type(key)) + ":" + key.name
+    if hasattr(key, "encode") and hasattr(key, "decode") and isinstance(getattr(key, "prefix", None), str):
+        # codecs are identified by their class and prefix
+        return stable_key(type(key)) + ":" + key.prefix
+    raise UnstableKey("{!r} can not be shared between processes".format(key))
+
+
+def key_digest(key):
+    digest = hashlib.blake2b(stable_key(key).encode("utf-8"), digest_size=16).digest()
+    # an all-zero digest marks empty slots
+    return digest if digest != _EMPTY else b"\1" + digest[1:]
+
+
+class SharedKeyboardCache:
+    """
+    Keyboard cache in shared memory with the interface of `KeyboardCache`.
+
+    Without `path` the memory is an anonymous mapping that is inherited by the processes forked after the cache was
+    created, so create it in the master process before the workers are forked. With `path` (e.g. a file in /dev/shm)
+    every process that opens the file uses the same cache. Keys that are only meaningful in one process are kept in
+    the per-process `local` cache.
+
+        class MyCalendar(DetailedTelegramCalendar):
+            cache = SharedKeyboardCache("/dev/shm/calendar-keyboards", slots=65536, data_size=256 * 2 ** 20)
+    """
+
+    def __init__(self, path=None, slots=16384, data_size=64 * 2 ** 20, local=None):
+        from telegram_bot_calendar.base import KeyboardCache
+
+        self.path = path
+        self.local = KeyboardCache() if local is None else local
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._thread_lock = threading.Lock()
+        self._fd = None
+        if path is None:
+            import multiprocessing
+
+            self._process_lock = multiprocessing.Lock()
+            self._init_memory(mmap.mmap(-1, self._total_size(slots, data_size)), slots, data_size, new=True)
+        else:
+            self._process_lock = None
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            with self._lock():
+                new = os.fstat(self._fd).st_size == 0
+                if new:
+                    os.ftruncate(self._fd, self._total_size(slots, data_size))
+                self._init_memory(mmap.mmap(self._fd, 0), slots, data_size, new)
+
+    @staticmethod
+    def _total_size(slots, data_size):
+        return _HEADER.size + slots * _ENTRY.size + data_size
+
+    def _init_memory(self, memory, slots, data_size, new):
+        self._memory = memory
+        if new:
+            _HEADER.pack_into(memory, 0, SHARED_CACHE_MAGIC, SHARED_CACHE_VERSION, slots, data_size, 0, 0)
+        magic, version, slots, data_size, _, _ = _HEADER.unpack_from(memory)
+        if magic != SHARED_CACHE_MAGIC:
+            raise ValueError("{} is not a shared keyboard cache".format(self.path))
+        if version != SHARED_CACHE_VERSION:
+            raise ValueError("Shared cache version {} is not supported, expected {}".format(
+                version, SHARED_CACHE_VERSION))
+        # the sizes of an existing file are used
+        self.slots = slots
+        self.data_size = data_size
+        self._data_start = _HEADER.size + slots * _ENTRY.size
+
+    @property
+    def maxsize(self):
+        # the index is kept at most 3/4 full so the probe sequences stay short
+        return self.slots * 3 // 4
+
+    def _lock(self):
+        return _ProcessLock(self)
+
+    def _find(self, digest):
+        """Position of the slot of the digest, or of the empty slot where it would be stored."""
+        memory = self._memory
+        slot = int.from_bytes(digest[:8], "big") % self.slots
+        while True:
+            position = _HEADER.size + slot * _ENTRY.size
+            stored = memory[position:position + 16]
+            if stored == digest or stored == _EMPTY:
+                return position, stored == digest
+            slot = (slot + 1) % self.slots
+
+    def get(self, key):
+        try:
+            digest = key_digest(key)
+        except UnstableKey:
+            return self.local.get(key)
+
+        with self._lock():
+            position, found = self._find(digest)
+            if found:
+                _, offset, size, kind = _ENTRY.unpack_from(self._memory, position)
+                start = self._data_start + offset
+                blob = self._memory[start:start + size]
+        if not found:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if kind == _STR:
+            return blob.decode("utf-8")
+        return blob if kind == _BYTES else pickle.loads(blob)
+
+    def set(self, key, value):
+        try:
+            digest = key_digest(key)
+        except UnstableKey:
+            self.local.set(key, value)
+            return
+
+        if isinstance(value, str):
+            kind, blob = _STR, value.encode("utf-8")
+        elif isinstance(value, bytes):
+            kind, blob = _BYTES, value
+        else:
+            kind, blob = _PICKLE, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.data_size:
+            return
+
+        with self._lock():
+            memory = self._memory
+            _, _, _, _, end, count = _HEADER.unpack_from(memory)
+            position, found = self._find(digest)
+            if end + len(blob) > self.data_size or not found and count >= self.maxsize:
+                self.evictions += count
+                self._reset()
+                end = count = 0
+                position, found = self._find(digest)
+            start = self._data_start + end
+            memory[start:start + len(blob)] = blob
+            _ENTRY.pack_into(memory, position, digest, end, len(blob), kind)
+            _HEADER.pack_into(memory, 0, SHARED_CACHE_MAGIC, SHARED_CACHE_VERSION, self.slots, self.data_size,
+                              end + len(blob), count + (not found))
+
+    def _reset(self):
+        self._memory[_HEADER.size:self._data_start] = bytes(self._data_start - _HEADER.size)
+        _HEADER.pack_into(self._memory, 0, SHARED_CACHE_MAGIC, SHARED_CACHE_VERSION, self.slots, self.data_size, 0, 0)
+
+    def clear(self):
+        with self._lock():
+            self._reset()
+        self.local.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        _, _, _, _, end, count = _HEADER.unpack_from(self._memory)
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": count, "maxsize": self.maxsize, "bytes": end, "data_size": self.data_size}
+
+    def close(self):
+        self._memory.close()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __len__(self):
+        return _HEADER.unpack_from(self._memory)[5]
+
+    def __contains__(self, key):
+        try:
+            digest = key_digest(key)
+        except UnstableKey:
+            return key in self.local
+        with self._lock():
+            return self._find(digest)[1]
+
+
+class _ProcessLock:
+    """Lock of the threads of this process and of the other processes using the cache."""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def __enter__(self):
+        cache = self.cache
+        cache._thread_lock.acquire()
+        if cache._process_lock is not None:
+            cache._process_lock.acquire()
+        elif cache._fd is not None:
+            import fcntl
+
+            fcntl.flock(cache._fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc):
+        cache = self.cache
+        if cache._process_lock is not None:
+            cache._process_lock.release()
+        elif cache._fd is not None:
+            import fcntl
+
+            fcntl.flock(cache._fd, fcntl.LOCK_UN)
+        cache._thread_lock.release()
@@ -1,3 +1,22 @@
+CB_CALENDAR = "cbcal"
+
+YEAR = 'y'
+MONTH = 'm'
+DAY = 'd'
+WEEK = 'w'
+HOUR = 'h'
+MINUTE = 'i'
+# steps whose callback data has a time of day
+TIME_STEPS = (HOUR, MINUTE)
+SELECT = "s"
+GOTO = "g"
+NOTHING = "n"
+# end of the selection of a multi-select calendar
+DONE = "f"
+# session token, the action of the button is in the session store
+TOKEN = "t"
+LSTEP = {'y': 'year', 'm': 'month', 'd': 'day', 'w': 'week', 'h': 'hour', 'i': 'minute'}
+
 MONTHS = {
     'en': ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"],
     'eo': ["jan", "feb", "mar", "apr", "maj", "jun", "jul", "aŭg", "sep", "okt", "nov", "dec"],
@@ -0,0 +1,193 @@
+import sys
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from telegram_bot_calendar.convert import jalali_to_ordinal, ordinal_to_jalali, jalali_days_in_month, jalali_weekday
+from telegram_bot_calendar.grid import MonthGrid
+from telegram_bot_calendar.lazy import load_jdatetime
+
+
+class CalendarSystem:
+    """
+    Dates of one calendar system. Calendars resolve the system of their locale once and render through it, so a new
+    calendar system (e.g. Hijri or Hebrew) only needs a subclass and `register_system`.
+
+    Subclasses define `date_cls`, `datetime_cls`, `min_date`, `max_date`, `from_date`, `_days_in_month` and
+    `_month_offset`.
+    """
+    name = None
+    months_in_year = 12
+    # weekday (0 is Monday) of the first column of the week header
+    first_weekday = 0
+
+    @property
+    def date_cls(self):
+        raise NotImplementedError
+
+    @property
+    def datetime_cls(self):
+        raise NotImplementedError
+
+    @property
+    def min_date(self):
+        raise NotImplementedError
+
+    @property
+    def max_date(self):
+        raise NotImplementedError
+
+    def is_date(self, d):
+        return isinstance(d, self.date_cls)
+
+    def date(self, year, month, day):
+        return self.date_cls(year, month, day)
+
+    def datetime(self, year, month, day, hour=0, minute=0):
+        return self.datetime_cls(year, month, day, hour, minute)
+
+    def today(self):
+        return self.date_cls.today()
+
+    def from_date(self, d):
+        """The same day as a date of this system, `d` can be a date of any registered system."""
+        raise NotImplementedError
+
+    def from_dates(self, dates):
+        """(year, month, day) of this system of many dates, subclasses convert them in bulk."""
+        return [(d.year, d.month, d.day) for d in map(self.from_date, dates)]
+
+    def _days_in_month(self, year, month):
+        raise NotImplementedError
+
+    def _month_offset(self, year, month):
+        """Position of the first day of the month in the week header."""
+        raise NotImplementedError
+
+    @lru_cache(maxsize=4096)
+    def month_lengths(self, year):
+        return tuple(self._days_in_month(year, month) for month in range(1, self.months_in_year + 1))
+
+    def days_in_month(self, year, month):
+        return self.month_lengths(year)[month - 1]
+
+    def days_in_year(self, year):
+        return sum(self.month_lengths(year))
+
+    @lru_cache(maxsize=4096)
+    def month_grid(self, year, month):
+        return MonthGrid(year, month, self._month_offset(year, month), self.days_in_month(year, month))
+
+    def shift_months(self, d, months):
+        """Move the date by a number of months keeping the day when it exists in the target month."""
+        year, month = divmod(d.month - 1 + months, self.months_in_year)
+        year += d.year
+        month += 1
+        return d.replace(year=year, month=month, day=min(d.day, self.days_in_month(year, month)))
+
+    def shift_days(self, d, days):
+        return d + timedelta(days=days)
+
+    def __repr__(self):
+        return "<{} calendar system>".format(self.name)
+
+
+class GregorianSystem(CalendarSystem):
+    name = "gregorian"
+    date_cls = date
+    datetime_cls = datetime
+    min_date = date(1800, 1, 1)
+    max_date = date(2999, 12, 31)
+    _lengths = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+    def from_date(self, d):
+        return d if isinstance(d, date) else date.fromordinal(jalali_to_ordinal(d.year, d.month, d.day))
+
+    def from_dates(self, dates):
+        dates = list(dates)
+        jalali = [d for d in dates if not isinstance(d, date)]
+        if not jalali:
+            return [(d.year, d.month, d.day) for d in dates]
+        ordinals = jalali_to_ordinal([d.year for d in jalali], [d.month for d in jalali], [d.day for d in jalali])
+        converted = (date.fromordinal(int(ordinal)) for ordinal in ordinals)
+        return [(d.year, d.month, d.day) for d in (d if isinstance(d, date) else next(converted) for d in dates)]
+
+    def _days_in_month(self, year, month):
+        if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+            return 29
+        return self._lengths[month - 1]
+
+    def _month_offset(self, year, month):
+        # week starts on Monday
+        return date(year, month, 1).weekday()
+
+
+class JalaliSystem(CalendarSystem):
+    name = "jalali"
+    first_weekday = 5
+
+    @property
+    def date_cls(self):
+        return load_jdatetime().date
+
+    @property
+    def datetime_cls(self):
+        return load_jdatetime().datetime
+
+    @property
+    def min_date(self):
+        return self.date_cls(1300, 1, 1)
+
+    @property
+    def max_date(self):
+        return self.date_cls(1499, 12, 29)
+
+    def is_date(self, d):
+        # a jalali date can only exist if jdatetime has been imported
+        jdatetime = sys.modules.get("jdatetime")
+        return jdatetime is not None and isinstance(d, jdatetime.date)
+
+    def from_date(self, d):
+        return d if self.is_date(d) else self.date_cls(*ordinal_to_jalali(d.toordinal()))
+
+    def from_dates(self, dates):
+        dates = list(dates)
+        gregorian = [d for d in dates if not self.is_date(d)]
+        if not gregorian:
+            return [(d.year, d.month, d.day) for d in dates]
+        years, months, days = ordinal_to_jalali([d.toordinal() for d in gregorian])
+        converted = zip(map(int, years), map(int, months), map(int, days))
+        return [(d.year, d.month, d.day) if self.is_date(d) else next(converted) for d in dates]
+
+    def _days_in_month(self, year, month):
+        return jalali_days_in_month(year, month)
+
+    def _month_offset(self, year, month):
+        # week starts on Saturday which is weekday 0 of jdatetime
+        return jalali_weekday(jalali_to_ordinal(year, month, 1))
+
+
+GREGORIAN = GregorianSystem()
+JALALI = JalaliSystem()
+
+# calendar system by locale, locales that are not here use GREGORIAN
+SYSTEMS = {"fa": JALALI}
+
+
+def register_system(locale, system):
+    SYSTEMS[locale] = system
+
+
+def get_system(locale):
+    return SYSTEMS.get(locale, GREGORIAN)
+
+
+def system_of(d):
+    """Calendar system of a date object."""
+    for system in SYSTEMS.values():
+        if system.is_date(d):
+            return system
+    return GREGORIAN
+
+
+def shift_months(d, months):
+    return system_of(d).shift_months(d, months)
@@ -0,0 +1,150 @@
+from datetime import time
+from functools import lru_cache
+
+from telegram_bot_calendar.base import STYLE_ATTRIBUTES, DAY, HOUR, MINUTE, GOTO, SELECT, NOTHING, rows
+from telegram_bot_calendar.detailed import DetailedTelegramCalendar, STEPS, PREV_STEPS, PREV_ACTIONS
+
+
+@lru_cache(maxsize=256)
+def time_grid(hour_step=1, minute_step=15, min_time=None, max_time=None):
+    """
+    Times of the buttons of one configuration: ((hour, (minute, ...)), ...) of the hours that have a minute between
+    `min_time` and `max_time`. The grid does not depend on the date, so it is computed once per configuration.
+    """
+    grid = []
+    for hour in range(0, 24, hour_step):
+        minutes = tuple(minute for minute in range(0, 60, minute_step)
+                        if (min_time is None or time(hour, minute) >= min_time) and
+                        (max_time is None or time(hour, minute) <= max_time))
+        if minutes:
+            grid.append((hour, minutes))
+    return tuple(grid)
+
+
+class DateTimeTelegramCalendar(DetailedTelegramCalendar):
+    """
+    Date and time selection: the selected day is followed by the hours of the day and the minutes of the selected
+    hour, `process()` returns a `datetime` (`jdatetime.datetime` for Jalali calendars).
+
+    The hours and minutes are every `hour_step` hours and `minute_step` minutes between `min_time` and `max_time`,
+    they can be set as class attributes or arguments.
+    """
+    steps = dict(STEPS, **{DAY: HOUR, HOUR: MINUTE})
+    prev_steps = dict(PREV_STEPS, **{HOUR: DAY, MINUTE: HOUR})
+    prev_actions = dict(PREV_ACTIONS, **{HOUR: GOTO, MINUTE: GOTO})
+    hour_step = 1
+    minute_step = 15
+    min_time = None
+    max_time = None
+    size_hour = 4
+    size_minute = 4
+    time_button = "{hour}:{minute}"
+    middle_button_hour = "{day} {month} {year}"
+    middle_button_minute = "{day} {month} {hour}:00"
+    style_attributes = STYLE_ATTRIBUTES + ('hour_step', 'minute_step', 'min_time', 'max_time', 'size_hour',
+                                           'size_minute', 'time_button', 'middle_button_hour', 'middle_button_minute')
+
+    def __init__(self, calendar_id=0, current_date=None, additional_buttons=None, locale='en', min_date=None,
+                 max_date=None, telethon=False, min_time=None, max_time=None, hour_step=None, minute_step=None,
+                 **kwargs):
+        super().__init__(calendar_id, current_date, additional_buttons, locale, min_date, max_date, telethon, **kwargs)
+        for name, value in (('min_time', min_time), ('max_time', max_time), ('hour_step', hour_step),
+                            ('minute_step', minute_step)):
+            if value is not None:
+                setattr(self, name, value)
+
+        # the time of a datetime is kept apart, the date steps work with dates
+        d = self.current_date
+        self.current_hour = getattr(d, "hour", 0)
+        self.current_minute = getattr(d, "minute", 0)
+        self.current_date = self.system.date(d.year, d.month, d.day)
+        self.nav_buttons[HOUR] = [self.prev_button, self.middle_button_hour, self.next_button]
+        self.nav_buttons[MINUTE] = [self.prev_button, self.middle_button_minute, self.next_button]
+
+    def _time_grid(self):
+        return time_grid(self.hour_step, self.minute_step, self.min_time, self.max_time)
+
+    def _valid_time(self, hour, minute):
+        return minute in dict(self._time_grid()).get(hour, ())
+
+    def _resolve(self, payload):
+        result, step = super()._resolve(payload)
+        if payload is None or payload.hour is None:
+            return result, step
+
+        self.current_hour, self.current_minute = payload.hour, payload.minute
+        if result is None:
+            return None, step
+        if not self._valid_time(payload.hour, payload.minute):
+            return None, MINUTE
+        return self.system.datetime(result.year, result.month, result.day, payload.hour, payload.minute), step
+
+    def _page_anchor(self, step):
+        if step == MINUTE:
+            d = self.current_date
+            return self.system.datetime(d.year, d.month, d.day, self.current_hour)
+        return super()._page_anchor(step)
+
+    def _build(self, step=None):
+        step = step or self.first_step
+        if step == HOUR:
+            self.step = step
+            self._build_cached(step, self._build_hours)
+        elif step == MINUTE:
+            self.step = step
+            self._build_cached(step, self._build_minutes)
+        else:
+            super()._build(step)
+
+    def _time_data(self, hour, minute=0):
+        d = self.current_date
+        return {"year": str(d.year), "month": self.months[self.locale][d.month - 1], "day": str(d.day),
+                "hour": "{:02d}".format(hour), "minute": "{:02d}".format(minute), "locale": self.locale}
+
+    def _time_rows(self, buttons, size):
+        empty = self._build_button(self.empty_day_button, NOTHING, locale=self.locale)
+        return rows(buttons + [empty] * (-len(buttons) % size), size)
+
+    def _build_hours(self):
+        d = self.current_date
+        buttons = [self._build_button(self.time_button.format(**self._time_data(hour, minutes[0])), SELECT, HOUR,
+                                      self.system.datetime(d.year, d.month, d.day, hour, minutes[0]),
+                                      locale=self.locale)
+                   for hour, minutes in self._time_grid()]
+
+        prev_day, next_day = self.system.shift_days(d, -1), self.system.shift_days(d, 1)
+        nav_buttons = self._time_nav_buttons(
+            HOUR, DAY, d, self._time_data(0),
+            prev_day if not self.min_date or prev_day >= self.min_date else None,
+            next_day if not self.max_date or next_day <= self.max_date else None)
+        self._keyboard = self._build_keyboard(self._time_rows(buttons, self.size_hour) + nav_buttons)
+
+    def _build_minutes(self):
+        d = self.current_date
+        grid = self._time_grid()
+        hours = [hour for hour, _ in grid]
+        minutes = dict(grid).get(self.current_hour, ())
+        buttons = [self._build_button(self.time_button.format(**self._time_data(self.current_hour, minute)), SELECT,
+                                      MINUTE, self.system.datetime(d.year, d.month, d.day, self.current_hour, minute),
+                                      locale=self.locale)
+                   for minute in minutes]
+
+        # the neighbour pages are the previous and the next hour of the day
+        index = hours.index(self.current_hour) if self.current_hour in hours else None
+        prev_hour = hours[index - 1] if index else None
+        next_hour = hours[index + 1] if index is not None and index + 1 < len(hours) else None
+        nav_buttons = self._time_nav_buttons(
+            MINUTE, HOUR, d, self._time_data(self.current_hour),
+            None if prev_hour is None else self.system.datetime(d.year, d.month, d.day, prev_hour),
+            None if next_hour is None else self.system.datetime(d.year, d.month, d.day, next_hour))
+        self._keyboard = self._build_keyboard(self._time_rows(buttons, self.size_minute) + nav_buttons)
+
+    def _time_nav_buttons(self, step, up_step, page, data, prev_page, next_page):
+        text = self.nav_buttons[step]
+        return [[
+            self._build_button(text[0].format(**data) if prev_page else self.empty_nav_button,
+                               GOTO if prev_page else NOTHING, step, prev_page, locale=self.locale),
+            self._build_button(text[1].format(**data), GOTO, up_step, page, locale=self.locale),
+            self._build_button(text[2].format(**data) if next_page else self.empty_nav_button,
+                               GOTO if next_page else NOTHING, step, next_page, locale=self.locale),
+        ]]
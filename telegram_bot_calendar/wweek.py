@@ -0,0 +1,88 @@
+from telegram_bot_calendar.base import *
+from telegram_bot_calendar.detailed import DetailedTelegramCalendar
+
+
+class WWeekTelegramCalendar(DetailedTelegramCalendar):
+    """
+    Strip of `weeks` weeks paged week by week. The days are sliced from the cached month grids and the pages are
+    moved by a number of days, so Gregorian and Jalali calendars work the same way.
+    """
+    first_step = WEEK
+    weeks = 1
+    middle_button_week = "{month} {year}"
+    style_attributes = STYLE_ATTRIBUTES + ('weeks', 'middle_button_week')
+
+    def __init__(self, calendar_id=0, current_date=None, additional_buttons=None,
+                 locale='en', min_date=None, max_date=None, telethon=False, **kwargs):
+        super().__init__(calendar_id, current_date, additional_buttons, locale,
+                         min_date, max_date, telethon, **kwargs)
+        self.nav_buttons[WEEK] = [self.prev_button, self.middle_button_week, self.next_button]
+
+    def _build(self, step=None):
+        if (step or self.first_step) != WEEK:
+            super()._build(step)
+            return
+        self.step = WEEK
+        self._build_cached(WEEK, self._build_weeks)
+
+    def _week_days(self, start):
+        """(year, month, day) of the days of the strip starting at `start`."""
+        count = 7 * self.weeks
+        days = []
+        year, month, day = start.year, start.month, start.day
+        while len(days) < count:
+            grid = self.system.month_grid(year, month)
+            index = grid.offset + day - 1
+            # the cells after the last day of the month are 0, the strip continues in the next month
+            days += [(year, month, d) for d in grid.cells[index:index + count - len(days)] if d]
+            year, month, day = (year, month + 1, 1) if month < self.system.months_in_year else (year + 1, 1, 1)
+        return days
+
+    def _availability_bounds(self, step):
+        if step != WEEK:
+            return super()._availability_bounds(step)
+        if self.availability is None:
+            return None
+        start = self._page_anchor(WEEK)
+        end = self.system.shift_days(start, 7 * self.weeks - 1)
+        return start.replace(day=1), end.replace(day=self.system.days_in_month(end.year, end.month))
+
+    def _build_weeks(self):
+        self._load_availability(WEEK)
+        start = self._page_anchor(WEEK)
+        masks = {}
+        buttons = []
+        for year, month, day in self._week_days(start):
+            d = self.system.date(year, month, day)
+            if not self._valid_date(d):
+                buttons.append(self._build_button(self.empty_day_button, NOTHING, locale=self.locale))
+                continue
+            if (year, month) not in masks:
+                masks[year, month] = self._disabled_mask(year, month)
+            if masks[year, month] >> (day - 1) & 1:
+                buttons.append(self._build_button(self.disabled_day_button.format(day=day), NOTHING,
+                                                  locale=self.locale))
+            else:
+                buttons.append(self._build_button(day, SELECT, DAY, d, locale=self.locale))
+
+        days_of_week_buttons = [[self._build_button(self.days_of_week[self.locale][i], NOTHING, locale=self.locale)
+                                 for i in range(7)]]
+        self._keyboard = self._build_keyboard(days_of_week_buttons + rows(buttons, 7) + self._week_nav_buttons(start))
+
+    def _week_nav_buttons(self, start):
+        days = 7 * self.weeks
+        prev_page = self.system.shift_days(start, -days)
+        next_page = self.system.shift_days(start, days)
+        prev_exists = self.system.shift_days(start, -1) >= self.min_date if self.min_date else True
+        next_exists = next_page <= self.max_date if self.max_date else True
+
+        text = self.nav_buttons[WEEK]
+        data = {"year": str(start.year), "month": self.months[self.locale][start.month - 1], "day": str(start.day),
+                "locale": self.locale}
+        return [[
+            self._build_button(text[0].format(**data) if prev_exists else self.empty_nav_button,
+                               GOTO if prev_exists else NOTHING, WEEK, prev_page, locale=self.locale),
+            self._build_button(text[1].format(**data), GOTO, DAY, start, locale=self.locale),
+            self._build_button(text[2].format(**data) if next_exists else self.empty_nav_button,
+                               GOTO if next_exists else NOTHING, WEEK, next_page, locale=self.locale),
+        ]]
@@ -0,0 +1,52 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+from telegram_bot_calendar import DetailedTelegramCalendar, DAY, MONTH, YEAR
+from telegram_bot_calendar.base import KeyboardCache
+
+
+def test_abuild_aprocess_same_as_sync():
+    async def run():
+        calendar = DetailedTelegramCalendar(current_date=date(2021, 1, 12))
+        return (await calendar.abuild(),
+                await calendar.aprocess('cbcal_0_s_y_2020_1_1_en'),
+                await calendar.aprocess('cbcal_0_s_d_2021_11_13_en'),
+                await calendar.aprocess('cbcal_0_n'))
+
+    built, processed, selected, nothing = asyncio.run(run())
+    assert built == DetailedTelegramCalendar(current_date=date(2021, 1, 12)).build()
+    assert processed == DetailedTelegramCalendar().process('cbcal_0_s_y_2020_1_1_en')
+    assert processed[2] == MONTH
+    assert selected == (date(2021, 11, 13), None, DAY)
+    assert nothing == (None, None, None)
+
+
+def test_concurrent_renders_coalesced():
+    renders = []
+
+    class SlowCalendar(DetailedTelegramCalendar):
+        cache = KeyboardCache()
+
+        def _build_years(self):
+            renders.append(threading.current_thread().name)
+            time.sleep(0.05)
+            super()._build_years()
+
+    async def run(executor):
+        calendars = [SlowCalendar(current_date=date(2026, 10, d)) for d in range(1, 11)]
+        return await asyncio.gather(*(calendar.abuild(executor) for calendar in calendars))
+
+    with ThreadPoolExecutor(4, thread_name_prefix='render') as executor:
+        results = asyncio.run(run(executor))
+
+    assert len(renders) == 1 and renders[0].startswith('render')
+    assert all(result == (results[0][0], YEAR) for result in results)
+    # one lookup per request, the rendering does not look the page up again
+    assert SlowCalendar.cache.stats()['misses'] == 10 and len(SlowCalendar.cache) == 1
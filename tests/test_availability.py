@@ -0,0 +1,119 @@
+import asyncio
+import json
+import os
+import sys
+from datetime import date
+
+import jdatetime
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+from telegram_bot_calendar import DetailedTelegramCalendar, WWeekTelegramCalendar, MemoryAvailability, \
+    CachedAvailability, DAY, MONTH
+from telegram_bot_calendar.availability import AvailabilityProvider
+
+
+class CountingAvailability(MemoryAvailability):
+    def __init__(self, dates=()):
+        super().__init__(dates)
+        self.calls = []
+
+    def unavailable(self, start, end):
+        self.calls.append((start, end))
+        return super().unavailable(start, end)
+
+
+class AsyncOnlyAvailability(AvailabilityProvider):
+    def __init__(self, dates):
+        self.dates = dates
+
+    def unavailable(self, start, end):
+        raise AssertionError('the sync method must not be used by aprocess()')
+
+    async def aunavailable(self, start, end):
+        await asyncio.sleep(0)
+        return [d for d in self.dates if start <= d <= end]
+
+
+def texts(keyboard):
+    return [button['text'] for row in json.loads(keyboard)['inline_keyboard'] for button in row]
+
+
+def test_one_call_per_page():
+    provider = CountingAvailability([date(2025, 3, 4), date(2025, 3, 5), date(2025, 4, 1)])
+    calendar = DetailedTelegramCalendar(current_date=date(2025, 3, 10), availability=provider)
+    calendar._build(step=DAY)
+    assert provider.calls == [(date(2025, 3, 1), date(2025, 3, 31))]
+    day_texts = texts(calendar._keyboard)
+    assert day_texts.count('×') == 2 and 4 not in day_texts and 6 in day_texts
+
+    calendar._build(step=MONTH)
+    assert provider.calls[1:] == [(date(2025, 1, 1), date(2025, 12, 31))]
+
+
+def test_cached_keyboard_follows_availability():
+    provider = CountingAvailability()
+    first = DetailedTelegramCalendar(current_date=date(2025, 3, 10), availability=provider)
+    first._build(step=DAY)
+    second = DetailedTelegramCalendar(current_date=date(2025, 3, 20), availability=provider)
+    second._build(step=DAY)
+    assert second._keyboard is first._keyboard
+
+    provider.dates.add(date(2025, 3, 4))
+    third = DetailedTelegramCalendar(current_date=date(2025, 3, 20), availability=provider)
+    third._build(step=DAY)
+    assert texts(third._keyboard).count('×') == 1
+
+
+def test_unavailable_month():
+    provider = MemoryAvailability([date(2025, 2, day) for day in range(1, 29)])
+    calendar = DetailedTelegramCalendar(current_date=date(2025, 3, 10), availability=provider)
+    calendar._build(step=MONTH)
+    month_texts = texts(calendar._keyboard)
+    assert 'Feb' not in month_texts and 'Jan' in month_texts and 'Mar' in month_texts
+
+
+def test_jalali_page_bounds():
+    provider = CountingAvailability([date(2025, 3, 21)])
+    calendar = DetailedTelegramCalendar(current_date=jdatetime.date(1404, 1, 10), locale='fa', availability=provider)
+    calendar._build(step=DAY)
+    assert provider.calls == [(jdatetime.date(1404, 1, 1), jdatetime.date(1404, 1, 31))]
+    assert calendar._disabled_mask(1404, 1) == 1
+
+
+def test_ttl_cache(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('telegram_bot_calendar.availability.time.monotonic', lambda: now[0])
+    provider = CountingAvailability([date(2025, 3, 4)])
+    cached = CachedAvailability(provider, ttl=10)
+
+    for _ in range(3):
+        assert cached.unavailable(date(2025, 3, 1), date(2025, 3, 31)) == {date(2025, 3, 4)}
+    assert len(provider.calls) == 1
+
+    now[0] += 11
+    cached.unavailable(date(2025, 3, 1), date(2025, 3, 31))
+    assert len(provider.calls) == 2
+
+    cached.invalidate()
+    cached.unavailable(date(2025, 3, 1), date(2025, 3, 31))
+    assert len(provider.calls) == 3
+
+
+def test_async_provider():
+    provider = CachedAvailability(AsyncOnlyAvailability([date(2025, 3, 4)]))
+
+    async def run():
+        calendar = DetailedTelegramCalendar(availability=provider)
+        return await calendar.aprocess('cbcal_0_g_d_2025_3_1_en')
+
+    result, keyboard, step = asyncio.run(run())
+    assert step == DAY and texts(keyboard).count('×') == 1
+
+
+def test_week_page_spanning_months():
+    provider = CountingAvailability([date(2025, 4, 1)])
+    calendar = WWeekTelegramCalendar(current_date=date(2025, 3, 31), availability=provider)
+    calendar.build()
+    assert provider.calls == [(date(2025, 3, 1), date(2025, 4, 30))]
+    assert texts(calendar._keyboard).count('×') == 1
@@ -5,7 +5,8 @@ from types import SimpleNamespace
 
 myPath = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, myPath + '/../')
-from telegram_bot_calendar.base import YEAR, MONTH, DAY, max_date, min_date, TelegramCalendar, CB_CALENDAR
+from telegram_bot_calendar.base import YEAR, MONTH, DAY, max_date, min_date, TelegramCalendar, CB_CALENDAR, KeyboardCache
+from telegram_bot_calendar.callback import CallbackPayload, parse_callback, TEXT_CODEC, COMPACT_CODEC
 
 
 @pytest.mark.parametrize(('given', 'step', 'max_d'), [(date(2019, 5, 2), YEAR, date(2019, 12, 31)),
@@ -49,3 +50,41 @@ def test__get_period(min_date, max_date, step, start, diff, period):
                           (22, 'cbcal_22_n', True), ])
 def test_func(calendar_id, callback_data, passed):
     assert TelegramCalendar.func(calendar_id)(SimpleNamespace(data=callback_data)) == passed
+
+
+def test_keyboard_cache_lru():
+    cache = KeyboardCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'evictions': 1, 'size': 2, 'maxsize': 2}
+
+
+@pytest.mark.parametrize(('callback_data', 'payload'),
+                         [('cbcal_0_g_y_2017_1_13_en', CallbackPayload('0', 'g', 'y', 2017, 1, 13, 'en')),
+                          ('cbcal_1_s_d_2016_8_25_971574741092873836', CallbackPayload('1', 's', 'd', 2016, 8, 25)),
+                          ('CALENDAR_5_s_m_1402_7_1_fa', CallbackPayload('5', 's', 'm', 1402, 7, 1, 'fa')),
+                          ('cbcal_22_n', CallbackPayload('22', 'n')),
+                          ('cbcal_0_s_d_2016_x_25_en', None),
+                          ('cbcal_0_g_y', None),
+                          ('something_irrelevant', None), ])
+def test_parse_callback(callback_data, payload):
+    assert parse_callback(callback_data) == payload
+
+
+@pytest.mark.parametrize(('calendar_id', 'action', 'step', 'date_obj', 'locale'),
+                         [(0, 's', 'd', date(2026, 10, 18), 'en'),
+                          ('booking.room_42', 'g', 'y', date(1800, 1, 1), 'fa'),
+                          (3, 'g', 'm', date(2999, 12, 31), 'yourtransl'),
+                          (7, 'n', None, None, None)])
+def test_codecs_round_trip(calendar_id, action, step, date_obj, locale):
+    expected = CallbackPayload(str(calendar_id), action, step, *(date_obj.timetuple()[:3] if date_obj else ()),
+                               locale=locale)
+    compact = COMPACT_CODEC.encode(calendar_id, action, step, date_obj, locale)
+
+    assert parse_callback(compact) == expected
+    assert len(compact) < len(TEXT_CODEC.encode(calendar_id, action, step, date_obj, locale)) or action == 'n'
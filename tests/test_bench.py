@@ -0,0 +1,35 @@
+import json
+import os
+import sys
+
+import pytest
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+from telegram_bot_calendar import bench
+
+
+def test_bench_baseline(tmp_path):
+    baseline = str(tmp_path / 'baseline.json')
+    bench.main(['--number', '2', '--save', baseline, 'build', 'process'])
+
+    with open(baseline) as f:
+        results = json.load(f)
+    assert 'build/DetailedTelegramCalendar/fa/bounds/json/nocache' in results
+    assert set(results['process/WYearTelegramCalendar/en/nobounds/json/cached']) == \
+        {'ops', 'p50_us', 'p99_us', 'peak_bytes'}
+
+    assert bench.main(['--number', '2', '--compare', baseline, 'build']) in (0, 1)
+
+
+def test_compare():
+    baseline = {'build/a': {'ops': 100.0, 'p50_us': 10.0, 'peak_bytes': 5}}
+    changes = bench.compare({'build/a': {'ops': 80.0, 'p50_us': 5.0, 'peak_bytes': 50}}, baseline)
+
+    assert changes == {('build/a', 'ops'): pytest.approx(-0.2), ('build/a', 'p50_us'): pytest.approx(0.5)}
+
+
+def test_bench_convert():
+    results = bench.run(['convert'], number=50)
+    assert set(results) == {'convert/to_jalali', 'convert/to_gregorian'}
+    assert results['convert/to_jalali']['python_us'] > 0
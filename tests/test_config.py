@@ -0,0 +1,110 @@
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import jdatetime
+import pytest
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+from telegram_bot_calendar import DetailedTelegramCalendar, WMonthTelegramCalendar, CalendarConfig, render, handle, \
+    MemorySessionStore, render_many, DAY, MONTH, YEAR
+
+
+@pytest.mark.parametrize(('calendar_cls', 'locale', 'current_date', 'step'),
+                         [(DetailedTelegramCalendar, 'en', date(2026, 10, 18), None),
+                          (DetailedTelegramCalendar, 'ru', date(2026, 10, 18), DAY),
+                          (WMonthTelegramCalendar, 'fa', jdatetime.date(1405, 7, 26), None),
+                          (WMonthTelegramCalendar, 'fa', jdatetime.date(1405, 7, 26), MONTH)])
+def test_render_same_as_calendar(calendar_cls, locale, current_date, step):
+    config = CalendarConfig(calendar_cls, locale=locale, min_date=current_date)
+    calendar = calendar_cls(locale=locale, current_date=current_date, min_date=current_date)
+    if step:
+        calendar._build(step=step)
+
+    assert render(config, step, current_date) == calendar.build()
+
+
+@pytest.mark.parametrize('callback_data',
+                         ['cbcal_0_s_m_2021_11_13_en', 'cbcal_0_s_d_2021_11_13_en', 'cbcal_0_g_y_2022_5_7_en',
+                          'cbcal_0_s_y_2020_1_1_ru', 'cbcal_0_n', 'something_irrelevant'])
+def test_handle_same_as_process(callback_data):
+    config = CalendarConfig(DetailedTelegramCalendar, max_date=date(2022, 1, 1))
+
+    assert handle(config, callback_data) == \
+        DetailedTelegramCalendar(max_date=date(2022, 1, 1)).process(callback_data)
+
+
+def test_config_shared_between_threads():
+    config = CalendarConfig(DetailedTelegramCalendar, calendar_id=5)
+    data = ['cbcal_5_s_m_2021_{}_1_en'.format(month) for month in range(1, 13)] * 10
+
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(lambda d: handle(config, d), data))
+
+    assert results == [DetailedTelegramCalendar(calendar_id=5).process(d) for d in data]
+    with pytest.raises(AttributeError):
+        config.locale = 'ru'
+    assert render(config)[1] == YEAR
+
+
+class CountingCalendar(DetailedTelegramCalendar):
+    cache = None
+    renders = 0
+
+    def _build_days(self):
+        CountingCalendar.renders += 1
+        super()._build_days()
+
+
+BATCH = [
+    {'current_date': date(2025, 3, 4), 'step': DAY},
+    {'current_date': date(2025, 3, 28), 'step': DAY},
+    {'current_date': date(2025, 3, 4), 'step': DAY, 'max_date': date(2025, 3, 20)},
+    {'current_date': date(2025, 4, 1), 'step': DAY, 'locale': 'ru'},
+    {'current_date': date(2025, 3, 4), 'step': DAY, 'locale': 'fa'},
+    {'current_date': date(2025, 3, 4)},
+    {'current_date': date(2025, 3, 4), 'step': DAY},
+]
+
+
+def expected_keyboard(calendar_cls, request):
+    kwargs = dict(request)
+    step = kwargs.pop('step', None)
+    if kwargs.get('locale') == 'fa':
+        kwargs['current_date'] = jdatetime.date.fromgregorian(date=kwargs['current_date'])
+    calendar = calendar_cls(**kwargs)
+    if step:
+        calendar._build(step=step)
+    return calendar.build()[0]
+
+
+def test_render_many_same_as_calendars():
+    assert render_many(BATCH, DetailedTelegramCalendar) == \
+        [expected_keyboard(DetailedTelegramCalendar, request) for request in BATCH]
+
+
+def test_render_many_renders_pages_once():
+    CountingCalendar.renders = 0
+    keyboards = render_many(BATCH, CountingCalendar)
+
+    # the first, second and last requests show the same page
+    assert CountingCalendar.renders == 4
+    assert keyboards[0] is keyboards[1] is keyboards[6]
+
+
+def test_render_many_processes():
+    requests = [dict(request, calendar_cls=WMonthTelegramCalendar) for request in BATCH]
+    assert render_many(requests, processes=2) == render_many(requests)
+
+
+def test_render_many_processes_with_session_store():
+    store = MemorySessionStore()
+    requests = [{'current_date': date(2025, month, 1), 'step': DAY, 'session_store': store} for month in (3, 4, 5)]
+    keyboards = render_many(requests, DetailedTelegramCalendar, processes=2)
+    token = [button['callback_data'] for row in json.loads(keyboards[0])['inline_keyboard'] for button in row
+             if button['text'] == 10][0]
+    assert token.startswith('cs.')
+    assert DetailedTelegramCalendar(session_store=store).process(token) == (date(2025, 3, 10), None, DAY)
@@ -0,0 +1,62 @@
+import os
+import sys
+from datetime import date
+
+import jdatetime
+import pytest
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+from telegram_bot_calendar import convert
+from telegram_bot_calendar.systems import GREGORIAN, JALALI
+
+ORDINALS = list(range(date(1800, 1, 1).toordinal(), date(2700, 1, 1).toordinal(), 11))
+
+
+@pytest.fixture(params=['python', 'numpy'])
+def backend(request, monkeypatch):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    monkeypatch.setattr(convert, 'NUMPY_MIN_SIZE', 0 if request.param == 'numpy' else None)
+    return request.param
+
+
+def test_matches_jdatetime(backend):
+    years, months, days = convert.ordinal_to_jalali(ORDINALS)
+    assert type(years).__name__ == ('ndarray' if backend == 'numpy' else 'list')
+
+    expected = [jdatetime.date.fromgregorian(date=date.fromordinal(ordinal)) for ordinal in ORDINALS]
+    assert list(zip(years, months, days)) == [(d.year, d.month, d.day) for d in expected]
+    assert list(convert.jalali_to_ordinal(years, months, days)) == ORDINALS
+    assert list(convert.jalali_weekday(ORDINALS)) == [d.weekday() for d in expected]
+    assert list(convert.weekday(ORDINALS)) == [date.fromordinal(ordinal).weekday() for ordinal in ORDINALS]
+
+
+def test_days_in_month(backend):
+    years, months = zip(*[(year, month) for year in range(1300, 1500) for month in range(1, 13)])
+    expected = [jdatetime.j_days_in_month[month - 1] + (month == 12 and jdatetime.date(year, 1, 1).isleap())
+                for year, month in zip(years, months)]
+    assert list(convert.jalali_days_in_month(years, months)) == expected
+
+
+@pytest.mark.parametrize(('jalali', 'gregorian'), [
+    ((1404, 1, 1), date(2025, 3, 21)),
+    ((1403, 12, 30), date(2025, 3, 20)),
+    ((979, 1, 1), date(1600, 3, 20)),
+])
+def test_scalars(jalali, gregorian):
+    assert convert.jalali_to_ordinal(*jalali) == gregorian.toordinal()
+    assert convert.ordinal_to_jalali(gregorian.toordinal()) == jalali
+
+
+def test_empty_and_iterables():
+    assert convert.ordinal_to_jalali([]) == ([], [], [])
+    assert convert.weekday(iter([1, 2])) == [0, 1]
+
+
+def test_system_from_dates():
+    dates = [date(2025, 3, 21), jdatetime.date(1404, 1, 2), date(2025, 3, 23)]
+    assert JALALI.from_dates(dates) == [(1404, 1, 1), (1404, 1, 2), (1404, 1, 3)]
+    assert GREGORIAN.from_dates(dates) == [(2025, 3, 21), (2025, 3, 22), (2025, 3, 23)]
+    assert JALALI.from_date(date(2025, 3, 21)) == jdatetime.date(1404, 1, 1)
+    assert GREGORIAN.from_date(jdatetime.date(1404, 1, 1)) == date(2025, 3, 21)
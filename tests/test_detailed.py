@@ -7,6 +7,8 @@ import pytest
 from dateutil.relativedelta import relativedelta
 
 from telegram_bot_calendar import DAY, MONTH, YEAR
+from telegram_bot_calendar.base import KeyboardCache
+from telegram_bot_calendar.callback import parse_callback, COMPACT_CODEC
 from telegram_bot_calendar.detailed import DetailedTelegramCalendar, NOTHING
 
 myPath = os.path.dirname(os.path.abspath(__file__))
@@ -62,3 +64,45 @@ def test__build_nav_buttons(step, start, diff, mind, maxd, min_button_date, max_
             result = False
 
     assert result
+
+
+def test_keyboard_cache_shared_between_days_of_month():
+    cache = KeyboardCache()
+
+    class CachedCalendar(DetailedTelegramCalendar):
+        pass
+
+    CachedCalendar.cache = cache
+    first = CachedCalendar(current_date=date(2026, 10, 3), max_date=date(2026, 10, 18))
+    first._build(step=DAY)
+    second = CachedCalendar(current_date=date(2026, 10, 17), max_date=date(2026, 10, 18))
+    second._build(step=DAY)
+    other_locale = CachedCalendar(current_date=date(2026, 10, 17), max_date=date(2026, 10, 18), locale='ru')
+    other_locale._build(step=DAY)
+
+    assert first._keyboard is second._keyboard
+    assert other_locale._keyboard != first._keyboard
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_process_parsed_payload():
+    payload = parse_callback('cbcal_0_s_d_2021_11_13_en')
+    calendar = DetailedTelegramCalendar(current_date=date(2021, 1, 12))
+
+    assert calendar.process(payload) == (date(2021, 11, 13), None, DAY)
+    assert parse_callback('cbcal_0_s_d_2021_11_13_en') is payload
+
+
+def test_process_compact_codec():
+    class CompactCalendar(DetailedTelegramCalendar):
+        codec = COMPACT_CODEC
+
+    calendar = CompactCalendar(current_date=date(2021, 1, 12), locale='ru')
+    keyboard, step = calendar.build()
+    select_2021 = json.loads(keyboard)['inline_keyboard'][0][1]['callback_data']
+
+    result, keyboard, step = CompactCalendar().process(select_2021)
+    assert (result, step) == (None, MONTH)
+    select_may = json.loads(keyboard)['inline_keyboard'][1][1]['callback_data']
+    assert select_may.startswith('cc.0.')
+    assert CompactCalendar().process(select_may)[2] == DAY
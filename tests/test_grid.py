@@ -0,0 +1,55 @@
+import os
+import sys
+from datetime import date
+
+import jdatetime
+import pytest
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+from telegram_bot_calendar.systems import GREGORIAN, JALALI, shift_months
+
+
+@pytest.mark.parametrize(('system', 'year', 'month', 'offset', 'days'),
+                         [(GREGORIAN, 2026, 10, 3, 31),
+                          (GREGORIAN, 2024, 2, 3, 29),
+                          (GREGORIAN, 2023, 2, 2, 28),
+                          (JALALI, 1403, 12, 4, 30),
+                          (JALALI, 1404, 12, 6, 29),
+                          (JALALI, 1405, 7, 4, 30)])
+def test_month_grid(system, year, month, offset, days):
+    grid = system.month_grid(year, month)
+
+    assert (grid.offset, grid.days) == (offset, days)
+    assert len(grid.cells) % 7 == 0
+    assert grid.cells[offset] == 1 and grid.cells[offset + days - 1] == days
+
+
+@pytest.mark.parametrize(('min_d', 'max_d', 'first', 'last'),
+                         [(None, None, 1, 31),
+                          (date(2026, 10, 5), date(2026, 10, 29), 5, 29),
+                          (date(2025, 1, 1), date(2026, 10, 18), 1, 18),
+                          (date(2026, 11, 1), None, 1, 0),
+                          (None, date(2026, 9, 30), 1, 0)])
+def test_month_grid_clip(min_d, max_d, first, last):
+    grid = GREGORIAN.month_grid(2026, 10)
+
+    assert grid.clip(min_d, max_d) == (first, last)
+    before, days, after = grid.slice(min_d, max_d)
+    assert before + len(days) + after == len(grid.cells)
+
+
+@pytest.mark.parametrize(('given', 'months', 'result'),
+                         [(date(2026, 1, 31), 1, date(2026, 2, 28)),
+                          (date(2026, 1, 12), -13, date(2024, 12, 12)),
+                          (date(2024, 2, 29), 12, date(2025, 2, 28)),
+                          (jdatetime.date(1405, 6, 31), 1, jdatetime.date(1405, 7, 30)),
+                          (jdatetime.date(1405, 1, 1), -1, jdatetime.date(1404, 12, 1))])
+def test_shift_months(given, months, result):
+    assert shift_months(given, months) == result
+
+
+@pytest.mark.parametrize(('system', 'year', 'days'),
+                         [(GREGORIAN, 2024, 366), (GREGORIAN, 2100, 365), (JALALI, 1403, 366), (JALALI, 1404, 365)])
+def test_days_in_year(system, year, days):
+    assert system.days_in_year(year) == days
@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+LAZY_MODULES = ('jdatetime', 'dateutil', 'telethon', 'numpy')
+# cumulative import time of the package in microseconds, generous to not fail on slow CI machines
+IMPORT_BUDGET_US = 300000
+
+
+def run(code, *options):
+    return subprocess.run([sys.executable, *options, '-c', code], cwd=ROOT, check=True,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+
+
+def test_import_time_budget():
+    stderr = run('import telegram_bot_calendar', '-X', 'importtime').stderr
+    imported = {}
+    for line in stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if cumulative.strip().isdigit():
+                imported[name.strip()] = int(cumulative)
+
+    assert not [name for name in imported if name.split('.')[0] in LAZY_MODULES]
+    assert imported['telegram_bot_calendar'] < IMPORT_BUDGET_US
+
+
+@pytest.mark.parametrize(('code', 'loaded'),
+                         [("DetailedTelegramCalendar().build()", ()),
+                          ("DetailedTelegramCalendar(locale='fa').build()", ('jdatetime',))])
+def test_lazy_imports(code, loaded):
+    stdout = run('import sys\nfrom telegram_bot_calendar import DetailedTelegramCalendar\n' + code +
+                 '\nprint(" ".join(sorted({m.split(".")[0] for m in sys.modules})))').stdout
+
+    assert sorted(set(stdout.split()) & set(LAZY_MODULES)) == list(loaded)
@@ -0,0 +1,69 @@
+import logging
+import os
+import re
+import sys
+from datetime import date
+
+import pytest
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+from telegram_bot_calendar import DetailedTelegramCalendar, MetricsRecorder, LoggingInstrumentation, DAY, MONTH
+from telegram_bot_calendar.base import KeyboardCache
+from telegram_bot_calendar.instrumentation import PHASES
+
+PROMETHEUS_LINE = re.compile(r'^(# (HELP|TYPE) .+|[a-z_]+\{([a-z]+="[^"]*",?)*\} [0-9.e+-]+)$')
+
+
+class PrivateCacheCalendar(DetailedTelegramCalendar):
+    cache = KeyboardCache()
+
+
+@pytest.fixture
+def recorder():
+    PrivateCacheCalendar.cache.clear()
+    return MetricsRecorder()
+
+
+def test_disabled_calendar_not_wrapped():
+    calendar = DetailedTelegramCalendar()
+    assert not set(PHASES.values()) & set(vars(calendar))
+
+
+def test_recorder(recorder):
+    for _ in range(3):
+        PrivateCacheCalendar(instrumentation=recorder).process('cbcal_0_s_m_2025_3_1_en')
+    PrivateCacheCalendar(instrumentation=recorder, locale='ru').process('cbcal_0_s_y_2025_1_1_ru')
+
+    assert recorder.cache_lookups == {(False, DAY, 'en'): 1, (True, DAY, 'en'): 2, (False, MONTH, 'ru'): 1}
+    assert recorder.timings['parse', MONTH, 'en'][0] == 3
+    assert recorder.timings['render', DAY, 'en'][0] == 1
+    assert recorder.timings['nav', DAY, 'en'][0] == 1
+    assert recorder.timings['serialize', MONTH, 'ru'][0] == 1
+    count, total, largest = recorder.sizes[DAY, 'en']
+    assert count == 3 and total == 3 * largest
+
+
+def test_prometheus_text(recorder):
+    PrivateCacheCalendar(instrumentation=recorder).process('cbcal_0_s_m_2025_3_1_en')
+    PrivateCacheCalendar(instrumentation=recorder).process('cbcal_0_n')
+    text = recorder.prometheus_text()
+
+    assert all(PROMETHEUS_LINE.match(line) for line in text.splitlines())
+    assert 'telegram_bot_calendar_cache_lookups_total{result="miss",step="d",locale="en"} 1' in text
+    assert 'telegram_bot_calendar_phase_seconds_count{phase="parse",step="",locale="en"} 1' in text
+
+    recorder.reset()
+    assert 'phase="parse"' not in recorder.prometheus_text()
+
+
+def test_logging_instrumentation(caplog):
+    PrivateCacheCalendar.cache.clear()
+    with caplog.at_level(logging.DEBUG, logger='telegram_bot_calendar'):
+        PrivateCacheCalendar(instrumentation=LoggingInstrumentation(),
+                             current_date=date(2025, 3, 1)).process('cbcal_0_s_m_2025_3_1_en')
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert 'calendar cache miss step=d locale=en' in messages
+    assert any(message.startswith('calendar render took ') for message in messages)
+    assert any(re.match(r'calendar keyboard \d+ bytes step=d locale=en', message) for message in messages)
@@ -0,0 +1,182 @@
+import json
+import os
+import sys
+from datetime import date
+
+import jdatetime
+import pytest
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+from telegram_bot_calendar import MultiSelectTelegramCalendar, CalendarConfig, MemorySessionStore, DisabledDates, \
+    handle, DAY
+from telegram_bot_calendar.callback import COMPACT_CODEC, MAX_CALLBACK_DATA, CallbackDataTooLong, parse_callback
+
+
+class CompactMultiSelectCalendar(MultiSelectTelegramCalendar):
+    codec = COMPACT_CODEC
+
+
+def buttons(keyboard):
+    return [button for row in json.loads(keyboard)['inline_keyboard'] for button in row]
+
+
+def day_data(keyboard, day):
+    return [button['callback_data'] for button in buttons(keyboard) if button['text'] in (day, '·{}·'.format(day))][0]
+
+
+def done_data(keyboard):
+    return [button['callback_data'] for button in buttons(keyboard) if str(button['text']).startswith('✓')][0]
+
+
+def selected(keyboard):
+    return [b['text'] for b in buttons(keyboard) if isinstance(b['text'], str) and b['text'].startswith('·')]
+
+
+@pytest.mark.parametrize('calendar_cls', [MultiSelectTelegramCalendar, CompactMultiSelectCalendar])
+def test_toggle_and_done(calendar_cls):
+    calendar = calendar_cls(current_date=date(2025, 3, 1))
+    calendar._build(step=DAY)
+    keyboard = calendar._keyboard
+
+    for day in (10, 12, 14):
+        result, keyboard, step = calendar_cls().process(day_data(keyboard, day))
+        assert result is None and step == DAY
+    assert selected(keyboard) == ['·10·', '·12·', '·14·']
+
+    # selecting a selected day removes it
+    _, keyboard, _ = calendar_cls().process(day_data(keyboard, 12))
+    assert selected(keyboard) == ['·10·', '·14·']
+    assert [b['text'] for b in buttons(keyboard) if b['text'] == '✓ 2']
+
+    result, keyboard, step = calendar_cls().process(done_data(keyboard))
+    assert result == [date(2025, 3, 10), date(2025, 3, 14)] and keyboard is None
+
+
+def test_selection_across_months():
+    calendar = MultiSelectTelegramCalendar(current_date=date(2025, 3, 1), selected_dates=[date(2025, 3, 31)])
+    calendar._build(step=DAY)
+    next_page = json.loads(calendar._keyboard)['inline_keyboard'][-3][2]['callback_data']
+    _, keyboard, _ = MultiSelectTelegramCalendar().process(next_page)
+    assert selected(keyboard) == []
+
+    _, keyboard, _ = MultiSelectTelegramCalendar().process(day_data(keyboard, 2))
+    payload = parse_callback(done_data(keyboard))
+    assert payload.extra == '2025.3.40000000-2025.4.2' and len(done_data(keyboard)) <= 64
+    assert MultiSelectTelegramCalendar().process(payload)[0] == [date(2025, 3, 31), date(2025, 4, 2)]
+
+
+def test_jalali_selection():
+    calendar = MultiSelectTelegramCalendar(locale='fa', current_date=jdatetime.date(1404, 1, 1),
+                                           selected_dates=[date(2025, 3, 21)])
+    calendar._build(step=DAY)
+    assert selected(calendar._keyboard) == ['·1·']
+
+    _, keyboard, _ = MultiSelectTelegramCalendar().process(day_data(calendar._keyboard, 31))
+    result, _, _ = MultiSelectTelegramCalendar().process(done_data(keyboard))
+    assert result == [jdatetime.date(1404, 1, 1), jdatetime.date(1404, 1, 31)]
+
+
+def test_toggles_reuse_month_rows():
+    class CountingCalendar(MultiSelectTelegramCalendar):
+        renders = 0
+
+        def _days_rows(self):
+            CountingCalendar.renders += 1
+            return super()._days_rows()
+
+    calendar = CountingCalendar(current_date=date(2031, 5, 1))
+    calendar._build(step=DAY)
+    keyboard = calendar._keyboard
+    for day in (3, 4, 5, 4):
+        _, keyboard, _ = CountingCalendar().process(day_data(keyboard, day))
+    assert CountingCalendar.renders == 1
+    assert selected(keyboard) == ['·3·', '·5·']
+
+
+def test_disabled_days_are_not_selected():
+    rules = DisabledDates(dates=[date(2025, 3, 12)])
+    calendar = MultiSelectTelegramCalendar(current_date=date(2025, 3, 1), disabled_dates=rules,
+                                           selected_dates=[date(2025, 3, 11)])
+    calendar._build(step=DAY)
+    assert '×' in [b['text'] for b in buttons(calendar._keyboard)]
+
+    selection = parse_callback(day_data(calendar._keyboard, 11)).extra
+    result, _, step = MultiSelectTelegramCalendar(disabled_dates=rules).process(
+        'cbcal_0_s_d_2025_3_12_en_' + selection)
+    assert result is None and step == DAY
+
+
+def test_session_and_handle():
+    store = MemorySessionStore()
+    config = CalendarConfig(MultiSelectTelegramCalendar, session_store=store)
+    calendar = config.calendar(date(2025, 3, 1))
+    calendar._build(step=DAY)
+
+    _, keyboard, _ = handle(config, day_data(calendar._keyboard, 10))
+    assert all(b['callback_data'].startswith('cs.') or b['callback_data'] == 'cbcal_0_n' for b in buttons(keyboard))
+    assert selected(keyboard) == ['·10·']
+    assert handle(config, done_data(keyboard))[0] == [date(2025, 3, 10)]
+
+
+def test_invalid_selection():
+    calendar = MultiSelectTelegramCalendar()
+    assert calendar.process('cbcal_0_f_d_2025_3_1_en_2025.13.1')[0] == []
+    assert calendar.process('cbcal_0_f_d_2025_2_1_en_2025.2.ffffffff')[0] == \
+        [date(2025, 2, day) for day in range(1, 29)]
+
+
+def test_handle_without_session():
+    config = CalendarConfig(MultiSelectTelegramCalendar)
+    assert handle(config, 'cbcal_0_f_d_2025_3_1_en_2025.3.200') == ([date(2025, 3, 10)], None, DAY)
+    _, keyboard, step = handle(config, 'cbcal_0_s_d_2025_3_12_en_2025.3.200')
+    assert step == DAY and selected(keyboard) == ['·10·', '·12·']
+
+
+def max_data_size(keyboard):
+    return max(len(button['callback_data'].encode('utf-8')) for button in buttons(keyboard))
+
+
+def test_compact_selection_is_binary():
+    dates = [date(2025, month, day) for month in (1, 2, 3, 4, 5) for day in (3, 15, 28)]
+    calendar = CompactMultiSelectCalendar(current_date=date(2025, 1, 1), selected_dates=dates)
+    calendar._build(step=DAY)
+    assert isinstance(parse_callback(done_data(calendar._keyboard)).extra, bytes)
+    assert max_data_size(calendar._keyboard) <= MAX_CALLBACK_DATA
+    assert CompactMultiSelectCalendar().process(done_data(calendar._keyboard))[0] == dates
+    # text data of the same calendar is still understood
+    assert CompactMultiSelectCalendar().process('cbcal_0_f_d_2025_3_1_en_2025.3.200')[0] == [date(2025, 3, 10)]
+
+
+@pytest.mark.parametrize('calendar_cls', [MultiSelectTelegramCalendar, CompactMultiSelectCalendar])
+def test_selection_over_the_limit_is_refused(calendar_cls):
+    dates = [date(2025, month, day) for month in range(1, 13) for day in (3, 15, 28)]
+    fitting = 0
+    while True:
+        calendar = calendar_cls(current_date=date(2025, 1, 1), selected_dates=dates[:fitting + 1])
+        try:
+            calendar._build(step=DAY)
+        except CallbackDataTooLong:
+            break
+        keyboard = calendar._keyboard
+        fitting += 1
+    assert 0 < fitting < len(dates) and max_data_size(keyboard) <= MAX_CALLBACK_DATA
+
+    # the day that does not fit is not selected
+    page = dates[fitting].replace(day=1)
+    calendar = calendar_cls(current_date=page, selected_dates=dates[:fitting])
+    calendar._build(step=DAY)
+    _, keyboard, _ = calendar_cls().process(day_data(calendar._keyboard, dates[fitting].day))
+    assert max_data_size(keyboard) <= MAX_CALLBACK_DATA
+    assert calendar_cls().process(done_data(keyboard))[0] == dates[:fitting]
+
+    # session tokens have no limit
+    store = MemorySessionStore()
+    calendar = calendar_cls(current_date=date(2025, 1, 1), selected_dates=dates, session_store=store)
+    calendar._build(step=DAY)
+    assert calendar_cls(session_store=store).process(done_data(calendar._keyboard))[0] == dates
+
+
+def test_long_calendar_id_is_refused():
+    with pytest.raises(CallbackDataTooLong):
+        MultiSelectTelegramCalendar(calendar_id='x' * 64).build()
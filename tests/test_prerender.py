@@ -0,0 +1,145 @@
+import json
+import os
+import struct
+import sys
+from datetime import date
+
+import pytest
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+from telegram_bot_calendar import DetailedTelegramCalendar, WWeekTelegramCalendar, DisabledDates, MemorySessionStore, \
+    YEAR, MONTH, DAY, WEEK, HOUR
+from telegram_bot_calendar import prerender
+from telegram_bot_calendar.base import keyboard_cache
+
+
+class OtherStyleCalendar(DetailedTelegramCalendar):
+    prev_button = "<"
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    keyboard_cache.clear()
+    yield
+    keyboard_cache.clear()
+
+
+@pytest.mark.parametrize(('start', 'end', 'locales', 'steps', 'expected'), [
+    (date(2024, 11, 5), date(2025, 2, 1), ('en',), (DAY,),
+     [('en', DAY, (2024, 11, 1)), ('en', DAY, (2024, 12, 1)), ('en', DAY, (2025, 1, 1)), ('en', DAY, (2025, 2, 1))]),
+    (date(2024, 11, 5), date(2025, 2, 1), ('en', 'ru'), (YEAR, MONTH),
+     [('en', YEAR, (2024, 1, 1)), ('en', YEAR, (2025, 1, 1)), ('en', MONTH, (2024, 1, 1)), ('en', MONTH, (2025, 1, 1)),
+      ('ru', YEAR, (2024, 1, 1)), ('ru', YEAR, (2025, 1, 1)), ('ru', MONTH, (2024, 1, 1)), ('ru', MONTH, (2025, 1, 1))]),
+    (date(2024, 3, 1), date(2024, 4, 1), ('fa',), (DAY,),
+     [('fa', DAY, (1402, 12, 1)), ('fa', DAY, (1403, 1, 1))]),
+    (date(2025, 3, 1), date(2025, 3, 20), ('en',), (WEEK,),
+     [('en', WEEK, (2025, 2, 24)), ('en', WEEK, (2025, 3, 3)), ('en', WEEK, (2025, 3, 10)),
+      ('en', WEEK, (2025, 3, 17))]),
+    (date(2025, 3, 21), date(2025, 3, 28), ('fa',), (WEEK,),
+     [('fa', WEEK, (1403, 12, 25)), ('fa', WEEK, (1404, 1, 2))]),
+])
+def test_pages(start, end, locales, steps, expected):
+    assert prerender.pages(start, end, locales, steps) == expected
+
+
+def test_prerender_fills_cache():
+    count = DetailedTelegramCalendar.prerender(date(2024, 11, 5), date(2025, 2, 1), locales=('en', 'fa'),
+                                               max_date=date(2025, 1, 20))
+    assert count == len(keyboard_cache) == 14
+
+    keyboard_cache.hits = keyboard_cache.misses = 0
+    calendar = DetailedTelegramCalendar(current_date=date(2024, 12, 24), max_date=date(2025, 1, 20))
+    for step in (YEAR, MONTH, DAY):
+        calendar._build(step=step)
+    assert keyboard_cache.stats()['hits'] == 3
+    assert keyboard_cache.stats()['misses'] == 0
+
+
+def test_pages_unsupported_step():
+    with pytest.raises(ValueError):
+        prerender.pages(date(2025, 3, 1), date(2025, 3, 1), steps=(HOUR,))
+
+
+def test_prerender_weeks():
+    assert WWeekTelegramCalendar.prerender(date(2025, 3, 1), date(2025, 3, 31), steps=(WEEK,)) == 6
+
+    keyboard_cache.hits = keyboard_cache.misses = 0
+    calendar = WWeekTelegramCalendar(current_date=date(2025, 3, 12))
+    calendar._build(step=WEEK)
+    assert keyboard_cache.stats()['hits'] == 1 and keyboard_cache.stats()['misses'] == 0
+
+def test_prerender_processes(monkeypatch):
+    monkeypatch.setattr(prerender, 'PARALLEL_MIN_PAGES', 1)
+    page_list = prerender.pages(date(2024, 1, 1), date(2024, 6, 1), ('en', 'fa'))
+
+    parallel = prerender.render_pages(DetailedTelegramCalendar, page_list, processes=2)
+    keyboard_cache.clear()
+    inline = prerender.render_pages(DetailedTelegramCalendar, page_list)
+    assert parallel == inline
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / 'calendar.snap')
+    saved = DetailedTelegramCalendar.save_snapshot(path, date(2024, 11, 5), date(2025, 2, 1), locales=('en', 'fa'))
+    expected = {key: keyboard_cache.get(key) for key in list(keyboard_cache._data)}
+    keyboard_cache.clear()
+
+    assert DetailedTelegramCalendar.load_snapshot(path) == saved == len(expected)
+    assert {key: keyboard_cache.get(key) for key in list(keyboard_cache._data)} == expected
+
+
+def test_snapshot_other_style_skipped(tmp_path):
+    path = str(tmp_path / 'calendar.snap')
+    DetailedTelegramCalendar.save_snapshot(path, date(2025, 1, 1), date(2025, 1, 1))
+    keyboard_cache.clear()
+
+    assert OtherStyleCalendar.load_snapshot(path) == 0
+    assert DetailedTelegramCalendar.load_snapshot(path, calendar_id=1) == 0
+    assert DetailedTelegramCalendar.load_snapshot(path, min_date=date(2024, 1, 1)) == 0
+    assert len(keyboard_cache) == 0
+
+
+def test_snapshot_version(tmp_path):
+    path = tmp_path / 'calendar.snap'
+    DetailedTelegramCalendar.save_snapshot(str(path), date(2025, 1, 1), date(2025, 1, 1))
+    data = path.read_bytes()
+    path.write_bytes(data[:8] + struct.pack('>H', prerender.SNAPSHOT_VERSION + 1) + data[10:])
+
+    with pytest.raises(ValueError):
+        DetailedTelegramCalendar.load_snapshot(str(path))
+
+
+def test_snapshot_disabled_dates(tmp_path):
+    path = str(tmp_path / 'calendar.snap')
+    DetailedTelegramCalendar.save_snapshot(path, date(2025, 3, 1), date(2025, 3, 1), steps=(DAY,),
+                                           disabled_dates=DisabledDates(dates=[date(2025, 3, 10)]))
+    keyboard_cache.clear()
+
+    assert DetailedTelegramCalendar.load_snapshot(path, disabled_dates=DisabledDates(dates=[date(2025, 3, 20)])) == 0
+    assert DetailedTelegramCalendar.load_snapshot(path) == 0
+    assert DetailedTelegramCalendar.load_snapshot(path, disabled_dates=DisabledDates(dates=[date(2025, 3, 10)])) == 1
+
+    with pytest.raises(ValueError):
+        DetailedTelegramCalendar.save_snapshot(path, date(2025, 3, 1), date(2025, 3, 1),
+                                               disabled_dates=DisabledDates(predicate=lambda d: d.day == 1))
+
+
+def test_snapshot_session_tokens(tmp_path):
+    path = str(tmp_path / 'calendar.snap')
+    DetailedTelegramCalendar.save_snapshot(path, date(2025, 3, 1), date(2025, 3, 1), steps=(DAY,),
+                                           session_store=MemorySessionStore())
+    keyboard_cache.clear()
+
+    # snapshots with tokens are not used by calendars without a store
+    assert DetailedTelegramCalendar.load_snapshot(path) == 0
+    store = MemorySessionStore()
+    assert DetailedTelegramCalendar.load_snapshot(path, session_store=store) == 1
+    assert len(store) > 0
+
+    calendar = DetailedTelegramCalendar(current_date=date(2025, 3, 1), session_store=store)
+    calendar._build(step=DAY)
+    token = [button['callback_data'] for row in json.loads(calendar._keyboard)['inline_keyboard'] for button in row
+             if button['text'] == 10][0]
+    assert token.startswith('cs.')
+    assert DetailedTelegramCalendar(session_store=store).process(token) == (date(2025, 3, 10), None, DAY)
@@ -0,0 +1,132 @@
+import builtins
+import json
+import os
+import sys
+from datetime import date
+
+import jdatetime
+import pytest
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+from telegram_bot_calendar import RangeTelegramCalendar, DetailedTelegramCalendar, CalendarConfig, handle, DAY
+from telegram_bot_calendar.callback import TEXT_CODEC, COMPACT_CODEC, MAX_CALLBACK_DATA, parse_callback
+
+
+class CompactRangeCalendar(RangeTelegramCalendar):
+    codec = COMPACT_CODEC
+
+
+def texts(keyboard):
+    return [[button['text'] for button in row] for row in json.loads(keyboard)['inline_keyboard']]
+
+
+def callbacks(keyboard):
+    return [[button['callback_data'] for button in row] for row in json.loads(keyboard)['inline_keyboard']]
+
+
+def selected(keyboard):
+    return [text for row in texts(keyboard) for text in row if isinstance(text, str) and text.startswith('·')]
+
+
+@pytest.mark.parametrize('codec', [TEXT_CODEC, COMPACT_CODEC])
+@pytest.mark.parametrize('locale', ['en', 'xx'])
+def test_codec_extra(codec, locale):
+    data = codec.encode(3, 's', 'd', date(2025, 3, 10), locale, extra='2025.3.1')
+    payload = parse_callback(data)
+    assert payload.extra == '2025.3.1' and payload.locale == locale and payload.day == 10
+    assert codec.with_extra(codec.encode(3, 's', 'd', date(2025, 3, 10), locale), '2025.3.1') == data
+    assert parse_callback(codec.encode(3, 's', 'd', date(2025, 3, 10), locale)).extra is None
+
+
+@pytest.mark.parametrize('calendar_cls', [RangeTelegramCalendar, CompactRangeCalendar])
+def test_range_selection(calendar_cls):
+    start = calendar_cls(current_date=date(2025, 3, 1))
+    start._build(step=DAY)
+    data = [cb for row in callbacks(start._keyboard) for cb in row if parse_callback(cb).day == 10][0]
+
+    result, keyboard, step = calendar_cls().process(data)
+    assert result is None and step == DAY
+    assert selected(keyboard) == ['·10·']
+
+    # the pending start is kept while paging
+    next_page = callbacks(keyboard)[-2][2]
+    result, keyboard, step = calendar_cls().process(next_page)
+    assert result is None and selected(keyboard) == []
+
+    end = [cb for row in callbacks(keyboard) for cb in row if parse_callback(cb).day == 3][0]
+    result, keyboard, step = calendar_cls().process(end)
+    assert result == (date(2025, 3, 10), date(2025, 4, 3))
+    assert keyboard is None
+
+
+def test_range_end_before_start():
+    result, _, _ = RangeTelegramCalendar().process('cbcal_0_s_d_2025_3_2_en_2025.3.10')
+    assert result == (date(2025, 3, 2), date(2025, 3, 10))
+
+
+@pytest.mark.parametrize(('range_start', 'range_end', 'current_date', 'expected'), [
+    (date(2025, 3, 10), date(2025, 3, 12), date(2025, 3, 1), ['·10·', '·11·', '·12·']),
+    (date(2025, 2, 27), date(2025, 3, 2), date(2025, 3, 1), ['·1·', '·2·']),
+    (date(2025, 2, 27), date(2025, 4, 2), date(2025, 3, 1), ['·{}·'.format(day) for day in range(1, 32)]),
+    (date(2025, 2, 27), date(2025, 3, 2), date(2025, 4, 1), []),
+])
+def test_range_highlight(range_start, range_end, current_date, expected):
+    calendar = RangeTelegramCalendar(current_date=current_date, range_start=range_start, range_end=range_end,
+                                     min_date=date(2025, 1, 1))
+    calendar._build(step=DAY)
+    assert selected(calendar._keyboard) == expected
+
+
+def test_range_patch_same_as_rebuild():
+    calendar = RangeTelegramCalendar(current_date=date(2025, 3, 1), range_start=date(2025, 3, 10),
+                                     max_date=date(2025, 3, 20))
+    calendar._build(step=DAY)
+
+    rebuilt = RangeTelegramCalendar(current_date=date(2025, 3, 1), range_start=date(2025, 3, 10),
+                                    max_date=date(2025, 3, 20))
+    DetailedTelegramCalendar._build_days(rebuilt)
+
+    assert callbacks(calendar._keyboard) == callbacks(rebuilt._keyboard)
+    assert [text for row in texts(calendar._keyboard) for text in row if text != '·10·'] == \
+        [text for row in texts(rebuilt._keyboard) for text in row if text != 10]
+
+
+def test_range_jalali():
+    result, keyboard, _ = RangeTelegramCalendar(locale='fa').process('cbcal_0_s_d_1403_12_30_fa')
+    assert selected(keyboard) == ['·30·']
+    result, _, _ = RangeTelegramCalendar(locale='fa').process('cbcal_0_s_d_1404_1_2_fa_1403.12.30')
+    assert result == (jdatetime.date(1403, 12, 30), jdatetime.date(1404, 1, 2))
+
+
+def test_range_handle():
+    config = CalendarConfig(RangeTelegramCalendar)
+    assert handle(config, 'cbcal_0_s_d_2025_3_10_en') == RangeTelegramCalendar().process('cbcal_0_s_d_2025_3_10_en')
+    assert handle(config, 'cbcal_0_s_d_2025_3_12_en_2025.3.10')[0] == (date(2025, 3, 10), date(2025, 3, 12))
+
+
+def test_pending_start_over_the_limit_is_refused():
+    calendar_id = 'booking-room-1234567890abcdefgh'
+    calendar = RangeTelegramCalendar(calendar_id=calendar_id, locale='ukr', current_date=date(2025, 12, 1))
+    calendar._build(step=DAY)
+    day = [data for row in callbacks(calendar._keyboard) for data in row if data.endswith('_2025_12_10_ukr')][0]
+
+    result, keyboard, step = RangeTelegramCalendar(calendar_id=calendar_id).process(day)
+    assert result is None and step == DAY and selected(keyboard) == []
+    assert max(len(data.encode('utf-8')) for row in callbacks(keyboard) for data in row) <= MAX_CALLBACK_DATA
+    # data with a pending start that does not fit is processed without it
+    _, keyboard, _ = RangeTelegramCalendar(calendar_id=calendar_id).process(
+        'cbcal_{}_g_m_2025_12_1_ukr_2025.12.10'.format(calendar_id))
+    assert max(len(data.encode('utf-8')) for row in callbacks(keyboard) for data in row) <= MAX_CALLBACK_DATA
+
+    # a shorter id keeps the start
+    _, keyboard, _ = RangeTelegramCalendar(calendar_id='room-12').process('cbcal_room-12_s_d_2025_12_10_ukr')
+    assert selected(keyboard) == ['·10·']
+
+
+def test_star_import_keeps_builtins():
+    namespace = {}
+    exec('from telegram_bot_calendar import *', namespace)
+    assert namespace['RangeTelegramCalendar'] is RangeTelegramCalendar
+    # no submodule shadows a builtin like `range`
+    assert not {name for name in namespace if not name.startswith('_')} & set(dir(builtins))
@@ -0,0 +1,48 @@
+import json
+import os
+import sys
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+from telegram_bot_calendar import DetailedTelegramCalendar, WMonthTelegramCalendar, CalendarRouter, DAY, MONTH
+from telegram_bot_calendar.callback import COMPACT_CODEC
+
+
+class CompactCalendar(DetailedTelegramCalendar):
+    codec = COMPACT_CODEC
+
+
+@pytest.mark.parametrize('calendar_cls', [DetailedTelegramCalendar, WMonthTelegramCalendar, CompactCalendar])
+@pytest.mark.parametrize('calendar_id', [0, 13, 'booking'])
+def test_build_routed_by_func(calendar_cls, calendar_id):
+    keyboard, _ = calendar_cls(calendar_id=calendar_id, current_date=date(2026, 10, 18)).build()
+    buttons = [button for row in json.loads(keyboard)['inline_keyboard'] for button in row]
+
+    assert buttons
+    for button in buttons:
+        callback = SimpleNamespace(data=button['callback_data'])
+        assert calendar_cls.func(calendar_id)(callback)
+        assert not calendar_cls.func('other')(callback)
+
+
+def test_router_dispatch():
+    router = CalendarRouter()
+    router.register(DetailedTelegramCalendar, calendar_id=1, current_date=date(2026, 10, 18))
+    router.register(WMonthTelegramCalendar, calendar_id=2, locale='ru')
+
+    keyboard, _ = WMonthTelegramCalendar(calendar_id=2, locale='ru', current_date=date(2026, 10, 18)).build()
+    day_button = json.loads(keyboard)['inline_keyboard'][2][0]['callback_data']
+    year_button = json.loads(DetailedTelegramCalendar(calendar_id=1).build()[0])['inline_keyboard'][0][0]
+
+    assert router.func()(SimpleNamespace(data=day_button))
+    assert not router.func()(SimpleNamespace(data='cbcal_3_n'))
+    assert not router.func()(SimpleNamespace(data='something_irrelevant'))
+    assert router.process(day_button) == (date(2026, 10, 5), None, DAY)
+    assert router.process(year_button['callback_data'])[2] == MONTH
+    assert router.process('cbcal_3_n') == (None, None, None)
+    with pytest.raises(ValueError):
+        router.register(DetailedTelegramCalendar, calendar_id=1)
@@ -0,0 +1,94 @@
+import json
+import os
+import sys
+from datetime import date
+
+import jdatetime
+import pytest
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+from telegram_bot_calendar import DetailedTelegramCalendar, DisabledDates, CalendarConfig, handle, DAY
+from telegram_bot_calendar.systems import GREGORIAN, JALALI
+
+
+def days(mask):
+    return [day for day in range(1, 32) if mask >> (day - 1) & 1]
+
+
+@pytest.mark.parametrize(('rules', 'system', 'year', 'month', 'expected'), [
+    (DisabledDates(weekdays=(5, 6)), GREGORIAN, 2025, 3, [1, 2, 8, 9, 15, 16, 22, 23, 29, 30]),
+    (DisabledDates(dates=[date(2025, 3, 4), date(2025, 4, 4)]), GREGORIAN, 2025, 3, [4]),
+    (DisabledDates(dates=[jdatetime.date(1403, 12, 14)]), GREGORIAN, 2025, 3, [4]),
+    (DisabledDates(predicate=lambda d: d.day % 10 == 0), GREGORIAN, 2025, 2, [10, 20]),
+    # Friday in the Jalali calendar, 1404/1/1 is a Friday
+    (DisabledDates(weekdays=(4,)), JALALI, 1404, 1, [1, 8, 15, 22, 29]),
+    (DisabledDates(dates=[date(2025, 3, 21)]), JALALI, 1404, 1, [1]),
+])
+def test_mask(rules, system, year, month, expected):
+    assert days(rules.mask(system, year, month)) == expected
+
+
+def test_predicate_called_once_per_day():
+    calls = []
+    rules = DisabledDates(predicate=lambda d: calls.append(d) or False)
+    for _ in range(3):
+        rules.mask(GREGORIAN, 2025, 2)
+    assert len(calls) == 28
+
+    rules.invalidate()
+    rules.mask(GREGORIAN, 2025, 2)
+    assert len(calls) == 56
+
+
+def day_texts(calendar):
+    return [button['text'] for row in json.loads(calendar._keyboard)['inline_keyboard'][1:-2] for button in row]
+
+
+def test_disabled_days_rendered():
+    rules = DisabledDates(weekdays=(6,))
+    calendar = DetailedTelegramCalendar(current_date=date(2025, 3, 1), disabled_dates=rules)
+    calendar._build(step=DAY)
+    texts = day_texts(calendar)
+    assert texts.count('×') == 5 and 2 not in texts and 3 in texts
+
+    rules.add(date(2025, 3, 3))
+    calendar = DetailedTelegramCalendar(current_date=date(2025, 3, 1), disabled_dates=rules)
+    calendar._build(step=DAY)
+    assert day_texts(calendar).count('×') == 6
+
+
+def test_get_period():
+    calendar = DetailedTelegramCalendar(disabled_dates=DisabledDates(dates=[date(2025, 1, 31), date(2025, 2, 2)]))
+    period = calendar._get_period(DAY, date(2025, 1, 30), 4)
+    assert period == [date(2025, 1, 30), None, date(2025, 2, 1), None]
+
+
+def test_select_disabled_day():
+    rules = DisabledDates()
+    assert DetailedTelegramCalendar(disabled_dates=rules).process('cbcal_0_s_d_2025_3_4_en')[0] == date(2025, 3, 4)
+
+    rules.add(date(2025, 3, 4))
+    result, key, step = DetailedTelegramCalendar(disabled_dates=rules).process('cbcal_0_s_d_2025_3_4_en')
+    assert result is None and key is not None and step == DAY
+    assert handle(CalendarConfig(DetailedTelegramCalendar, disabled_dates=rules), 'cbcal_0_s_d_2025_3_4_en') == \
+        (result, key, step)
+
+
+def test_rules_in_worker_processes(monkeypatch):
+    from telegram_bot_calendar import prerender, render_many
+    from telegram_bot_calendar.base import keyboard_cache
+
+    monkeypatch.setattr(prerender, 'PARALLEL_MIN_PAGES', 1)
+    rules = DisabledDates(weekdays=(5, 6), dates=[date(2025, 3, 12)])
+    rules.mask(GREGORIAN, 2025, 3)
+    page_list = prerender.pages(date(2025, 1, 1), date(2025, 4, 1), steps=(DAY,))
+    parallel = prerender.render_pages(DetailedTelegramCalendar, page_list, processes=2, disabled_dates=rules)
+    keyboard_cache.clear()
+    assert parallel == prerender.render_pages(DetailedTelegramCalendar, page_list, disabled_dates=rules)
+
+    requests = [{'current_date': date(2025, month, 1), 'step': DAY, 'disabled_dates': rules} for month in (5, 6, 7)]
+    keyboard_cache.clear()
+    parallel = render_many(requests, DetailedTelegramCalendar, processes=2)
+    keyboard_cache.clear()
+    assert parallel == render_many(requests, DetailedTelegramCalendar)
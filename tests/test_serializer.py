@@ -0,0 +1,78 @@
+import json
+import os
+import random
+import sys
+from datetime import date
+
+import pytest
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+from telegram_bot_calendar import DetailedTelegramCalendar, DAY
+from telegram_bot_calendar.base import rows
+from telegram_bot_calendar.serializer import KeyboardSerializer
+
+ALPHABET = 'abc xyz_0123"\\\n\t×«»фыва€😀ش ی د'
+
+
+def random_text(rnd):
+    return ''.join(rnd.choice(ALPHABET) for _ in range(rnd.randint(0, 8)))
+
+
+def random_button(rnd):
+    kind = rnd.random()
+    if kind < 0.6:
+        return {'text': random_text(rnd), 'callback_data': random_text(rnd)}
+    if kind < 0.8:
+        return {'text': rnd.randint(-40, 40), 'callback_data': random_text(rnd)}
+    if kind < 0.9:
+        return {'callback_data': random_text(rnd), 'text': random_text(rnd)}
+    return {'text': rnd.choice([True, None, 1.5, random_text(rnd)]), 'url': random_text(rnd)}
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_serializer_same_as_json_dumps(seed):
+    rnd = random.Random(seed)
+    additional_buttons = rows([random_button(rnd) for _ in range(rnd.randint(0, 5))], 2)
+    serializer = KeyboardSerializer(additional_buttons)
+
+    for _ in range(3):
+        buttons = [[random_button(rnd) for _ in range(rnd.randint(0, 7))] for _ in range(rnd.randint(0, 8))]
+        assert serializer.dumps(buttons) == json.dumps({'inline_keyboard': buttons + additional_buttons})
+
+
+@pytest.mark.parametrize('locale', ['en', 'ru', 'fa'])
+def test_calendar_keyboard_same_as_json_dumps(locale):
+    calendar = DetailedTelegramCalendar(locale=locale, additional_buttons=[{'text': 'Отмена', 'callback_data': 'c'}])
+    calendar._build_keyboard = lambda buttons: buttons
+    calendar.cache = None
+    calendar._build(step=DAY)
+
+    expected = json.dumps({'inline_keyboard': calendar._keyboard + calendar.additional_buttons})
+    assert DetailedTelegramCalendar._build_json_keyboard(calendar, calendar._keyboard) == expected
+
+
+@pytest.mark.parametrize('json_backend', ['json', 'orjson', 'ujson', 'auto'])
+@pytest.mark.parametrize('json_bytes', [False, True])
+def test_json_backends(json_backend, json_bytes):
+    if json_backend in ('orjson', 'ujson'):
+        pytest.importorskip(json_backend)
+
+    class BackendCalendar(DetailedTelegramCalendar):
+        pass
+
+    BackendCalendar.json_backend = json_backend
+    BackendCalendar.json_bytes = json_bytes
+    keyboard, _ = BackendCalendar(locale='fa', additional_buttons=[{'text': 'لغو', 'callback_data': 'c'}]).build()
+    expected, _ = DetailedTelegramCalendar(locale='fa', additional_buttons=[{'text': 'لغو', 'callback_data': 'c'}]).build()
+
+    assert isinstance(keyboard, bytes if json_bytes else str)
+    assert json.loads(keyboard) == json.loads(expected)
+
+
+def test_unknown_json_backend():
+    class BackendCalendar(DetailedTelegramCalendar):
+        json_backend = 'simplejson'
+
+    with pytest.raises(ValueError):
+        BackendCalendar()
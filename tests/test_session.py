@@ -0,0 +1,133 @@
+import json
+import os
+import sys
+from collections import namedtuple
+from datetime import date
+
+import pytest
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+from telegram_bot_calendar import DetailedTelegramCalendar, RangeTelegramCalendar, CalendarConfig, CalendarRouter, \
+    MemorySessionStore, SQLiteSessionStore, handle, DAY
+from telegram_bot_calendar.session import session_token
+
+Query = namedtuple('Query', 'data')
+
+
+def callbacks(keyboard):
+    return [button['callback_data'] for row in json.loads(keyboard)['inline_keyboard'] for button in row]
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        yield MemorySessionStore()
+    else:
+        store = SQLiteSessionStore(str(tmp_path / 'sessions.db'))
+        yield store
+        store.close()
+
+
+def test_store_batch(store):
+    store.set_many({'a': 'cbcal_0_n', 'b': 'cbcal_1_n'})
+    store.set('c', 'cbcal_2_n')
+    assert store.get_many(['a', 'c', 'x']) == {'a': 'cbcal_0_n', 'c': 'cbcal_2_n'}
+    assert store.get('x') is None
+
+
+def test_sqlite_store_shared_and_large_batch(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    items = {str(i): 'cbcal_{}_n'.format(i) for i in range(1200)}
+    SQLiteSessionStore(path).set_many(items)
+    assert SQLiteSessionStore(path).get_many(items) == items
+
+
+def test_sqlite_store_failed_batch_is_rolled_back(tmp_path):
+    import sqlite3
+
+    store = SQLiteSessionStore(str(tmp_path / 'sessions.db'))
+    with pytest.raises(sqlite3.IntegrityError):
+        store.set_many({'a': 'cbcal_0_n', 'b': None})
+    store.set_many({'c': 'cbcal_2_n'})
+    assert store.get_many(['a', 'b', 'c']) == {'c': 'cbcal_2_n'}
+
+
+def test_store_ttl(monkeypatch, tmp_path):
+    now = [1000.0]
+    monkeypatch.setattr('telegram_bot_calendar.session.time.monotonic', lambda: now[0])
+    monkeypatch.setattr('telegram_bot_calendar.session.time.time', lambda: now[0])
+    for store in (MemorySessionStore(ttl=10), SQLiteSessionStore(str(tmp_path / 'ttl.db'), ttl=10)):
+        store.set('a', 'cbcal_0_n')
+        now[0] += 5
+        assert store.get('a') == 'cbcal_0_n'
+        now[0] += 6
+        assert store.get('a') is None
+
+
+def test_memory_store_lru():
+    store = MemorySessionStore(maxsize=2)
+    store.set_many({'a': '1', 'b': '2'})
+    store.get('a')
+    store.set('c', '3')
+    assert store.get_many(['a', 'b', 'c']) == {'a': '1', 'c': '3'}
+
+
+def test_session_calendar(store):
+    calendar = DetailedTelegramCalendar(calendar_id=7, session_store=store, current_date=date(2025, 3, 1))
+    calendar._build(step=DAY)
+    plain = DetailedTelegramCalendar(calendar_id=7, current_date=date(2025, 3, 1))
+    plain._build(step=DAY)
+
+    tokens = [data for data in callbacks(calendar._keyboard) if data != 'cbcal_7_n']
+    assert all(data.startswith('cs.7.') and len(data) <= 13 for data in tokens)
+    assert [store.get(data.rpartition('.')[2]) for data in tokens] == \
+        [data for data in callbacks(plain._keyboard) if data != 'cbcal_7_n']
+
+    for token, data in zip(tokens, [data for data in callbacks(plain._keyboard) if data != 'cbcal_7_n']):
+        assert DetailedTelegramCalendar(calendar_id=7, session_store=store).process(token) == \
+            DetailedTelegramCalendar(calendar_id=7, session_store=store).process(data)
+
+
+def test_cached_keyboard_saves_tokens():
+    first_store, second_store = MemorySessionStore(), MemorySessionStore()
+    first = DetailedTelegramCalendar(session_store=first_store, current_date=date(2025, 3, 1))
+    first._build(step=DAY)
+    # same keyboard from the cache, its tokens are written to the store of the second calendar
+    second = DetailedTelegramCalendar(session_store=second_store, current_date=date(2025, 3, 1))
+    second._build(step=DAY)
+    assert len(second_store) == len(first_store) > 0
+
+
+def test_unknown_token():
+    store = MemorySessionStore()
+    assert DetailedTelegramCalendar(session_store=store).process('cs.0.' + session_token('x')) == (None, None, None)
+    assert DetailedTelegramCalendar().process('cs.0.abc') == (None, None, None)
+
+
+def test_session_func_router_handle():
+    store = MemorySessionStore()
+    calendar = DetailedTelegramCalendar(calendar_id=3, session_store=store, current_date=date(2025, 3, 1))
+    calendar._build(step=DAY)
+    token = [data for data in callbacks(calendar._keyboard) if data.startswith('cs.')][5]
+
+    assert DetailedTelegramCalendar.func(calendar_id=3)(Query(token))
+    assert not DetailedTelegramCalendar.func(calendar_id=4)(Query(token))
+
+    router = CalendarRouter()
+    router.register(DetailedTelegramCalendar, calendar_id=3, session_store=store)
+    expected = DetailedTelegramCalendar(calendar_id=3, session_store=store).process(token)
+    assert router.process(token) == expected
+    assert handle(CalendarConfig(DetailedTelegramCalendar, calendar_id=3, session_store=store), token) == expected
+
+
+def test_session_range():
+    store = MemorySessionStore()
+    start = RangeTelegramCalendar(session_store=store, current_date=date(2025, 3, 1))
+    start._build(step=DAY)
+    tokens = {store.get(data.rpartition('.')[2]): data for data in callbacks(start._keyboard) if data.startswith('cs.')}
+
+    _, keyboard, _ = RangeTelegramCalendar(session_store=store).process(tokens['cbcal_0_s_d_2025_3_6_en'])
+    pending = {store.get(data.rpartition('.')[2]): data for data in callbacks(keyboard) if data.startswith('cs.')}
+    result, _, _ = RangeTelegramCalendar(session_store=store).process(pending['cbcal_0_s_d_2025_3_10_en_2025.3.6'])
+    assert result == (date(2025, 3, 6), date(2025, 3, 10))
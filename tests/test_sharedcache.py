@@ -0,0 +1,113 @@
+import multiprocessing
+import os
+import sys
+from datetime import date
+
+import jdatetime
+import pytest
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+from telegram_bot_calendar import DetailedTelegramCalendar, DisabledDates, DAY
+from telegram_bot_calendar.callback import TEXT_CODEC, COMPACT_CODEC
+from telegram_bot_calendar.sharedcache import SharedKeyboardCache, UnstableKey, stable_key
+from telegram_bot_calendar.systems import JALALI
+
+fork = pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+
+
+def render(cache, current_date, locale='en'):
+    calendar_cls = type('SharedCalendar', (DetailedTelegramCalendar,), {'cache': cache})
+    calendar = calendar_cls(current_date=current_date, locale=locale)
+    calendar._build(step=DAY)
+    return calendar._keyboard
+
+
+def worker(cache, path, queue):
+    if cache is None:
+        cache = SharedKeyboardCache(path, slots=64, data_size=2 ** 20)
+    render(cache, date(2025, 3, 1))
+    render(cache, jdatetime.date(1404, 1, 1), 'fa')
+    queue.put((cache.hits, cache.misses))
+
+
+def run_workers(cache=None, path=None, count=3):
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    results = []
+    for _ in range(count):
+        process = context.Process(target=worker, args=(cache, path, queue))
+        process.start()
+        results.append(queue.get(timeout=30))
+        process.join()
+    return results
+
+
+@fork
+def test_forked_workers_share_keyboards():
+    cache = SharedKeyboardCache(slots=64, data_size=2 ** 20)
+    assert run_workers(cache) == [(0, 2), (2, 0), (2, 0)]
+    assert len(cache) == 2
+    assert render(cache, date(2025, 3, 20)) == render(None, date(2025, 3, 20))
+
+
+@fork
+def test_file_shared_by_processes(tmp_path):
+    path = str(tmp_path / 'keyboards')
+    assert run_workers(path=path) == [(0, 2), (2, 0), (2, 0)]
+
+    cache = SharedKeyboardCache(path, slots=8, data_size=1024)
+    # the sizes of the existing file are used
+    assert (cache.slots, cache.data_size, len(cache)) == (64, 2 ** 20, 2)
+    assert render(cache, jdatetime.date(1404, 1, 20), 'fa') == render(None, jdatetime.date(1404, 1, 20), 'fa')
+    assert cache.hits == 1
+    cache.close()
+
+
+def test_values_and_local_keys():
+    cache = SharedKeyboardCache(slots=16, data_size=4096)
+    cache.set(('a', 1), 'кнопка')
+    cache.set(('b', date(2025, 3, 1)), b'{"inline_keyboard":[]}')
+    cache.set(('c', JALALI), [[{'text': 1, 'callback_data': 'cbcal_0_n'}]])
+    assert cache.get(('a', 1)) == 'кнопка'
+    assert cache.get(('b', date(2025, 3, 1))) == b'{"inline_keyboard":[]}'
+    assert cache.get(('c', JALALI)) == [[{'text': 1, 'callback_data': 'cbcal_0_n'}]]
+    assert cache.get(('a', 2)) is None
+
+    rules = DisabledDates(weekdays=(0,))
+    cache.set(('d', rules), 'local')
+    assert cache.get(('d', rules)) == 'local' and ('d', rules) in cache.local and len(cache) == 3
+    assert cache.stats()['hits'] == 3 and cache.stats()['misses'] == 1
+
+
+def test_full_cache_is_cleared():
+    cache = SharedKeyboardCache(slots=8, data_size=64)
+    for i in range(cache.maxsize):
+        cache.set(i, 'x')
+    assert len(cache) == cache.maxsize == 6
+    cache.set(6, 'x')
+    assert len(cache) == 1 and cache.get(0) is None and cache.get(6) == 'x'
+    assert cache.evictions == 6
+
+    # the data area is full too
+    cache.set(7, 'y' * 64)
+    assert len(cache) == 1 and cache.get(7) == 'y' * 64
+    # values larger than the data area are not cached
+    cache.set(8, 'z' * 65)
+    assert 8 not in cache
+
+
+def test_stable_key():
+    assert stable_key((DetailedTelegramCalendar, 'en', date(2025, 3, 1), jdatetime.date(1404, 1, 1), JALALI)) == \
+        "(telegram_bot_calendar.detailed.DetailedTelegramCalendar,'en',datetime.date(2025, 3, 1)," \
+        "jdatetime.date(1404, 1, 1),telegram_bot_calendar.systems.JalaliSystem:jalali,)"
+    assert stable_key((TEXT_CODEC,)) != stable_key((COMPACT_CODEC,))
+    with pytest.raises(UnstableKey):
+        stable_key(('x', object()))
+
+
+def test_invalid_file(tmp_path):
+    path = tmp_path / 'other'
+    path.write_bytes(b'x' * 1024)
+    with pytest.raises(ValueError):
+        SharedKeyboardCache(str(path))
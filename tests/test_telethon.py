@@ -0,0 +1,63 @@
+import json
+import os
+import sys
+from datetime import date
+
+import pytest
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+from telegram_bot_calendar import DetailedTelegramCalendar, YEAR, MONTH, DAY
+
+telethon = pytest.importorskip('telethon')
+
+
+class NoCacheCalendar(DetailedTelegramCalendar):
+    cache = None
+
+
+def cells(keyboard):
+    return [[(button.text, button.type.data.decode('utf-8')) for button in row] for row in keyboard]
+
+
+@pytest.mark.parametrize(('locale', 'current_date', 'step'), [
+    ('en', date(2021, 1, 12), YEAR),
+    ('ru', date(2021, 1, 12), MONTH),
+    ('en', date(2021, 2, 12), DAY),
+    ('fa', None, DAY),
+])
+def test_telethon_matches_json(locale, current_date, step):
+    kwargs = dict(locale=locale, min_date=date(2021, 2, 3) if locale != 'fa' else None)
+    if locale == 'fa':
+        import jdatetime
+        current_date = jdatetime.date(1402, 12, 5)
+
+    json_calendar = NoCacheCalendar(current_date=current_date, **kwargs)
+    json_calendar._build(step=step)
+    telethon_calendar = NoCacheCalendar(current_date=current_date, telethon=True, **kwargs)
+    telethon_calendar._build(step=step)
+
+    expected = [[(str(button['text']), button['callback_data']) for button in row]
+                for row in json.loads(json_calendar._keyboard)['inline_keyboard'] if row]
+    assert cells(telethon_calendar._keyboard) == expected
+
+
+def test_telethon_static_cells_reused():
+    first = NoCacheCalendar(current_date=date(2021, 1, 12), telethon=True)
+    first._build(step=DAY)
+    second = NoCacheCalendar(current_date=date(2021, 2, 12), telethon=True)
+    second._build(step=DAY)
+
+    # weekday header is shared, date buttons are new
+    assert all(a is b for a, b in zip(first._keyboard[0], second._keyboard[0]))
+    assert first._keyboard[1][-1] is not second._keyboard[1][-1]
+
+
+def test_telethon_additional_buttons():
+    extra = telethon.Button.inline('Cancel', b'cancel')
+    calendar = NoCacheCalendar(current_date=date(2021, 1, 12), telethon=True,
+                               additional_buttons=[extra, {'text': 'Today', 'callback_data': 'today'}])
+    calendar._build(step=DAY)
+
+    assert calendar._keyboard[-1][0] is extra
+    assert cells([calendar._keyboard[-1][1:]]) == [[('Today', 'today')]]
@@ -0,0 +1,135 @@
+import json
+import os
+import sys
+from datetime import date, datetime, time
+
+import jdatetime
+import pytest
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+from telegram_bot_calendar import DateTimeTelegramCalendar, DetailedTelegramCalendar, CalendarConfig, \
+    MemorySessionStore, handle, render_many, LSTEP, DAY, HOUR, MINUTE
+from telegram_bot_calendar.base import page_anchor
+from telegram_bot_calendar.callback import TEXT_CODEC, COMPACT_CODEC, parse_callback
+from telegram_bot_calendar.timepicker import time_grid
+
+
+class CompactDateTimeCalendar(DateTimeTelegramCalendar):
+    codec = COMPACT_CODEC
+
+
+class OfficeHoursCalendar(DateTimeTelegramCalendar):
+    min_time = time(9, 0)
+    max_time = time(17, 30)
+    minute_step = 30
+
+
+def keyboard_rows(keyboard):
+    return json.loads(keyboard)['inline_keyboard']
+
+
+def texts(keyboard):
+    return [[button['text'] for button in row] for row in keyboard_rows(keyboard)]
+
+
+def data_of(keyboard, text):
+    return [button['callback_data'] for row in keyboard_rows(keyboard) for button in row if button['text'] == text][0]
+
+
+@pytest.mark.parametrize('codec', [TEXT_CODEC, COMPACT_CODEC])
+@pytest.mark.parametrize('locale', ['en', 'xx'])
+def test_codec_time(codec, locale):
+    data = codec.encode(0, 's', MINUTE, datetime(2025, 3, 10, 23, 45), locale)
+    payload = parse_callback(data)
+    assert (payload.step, payload.day, payload.hour, payload.minute, payload.locale) == (MINUTE, 10, 23, 45, locale)
+    assert payload.datetime(datetime) == datetime(2025, 3, 10, 23, 45)
+    assert parse_callback(codec.with_extra(data, 'x')).extra == 'x'
+    assert parse_callback(codec.encode(0, 's', DAY, date(2025, 3, 10), locale)).hour is None
+
+
+def test_time_grid():
+    assert time_grid(1, 30, time(9, 0), time(10, 15)) == ((9, (0, 30)), (10, (0,)))
+    assert time_grid(6, 60) == ((0, (0,)), (6, (0,)), (12, (0,)), (18, (0,)))
+    assert time_grid(1, 30, time(9, 0), time(10, 15)) is time_grid(1, 30, time(9, 0), time(10, 15))
+
+
+@pytest.mark.parametrize('calendar_cls', [DateTimeTelegramCalendar, CompactDateTimeCalendar])
+def test_date_and_time_flow(calendar_cls):
+    calendar = calendar_cls(current_date=date(2025, 3, 1))
+    calendar._build(step=DAY)
+
+    result, keyboard, step = calendar_cls().process(data_of(calendar._keyboard, 10))
+    assert result is None and step == HOUR
+    assert texts(keyboard)[0] == ['00:00', '01:00', '02:00', '03:00']
+    assert texts(keyboard)[-2] == ['<<', '10 Mar 2025', '>>']
+
+    result, keyboard, step = calendar_cls().process(data_of(keyboard, '14:00'))
+    assert result is None and step == MINUTE
+    assert texts(keyboard)[0] == ['14:00', '14:15', '14:30', '14:45']
+    assert texts(keyboard)[-2] == ['<<', '10 Mar 14:00', '>>']
+
+    result, keyboard, step = calendar_cls().process(data_of(keyboard, '14:45'))
+    assert result == datetime(2025, 3, 10, 14, 45) and keyboard is None and step == MINUTE
+
+
+def test_bounds_and_navigation():
+    calendar = OfficeHoursCalendar(current_date=datetime(2025, 3, 10, 9), max_date=date(2025, 3, 10))
+    calendar._build(step=HOUR)
+    assert texts(calendar._keyboard)[:3] == [['09:00', '10:00', '11:00', '12:00'],
+                                             ['13:00', '14:00', '15:00', '16:00'], ['17:00', ' ', ' ', ' ']]
+    prev_day, middle, next_day = keyboard_rows(calendar._keyboard)[-2]
+    assert parse_callback(prev_day['callback_data']).date(date) == date(2025, 3, 9)
+    assert parse_callback(middle['callback_data']).step == DAY
+    assert next_day['callback_data'] == 'cbcal_0_n'
+
+    calendar._build(step=MINUTE)
+    assert texts(calendar._keyboard)[0] == ['09:00', '09:30', ' ', ' ']
+    prev_hour, middle, next_hour = keyboard_rows(calendar._keyboard)[-2]
+    assert prev_hour['callback_data'] == 'cbcal_0_n'
+    assert parse_callback(middle['callback_data']).step == HOUR
+    assert parse_callback(next_hour['callback_data']).hour == 10
+
+    # times out of the bounds are not selected
+    assert OfficeHoursCalendar().process('cbcal_0_s_i_2025_3_10T18:00_en')[::2] == (None, MINUTE)
+    assert OfficeHoursCalendar().process('cbcal_0_s_i_2025_3_10T9:30_en')[0] == datetime(2025, 3, 10, 9, 30)
+
+
+def test_jalali_time():
+    result, keyboard, step = DateTimeTelegramCalendar(minute_step=20).process('cbcal_0_s_h_1404_1_1T8:0_fa')
+    assert texts(keyboard)[0] == ['08:00', '08:20', '08:40', ' ']
+    assert texts(keyboard)[-2][1] == '1 فروردین 08:00'
+    result, _, _ = DateTimeTelegramCalendar(minute_step=20).process(data_of(keyboard, '08:40'))
+    assert result == jdatetime.datetime(1404, 1, 1, 8, 40)
+
+
+def test_shared_cache_and_handle():
+    first = DateTimeTelegramCalendar(current_date=datetime(2025, 3, 10, 14, 10))
+    first._build(step=MINUTE)
+    second = DateTimeTelegramCalendar(current_date=datetime(2025, 3, 10, 14, 50))
+    second._build(step=MINUTE)
+    assert second._keyboard is first._keyboard
+    assert page_anchor(datetime(2025, 3, 10, 14, 50), MINUTE) == datetime(2025, 3, 10, 14)
+    assert page_anchor(datetime(2025, 3, 10, 14, 50), HOUR) == datetime(2025, 3, 10)
+
+    config = CalendarConfig(DateTimeTelegramCalendar)
+    assert handle(config, 'cbcal_0_s_d_2025_3_10_en')[2] == HOUR
+    assert handle(config, 'cbcal_0_s_i_2025_3_10T14:15_en') == (datetime(2025, 3, 10, 14, 15), None, MINUTE)
+    keyboards = render_many([{'current_date': datetime(2025, 3, 10, 14, minute), 'step': MINUTE}
+                             for minute in (0, 15, 30)], DateTimeTelegramCalendar)
+    assert keyboards[0] is keyboards[1] is keyboards[2]
+
+
+def test_session_time():
+    store = MemorySessionStore()
+    calendar = DateTimeTelegramCalendar(session_store=store, current_date=datetime(2025, 3, 10, 14))
+    calendar._build(step=MINUTE)
+    token = data_of(calendar._keyboard, '14:30')
+    assert token.startswith('cs.')
+    assert DateTimeTelegramCalendar(session_store=store).process(token)[0] == datetime(2025, 3, 10, 14, 30)
+
+
+def test_steps_mapping():
+    assert LSTEP[HOUR] == 'hour' and LSTEP[MINUTE] == 'minute'
+    assert DetailedTelegramCalendar.steps.get(DAY) is None
+    assert DateTimeTelegramCalendar.steps[DAY] == HOUR and DateTimeTelegramCalendar.prev_steps[MINUTE] == HOUR
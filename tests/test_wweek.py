@@ -0,0 +1,104 @@
+import json
+import os
+import sys
+from datetime import date, timedelta
+
+import jdatetime
+import pytest
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+from telegram_bot_calendar import WWeekTelegramCalendar, DetailedTelegramCalendar, DisabledDates, WEEK, DAY
+from telegram_bot_calendar.base import page_anchor
+from telegram_bot_calendar.callback import COMPACT_CODEC, parse_callback
+
+
+class TwoWeeksCalendar(WWeekTelegramCalendar):
+    weeks = 2
+
+
+def keyboard_rows(calendar):
+    return json.loads(calendar._keyboard)['inline_keyboard']
+
+
+def texts(calendar):
+    return [[button['text'] for button in row] for row in keyboard_rows(calendar)]
+
+
+@pytest.mark.parametrize(('d', 'expected'), [
+    (date(2025, 3, 30), date(2025, 3, 24)),
+    (date(2025, 3, 24), date(2025, 3, 24)),
+    (date(2025, 1, 2), date(2024, 12, 30)),
+    # Jalali weeks start on Saturday
+    (jdatetime.date(1404, 1, 1), jdatetime.date(1403, 12, 25)),
+    (jdatetime.date(1404, 1, 2), jdatetime.date(1404, 1, 2)),
+])
+def test_week_anchor(d, expected):
+    assert page_anchor(d, WEEK) == expected
+
+
+@pytest.mark.parametrize(('calendar_cls', 'current_date', 'expected'), [
+    (WWeekTelegramCalendar, date(2025, 3, 30), [[24, 25, 26, 27, 28, 29, 30]]),
+    (WWeekTelegramCalendar, date(2025, 1, 1), [[30, 31, 1, 2, 3, 4, 5]]),
+    (TwoWeeksCalendar, date(2025, 3, 27), [[24, 25, 26, 27, 28, 29, 30], [31, 1, 2, 3, 4, 5, 6]]),
+    (WWeekTelegramCalendar, jdatetime.date(1403, 12, 29), [[25, 26, 27, 28, 29, 30, 1]]),
+])
+def test_week_strip(calendar_cls, current_date, expected):
+    calendar = calendar_cls(current_date=current_date, locale='fa' if isinstance(current_date, jdatetime.date) else 'en')
+    keyboard, step = calendar.build()
+    assert step == WEEK
+    assert texts(calendar)[1:-2] == expected
+
+
+@pytest.mark.parametrize('locale', ['en', 'fa'])
+def test_week_matches_month_grid(locale):
+    """Days are in the same column of the week strip and of the month page."""
+    start = DetailedTelegramCalendar(locale=locale).current_date.replace(day=1)
+    month = DetailedTelegramCalendar(locale=locale, current_date=start)
+    month._build(step=DAY)
+    month_columns = {cell: row.index(cell) for row in texts(month)[1:-2] for cell in row if cell != ' '}
+
+    for day in month_columns:
+        week = WWeekTelegramCalendar(locale=locale, current_date=start.replace(day=day))
+        week._build(step=WEEK)
+        assert texts(week)[1].index(day) == month_columns[day]
+
+
+def test_week_navigation():
+    calendar = TwoWeeksCalendar(current_date=date(2025, 3, 27), min_date=date(2025, 3, 25),
+                                max_date=date(2025, 4, 8))
+    calendar._build(step=WEEK)
+    prev_button, middle, next_button = keyboard_rows(calendar)[-2]
+
+    assert prev_button['callback_data'] == 'cbcal_0_n'
+    assert texts(calendar)[1][:2] == [' ', 25]
+    assert parse_callback(middle['callback_data']).step == DAY
+    assert next_button['callback_data'] == 'cbcal_0_g_w_2025_4_7_en'
+
+    result, _, step = TwoWeeksCalendar(max_date=date(2025, 4, 8)).process(next_button['callback_data'])
+    assert result is None and step == WEEK
+    page = TwoWeeksCalendar(current_date=date(2025, 4, 7), max_date=date(2025, 4, 8))
+    page._build(step=WEEK)
+    assert texts(page)[1] == [7, 8, ' ', ' ', ' ', ' ', ' ']
+    assert keyboard_rows(page)[-2][2]['callback_data'] == 'cbcal_0_n'
+
+    assert WWeekTelegramCalendar().process('cbcal_0_s_d_2025_4_8_en')[0] == date(2025, 4, 8)
+
+
+def test_week_disabled_days():
+    calendar = WWeekTelegramCalendar(current_date=date(2025, 3, 30), disabled_dates=DisabledDates(weekdays=(5, 6)))
+    calendar._build(step=WEEK)
+    assert texts(calendar)[1] == [24, 25, 26, 27, 28, '×', '×']
+
+
+def test_compact_codec_week():
+    data = COMPACT_CODEC.encode(0, 'g', WEEK, date(2025, 3, 24), 'en')
+    assert parse_callback(data).step == WEEK
+    assert parse_callback(data).date(date) == date(2025, 3, 24)
+
+
+def test_week_pages_by_days():
+    calendar = WWeekTelegramCalendar(current_date=jdatetime.date(1403, 12, 29), locale='fa')
+    calendar._build(step=WEEK)
+    next_page = parse_callback(keyboard_rows(calendar)[-2][2]['callback_data'])
+    assert next_page.date(jdatetime.date) == jdatetime.date(1403, 12, 25) + timedelta(days=7)